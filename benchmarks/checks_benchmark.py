@@ -0,0 +1,190 @@
+"""End-to-end benchmark of the health checks against the stub monerod.
+
+Measures checks/sec and p50/p99 latency of every public check function at
+several concurrency levels, using the real I/O path (HTTP, digest
+authentication, TCP connect) against an in-process fake monerod.
+
+Run from the repository root:
+    python -m benchmarks.checks_benchmark
+    python -m benchmarks.checks_benchmark --requests 500 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import sys
+import time
+
+from monero_health import aio
+from monero_health import monero_health
+
+from tests.stub_monerod import StubMonerod
+
+CONCURRENCY_DEFAULT = (1, 4, 16)
+REQUESTS_DEFAULT = 200
+
+
+def _checks(monerod, pool):
+    rpc_kwargs = monerod.check_kwargs(p2p=False)
+    kwargs = monerod.check_kwargs()
+    return {
+        "daemon_last_block_check": functools.partial(
+            monero_health.daemon_last_block_check, **rpc_kwargs
+        ),
+        "daemon_rpc_status_check": functools.partial(
+            monero_health.daemon_rpc_status_check, **rpc_kwargs
+        ),
+        "daemon_p2p_status_check": functools.partial(
+            monero_health.daemon_p2p_status_check,
+            url="127.0.0.1",
+            port=monerod.p2p_port,
+        ),
+        "daemon_p2p_status_check(tcp)": functools.partial(
+            monero_health.daemon_p2p_status_check,
+            url="127.0.0.1",
+            port=monerod.p2p_port,
+            depth="tcp",
+        ),
+        "daemon_p2p_status_check(handshake)": functools.partial(
+            monero_health.daemon_p2p_status_check,
+            url="127.0.0.1",
+            port=monerod.p2p_port,
+            depth="handshake",
+        ),
+        "daemon_stati_check": functools.partial(
+            monero_health.daemon_stati_check, **kwargs
+        ),
+        "daemon_combined_status_check": functools.partial(
+            monero_health.daemon_combined_status_check, **kwargs
+        ),
+        "daemon_combined_status_check(batch)": functools.partial(
+            monero_health.daemon_combined_status_check, batch=True, **kwargs
+        ),
+        "daemon_combined_status_check(pool)": functools.partial(
+            monero_health.daemon_combined_status_check, pool=pool, **kwargs
+        ),
+    }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted 'values'."""
+
+    if not values:
+        return float("nan")
+    index = max(
+        0, min(len(values) - 1, round(percent / 100 * len(values)) - 1)
+    )
+    return values[index]
+
+
+def _timed(check):
+    start = time.perf_counter()
+    check()
+    return time.perf_counter() - start
+
+
+def run_threaded(check, requests, concurrency):
+    """Run 'check' 'requests' times on 'concurrency' threads."""
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as executor:
+        latencies = list(
+            executor.map(lambda _: _timed(check), range(requests))
+        )
+    return time.perf_counter() - start, latencies
+
+
+def run_async(monerod, requests, concurrency):
+    """Run the asyncio combined check 'requests' times, 'concurrency' at once."""
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                start = time.perf_counter()
+                await aio.daemon_combined_status_check(
+                    **monerod.check_kwargs()
+                )
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed() for _ in range(requests)))
+        return time.perf_counter() - start, list(latencies)
+
+    return asyncio.run(run())
+
+
+def _report(name, concurrency, duration, latencies):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<40} {concurrency:>4} {len(latencies) / duration:>10.1f}"
+        f" {percentile(latencies, 50) * 1000:>9.2f}"
+        f" {percentile(latencies, 99) * 1000:>9.2f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=REQUESTS_DEFAULT,
+        help="Checks per function and concurrency level.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=CONCURRENCY_DEFAULT,
+        help="Concurrency levels.",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0,
+        help="Additional stub monerod latency per RPC request [seconds].",
+    )
+    parser.add_argument(
+        "--checks", nargs="+", help="Only run checks containing these names."
+    )
+    args = parser.parse_args(argv)
+
+    # Keep logging from dominating the measurements.
+    logging.getLogger("DaemonHealth").setLevel(logging.WARNING)
+    logging.getLogger("monero_scripts.connect_to_node").setLevel(
+        logging.WARNING
+    )
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+
+    print(
+        f"{'check':<40} {'conc':>4} {'checks/s':>10} {'p50 [ms]':>9} {'p99 [ms]':>9}"
+    )
+    with StubMonerod(delay=args.delay) as monerod:
+        pool = monero_health.ConnectionPool()
+        checks = _checks(monerod, pool)
+        checks["aio.daemon_combined_status_check"] = None
+        for name, check in checks.items():
+            if args.checks and not any(part in name for part in args.checks):
+                continue
+            for concurrency in args.concurrency:
+                if check is None:
+                    duration, latencies = run_async(
+                        monerod, args.requests, concurrency
+                    )
+                else:
+                    duration, latencies = run_threaded(
+                        check, args.requests, concurrency
+                    )
+                _report(name, concurrency, duration, latencies)
+        pool.clear()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
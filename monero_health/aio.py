@@ -0,0 +1,647 @@
+"""Asyncio variants of the Monero daemon health checks.
+
+The checks return exactly the same responses as the blocking checks in
+'monero_health.monero_health', but are built on non-blocking sockets instead
+of 'AuthServiceProxy' and 'connect_to_node'.
+This way a single event loop can probe hundreds of daemons at once.
+"""
+
+import asyncio
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import re
+import time
+
+from monerorpc.authproxy import JSONRPCException
+
+from monero_health.monero_health import (
+    logger,
+    URL,
+    RPC_PORT,
+    P2P_PORT,
+    USER,
+    PASSWD,
+    OFFSET,
+    OFFSET_UNIT,
+    HTTP_TIMEOUT,
+    CONSIDER_P2P_STATUS,
+    SYNC_MAX_LAG,
+    SYNC_MIN_CONNECTIONS,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    _last_block_response,
+    _rpc_status_response,
+    _sync_status_response,
+    _sync_rpc_status_response,
+    _p2p_status_response,
+    _stati_response,
+    _combined_response,
+    _configure,
+    _respond,
+    _latency_observers,
+    _observe_latency,
+    LATENCY_GET_LAST_BLOCK_HEADER,
+    LATENCY_HARD_FORK_INFO,
+    LATENCY_GET_INFO,
+    LATENCY_P2P_CONNECT,
+)
+
+USER_AGENT = "monero_health/aio"
+# Same as 'monero_scripts.connect_to_node'.
+P2P_TIMEOUT = 5
+
+_CHALLENGE_PARAM = re.compile(r'(\w+)=(?:"([^"]*)"|([^,\s]*))')
+
+
+async def _timed(call, host, request):
+    """Await a daemon request and report its duration to the latency observers."""
+
+    start = time.monotonic()
+    try:
+        return await request
+    finally:
+        if _latency_observers:
+            _observe_latency(call, host, time.monotonic() - start)
+
+
+def _parse_digest_challenge(values):
+    """Pick the first usable 'Digest' challenge of the 'WWW-Authenticate' headers."""
+
+    for value in values:
+        scheme, _, params = value.strip().partition(" ")
+        if scheme.lower() != "digest":
+            continue
+        challenge = {
+            key.lower(): quoted if quoted else plain
+            for key, quoted, plain in _CHALLENGE_PARAM.findall(params)
+        }
+        if challenge.get("algorithm", "MD5").upper() in ("MD5", "MD5-SESS"):
+            return challenge
+
+    return None
+
+
+def _md5(data: str) -> str:
+    # Add 'nosec' comment to make bandit ignore [B303:md5], required by RFC 2617.
+    return hashlib.md5(data.encode("utf-8")).hexdigest()  # nosec
+
+
+def _digest_authorization(challenge, user, passwd, method, uri, nc):
+    """Build the 'Authorization' header answering a digest challenge (RFC 2617)."""
+
+    realm = challenge.get("realm", "")
+    nonce = challenge.get("nonce", "")
+    algorithm = challenge.get("algorithm", "MD5")
+    cnonce = os.urandom(8).hex()
+    nc_value = f"{nc:08x}"
+
+    ha1 = _md5(f"{user}:{realm}:{passwd}")
+    if algorithm.upper() == "MD5-SESS":
+        ha1 = _md5(f"{ha1}:{nonce}:{cnonce}")
+    ha2 = _md5(f"{method}:{uri}")
+
+    qop = challenge.get("qop")
+    if qop:
+        qop = "auth"
+        digest = _md5(f"{ha1}:{nonce}:{nc_value}:{cnonce}:{qop}:{ha2}")
+    else:
+        digest = _md5(f"{ha1}:{nonce}:{ha2}")
+
+    header = (
+        f'Digest username="{user}", realm="{realm}", nonce="{nonce}", '
+        f'uri="{uri}", response="{digest}", algorithm={algorithm}'
+    )
+    if "opaque" in challenge:
+        header += f', opaque="{challenge["opaque"]}"'
+    if qop:
+        header += f', qop={qop}, nc={nc_value}, cnonce="{cnonce}"'
+
+    return header
+
+
+class AsyncDaemonRPC:
+    """Minimal asyncio JSON-RPC client for the Monero daemon.
+
+    Keeps a single HTTP/1.1 keep-alive connection and answers digest
+    authentication challenges, like 'AuthServiceProxy' does.
+    Errors are reported as 'JSONRPCException' with the codes used by
+    'AuthServiceProxy'.
+    """
+
+    def __init__(
+        self, url=URL, port=RPC_PORT, user=USER, passwd=PASSWD, timeout=None
+    ):
+        self.url = url
+        self.port = int(port)
+        self.user = user
+        self.passwd = passwd
+        self.timeout = float(HTTP_TIMEOUT if timeout is None else timeout)
+        self._reader = None
+        self._writer = None
+        self._challenge = None
+        self._nc = 0
+        self._id_count = 0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def call(self, method, params=None):
+        """Call a JSON-RPC method and return its 'result'."""
+
+        self._id_count += 1
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params if params else {},
+            "id": self._id_count,
+        }
+        response = await self.request("/json_rpc", payload)
+        if response.get("error", None) is not None:
+            raise JSONRPCException(response["error"])
+        elif "result" not in response:
+            raise JSONRPCException(
+                {"code": -343, "message": "Missing JSON-RPC result."}
+            )
+
+        return response["result"]
+
+    async def request(self, path, payload):
+        """POST 'payload' as JSON to 'path' and return the decoded JSON response."""
+
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            async with self._lock:
+                status, http_response = await asyncio.wait_for(
+                    self._post(path, body), timeout=self.timeout
+                )
+        except (asyncio.TimeoutError) as e:
+            await self.close()
+            raise JSONRPCException(
+                {
+                    "code": -341,
+                    "message": f"Connection timeout, original error: '{str(e)}'.",
+                }
+            )
+        except (OSError, asyncio.IncompleteReadError) as e:
+            await self.close()
+            raise JSONRPCException(
+                {
+                    "code": -341,
+                    "message": f"Could not establish a connection, original error: '{str(e)}'.",
+                }
+            )
+
+        if status != 200:
+            raise JSONRPCException(
+                {
+                    "code": -344,
+                    "message": f"Received HTTP status code '{status}'.",
+                }
+            )
+        if not http_response:
+            raise JSONRPCException(
+                {"code": -342, "message": "Missing HTTP response from server."}
+            )
+
+        try:
+            return json.loads(http_response, parse_float=decimal.Decimal)
+        except (json.JSONDecodeError) as e:
+            raise ValueError(
+                f"Error: '{str(e)}'. Response: '{http_response}'."
+            )
+
+    async def _post(self, path, body):
+        status, headers, http_response = await self._exchange(path, body)
+        if status == 401 and self.user is not None:
+            challenge = _parse_digest_challenge(
+                headers.get("www-authenticate", [])
+            )
+            if challenge:
+                self._challenge = challenge
+                self._nc = 0
+                status, headers, http_response = await self._exchange(
+                    path, body
+                )
+
+        return status, http_response
+
+    async def _exchange(self, path, body):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.url, self.port
+            )
+
+        lines = [
+            f"POST {path} HTTP/1.1",
+            f"Host: {self.url}:{self.port}",
+            f"User-Agent: {USER_AGENT}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if self._challenge:
+            self._nc += 1
+            lines.append(
+                "Authorization: "
+                + _digest_authorization(
+                    self._challenge,
+                    self.user,
+                    self.passwd,
+                    "POST",
+                    path,
+                    self._nc,
+                )
+            )
+        self._writer.write(
+            ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+        )
+        await self._writer.drain()
+
+        head = await self._reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        for line in header_lines:
+            if not line:
+                continue
+            key, _, value = line.partition(":")
+            headers.setdefault(key.strip().lower(), []).append(value.strip())
+
+        if "chunked" in headers.get("transfer-encoding", [""])[-1].lower():
+            http_response = b""
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if not size:
+                    break
+                http_response += chunk[:-2]
+        elif "content-length" in headers:
+            http_response = await self._reader.readexactly(
+                int(headers["content-length"][-1])
+            )
+        else:
+            http_response = await self._reader.read()
+            await self.close()
+
+        if "close" in headers.get("connection", [""])[-1].lower():
+            await self.close()
+
+        return status, headers, http_response.decode("utf-8")
+
+
+async def daemon_last_block_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    offset=OFFSET,
+    offset_unit=OFFSET_UNIT,
+    as_dict=True,
+    config=None,
+):
+    """Check last block status.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_last_block_check'.
+    """
+
+    url, port, user, passwd, timeout, offset, offset_unit, delta = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+        offset=offset,
+        offset_unit=offset_unit,
+        delta=None,
+    )
+    error = None
+    last_block_header = None
+    check_timestamp = datetime.datetime.utcnow().replace(microsecond=0)
+    own_conn = not conn
+    try:
+        if own_conn:
+            conn = AsyncDaemonRPC(
+                url=url, port=port, user=user, passwd=passwd, timeout=timeout
+            )
+
+        logger.info("Checking '%s:%s'.", url, port)
+
+        last_block_header = (
+            await _timed(
+                LATENCY_GET_LAST_BLOCK_HEADER,
+                f"{url}:{port}",
+                conn.call("get_last_block_header"),
+            )
+        )["block_header"]
+    except (ValueError, JSONRPCException) as e:
+        error = {"error": str(e)}
+    finally:
+        if own_conn and conn:
+            await conn.close()
+
+    return _respond(
+        _last_block_response(
+            url,
+            port,
+            last_block_header=last_block_header,
+            error=error,
+            check_timestamp=check_timestamp,
+            offset=offset,
+            offset_unit=offset_unit,
+            delta=delta,
+        ),
+        as_dict,
+    )
+
+
+async def daemon_rpc_status_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    as_dict=True,
+    config=None,
+):
+    """Check daemon status.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_rpc_status_check'.
+    """
+
+    url, port, user, passwd, timeout = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+    )
+    error = None
+    hard_fork_info = None
+    own_conn = not conn
+    try:
+        if own_conn:
+            conn = AsyncDaemonRPC(
+                url=url, port=port, user=user, passwd=passwd, timeout=timeout
+            )
+
+        logger.info("Checking '%s:%s'.", url, port)
+
+        hard_fork_info = await _timed(
+            LATENCY_HARD_FORK_INFO,
+            f"{url}:{port}",
+            conn.call("hard_fork_info"),
+        )
+    except (ValueError, JSONRPCException) as e:
+        error = {"error": str(e)}
+    finally:
+        if own_conn and conn:
+            await conn.close()
+
+    return _respond(
+        _rpc_status_response(
+            url, port, hard_fork_info=hard_fork_info, error=error
+        ),
+        as_dict,
+    )
+
+
+async def daemon_sync_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    max_lag=SYNC_MAX_LAG,
+    min_connections=SYNC_MIN_CONNECTIONS,
+    as_dict=True,
+    config=None,
+):
+    """Check daemon synchronization.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_sync_check'.
+    """
+
+    url, port, user, passwd, timeout, max_lag, min_connections = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+        max_lag=max_lag,
+        min_connections=min_connections,
+    )
+    error = None
+    info = None
+    own_conn = not conn
+    try:
+        if own_conn:
+            conn = AsyncDaemonRPC(
+                url=url, port=port, user=user, passwd=passwd, timeout=timeout
+            )
+
+        logger.info("Checking '%s:%s'.", url, port)
+
+        info = await _timed(
+            LATENCY_GET_INFO, f"{url}:{port}", conn.call("get_info")
+        )
+    except (ValueError, JSONRPCException) as e:
+        error = {"error": str(e)}
+    finally:
+        if own_conn and conn:
+            await conn.close()
+
+    return _respond(
+        _sync_status_response(
+            url,
+            port,
+            info=info,
+            error=error,
+            max_lag=max_lag,
+            min_connections=min_connections,
+        ),
+        as_dict,
+    )
+
+
+async def _try_to_connect(node, timeout=P2P_TIMEOUT):
+    """Non-blocking equivalent of 'connect_to_node.try_to_connect_keep_errors'."""
+
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(node[0], int(node[1])), timeout=timeout
+    )
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+    return True
+
+
+async def daemon_p2p_status_check(
+    url=URL, port=P2P_PORT, as_dict=True, config=None
+):
+    """Check daemon P2P status.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_p2p_status_check'.
+    """
+
+    url, port = _configure(config, port_field="p2p_port", url=url, port=port)
+
+    error = None
+    status = DAEMON_STATUS_UNKNOWN
+
+    try:
+        logger.info("Checking '%s:%s'.", url, port)
+        await _timed(
+            LATENCY_P2P_CONNECT,
+            f"{url}:{port}",
+            _try_to_connect((url, int(port))),
+        )
+        status = DAEMON_STATUS_OK
+    # ConnectionError: connection attempt is aborted /refused or connection aborted by the peer.
+    except (ConnectionError) as e:
+        error = {"error": str(e)}
+        status = DAEMON_STATUS_ERROR
+    except Exception as e:
+        error = {"error": str(e)}
+        status = DAEMON_STATUS_UNKNOWN
+
+    return _respond(
+        _p2p_status_response(url, port, status=status, error=error), as_dict
+    )
+
+
+async def daemon_stati_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    p2p_port=P2P_PORT,
+    user=USER,
+    passwd=PASSWD,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    as_dict=True,
+    config=None,
+):
+    """Check combined daemon status.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_stati_check'.
+    The RPC and the P2P checks run concurrently.
+    """
+
+    url, consider_p2p = _configure(config, url=url, consider_p2p=consider_p2p)
+
+    rpc_result, p2p_result = await asyncio.gather(
+        daemon_rpc_status_check(
+            conn=conn,
+            url=url,
+            port=port,
+            user=user,
+            passwd=passwd,
+            as_dict=False,
+            config=config,
+        ),
+        daemon_p2p_status_check(
+            url=url, port=p2p_port, as_dict=False, config=config
+        ),
+    )
+
+    return _respond(
+        _stati_response(url, rpc_result, p2p_result, consider_p2p), as_dict
+    )
+
+
+async def daemon_combined_status_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    p2p_port=P2P_PORT,
+    user=USER,
+    passwd=PASSWD,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    sync=False,
+    as_dict=True,
+    config=None,
+):
+    """Check combined daemon status.
+
+    Asyncio variant of 'monero_health.monero_health.daemon_combined_status_check'.
+    All checks run concurrently.
+    """
+
+    url, consider_p2p = _configure(config, url=url, consider_p2p=consider_p2p)
+
+    if sync:
+        sync_result, p2p_result = await asyncio.gather(
+            daemon_sync_check(
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                as_dict=False,
+                config=config,
+            ),
+            daemon_p2p_status_check(
+                url=url, port=p2p_port, as_dict=False, config=config
+            ),
+        )
+        stati_result = _stati_response(
+            url,
+            _sync_rpc_status_response(sync_result),
+            p2p_result,
+            consider_p2p,
+        )
+        return _respond(
+            _combined_response(
+                url, None, stati_result, sync_result=sync_result
+            ),
+            as_dict,
+        )
+
+    last_block_result, stati_result = await asyncio.gather(
+        daemon_last_block_check(
+            conn=conn,
+            url=url,
+            port=port,
+            user=user,
+            passwd=passwd,
+            as_dict=False,
+            config=config,
+        ),
+        daemon_stati_check(
+            conn=conn,
+            url=url,
+            port=port,
+            p2p_port=p2p_port,
+            user=user,
+            passwd=passwd,
+            consider_p2p=consider_p2p,
+            as_dict=False,
+            config=config,
+        ),
+    )
+
+    return _respond(
+        _combined_response(url, last_block_result, stati_result), as_dict
+    )
@@ -0,0 +1,136 @@
+"""Opt-in result cache for the health checks.
+
+Results are cached per check, host and port for 'ttl' seconds.
+Expired results are still returned immediately, while a single background
+refresh fetches a new result (stale-while-revalidate).
+This way many independent callers (load balancers, probes, dashboards) do
+not multiply the RPC load on the daemon being checked.
+"""
+
+import copy
+import inspect
+import logging
+import threading
+import time
+
+from monero_health.monero_health import _log, _render
+
+CACHE_KEY = "cache"
+
+# Seconds.
+CACHE_TTL_DEFAULT = 5
+
+# Arguments not identifying a cached result.
+_IGNORED_ARGUMENTS = ("conn", "pool")
+
+
+class _Entry:
+    __slots__ = ("result", "timestamp", "refreshing", "lock")
+
+    def __init__(self):
+        self.result = None
+        self.timestamp = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+class CheckCache:
+    """TTL cache with stale-while-revalidate in front of the health checks.
+
+    Every returned response carries a 'cache' key with the age of the result
+    in seconds and whether it is 'stale', i.e. older than 'ttl'.
+    """
+
+    def __init__(self, ttl=CACHE_TTL_DEFAULT):
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(check, kwargs):
+        arguments = inspect.signature(check).bind_partial(**kwargs)
+        arguments.apply_defaults()
+        return (getattr(check, "__name__", repr(check)),) + tuple(
+            sorted(
+                (name, repr(value))
+                for name, value in arguments.arguments.items()
+                if name not in _IGNORED_ARGUMENTS
+            )
+        )
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    @staticmethod
+    def _response(entry, now, ttl):
+        age = now - entry.timestamp
+        # Results of checks called with 'as_dict=False' are rendered.
+        response = copy.deepcopy(_render(entry.result))
+        response[CACHE_KEY] = {"age": round(age, 3), "stale": age > ttl}
+        return response
+
+    def _refresh(self, entry, check, kwargs):
+        try:
+            result = check(**kwargs)
+        except Exception as e:
+            data = {
+                "message": "Cannot refresh cached result.",
+                "error": str(e),
+            }
+            _log(logging.ERROR, data)
+        else:
+            with entry.lock:
+                entry.result = result
+                entry.timestamp = time.monotonic()
+        finally:
+            entry.refreshing = False
+
+    def call(self, check, **kwargs):
+        """Call 'check' with 'kwargs' or answer from the cache.
+
+        The first call for a given check, host and port blocks until the
+        check returns. Later calls never block.
+        Always returns response dicts, also for 'as_dict=False'.
+        """
+
+        entry = self._entry(self._key(check, kwargs))
+
+        with entry.lock:
+            if entry.result is None:
+                entry.result = check(**kwargs)
+                entry.timestamp = time.monotonic()
+
+            now = time.monotonic()
+            if now - entry.timestamp > self.ttl and not entry.refreshing:
+                entry.refreshing = True
+                threading.Thread(
+                    target=self._refresh,
+                    args=(entry, check, kwargs),
+                    daemon=True,
+                ).start()
+
+            return self._response(entry, now, self.ttl)
+
+    def wrap(self, check):
+        """Return a cached version of 'check'."""
+
+        def cached_check(**kwargs):
+            return self.call(check, **kwargs)
+
+        cached_check.__name__ = getattr(check, "__name__", "cached_check")
+        cached_check.__doc__ = getattr(check, "__doc__", None)
+
+        return cached_check
+
+    def clear(self):
+        """Remove all cached results."""
+
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,310 @@
+"""Command line interface 'monero-health'.
+
+Checks one daemon (configured by the environment variables) or every daemon
+of a hosts file:
+    monero-health --check combined
+    monero-health --hosts-file hosts.txt --check last_block rpc --parallel 32 --format ndjson
+    monero-health --watch 30 --format exit-code
+
+Every requested check runs once per host: The results of 'last_block',
+'rpc', 'p2p' and 'stati' are taken from a single 'stati' or 'combined' check
+instead of repeating the same requests.
+
+The hosts file contains one daemon per line, blank lines and lines starting
+with '#' are ignored:
+    # url [rpc_port [p2p_port [user [passwd]]]]
+    node.example.com 18081 18080
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+
+from monero_health import monero_health
+from monero_health.fleet import (
+    _imap_completed,
+    fleet_summary,
+    summarize,
+    make_target,
+    target_key,
+    FLEET_HOSTS_KEY,
+    FLEET_SUMMARY_KEY,
+    MAX_WORKERS_DEFAULT,
+)
+from monero_health.monero_health import (
+    _log,
+    URL,
+    RPC_PORT,
+    P2P_PORT,
+    USER,
+    PASSWD,
+    CONSIDER_P2P_STATUS,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS,
+    DAEMON_STATUS_WEIGHTS_,
+)
+
+CHECK_LAST_BLOCK = "last_block"
+CHECK_RPC = "rpc"
+CHECK_P2P = "p2p"
+CHECK_STATI = "stati"
+CHECK_COMBINED = "combined"
+CHECKS = (CHECK_LAST_BLOCK, CHECK_RPC, CHECK_P2P, CHECK_STATI, CHECK_COMBINED)
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_EXIT_CODE = "exit-code"
+FORMATS = (FORMAT_JSON, FORMAT_NDJSON, FORMAT_EXIT_CODE)
+
+# Nagios plugin exit codes.
+EXIT_CODES = {DAEMON_STATUS_OK: 0, DAEMON_STATUS_ERROR: 2}
+EXIT_CODE_UNKNOWN = 3
+
+
+def read_hosts(lines):
+    """Get the targets ('fleet.make_target') of the lines of a hosts file."""
+
+    targets = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        targets.append(make_target(line.split()))
+    return targets
+
+
+def _check_kwargs(target, consider_p2p):
+    url, rpc_port, p2p_port, user, passwd = target
+    return {
+        "url": url,
+        "port": rpc_port,
+        "p2p_port": p2p_port,
+        "user": user,
+        "passwd": passwd,
+        "consider_p2p": consider_p2p,
+    }
+
+
+def run_checks(
+    target,
+    checks=(CHECK_COMBINED,),
+    consider_p2p=CONSIDER_P2P_STATUS,
+    pool=None,
+):
+    """Run the requested checks against one target.
+
+    Runs a single check covering all requested ones and returns the
+    requested results ('_Result's) keyed by check.
+    """
+
+    kwargs = _check_kwargs(target, consider_p2p)
+    kwargs.update({"pool": pool, "as_dict": False})
+    checks = set(checks)
+    results = {}
+    if checks <= {CHECK_LAST_BLOCK}:
+        del kwargs["p2p_port"], kwargs["consider_p2p"]
+        results[CHECK_LAST_BLOCK] = monero_health.daemon_last_block_check(
+            **kwargs
+        )
+    elif checks <= {CHECK_RPC}:
+        del kwargs["p2p_port"], kwargs["consider_p2p"]
+        results[CHECK_RPC] = monero_health.daemon_rpc_status_check(**kwargs)
+    elif checks <= {CHECK_P2P}:
+        results[CHECK_P2P] = monero_health.daemon_p2p_status_check(
+            url=kwargs["url"], port=kwargs["p2p_port"], as_dict=False
+        )
+    else:
+        if checks <= {CHECK_RPC, CHECK_P2P, CHECK_STATI}:
+            stati = monero_health.daemon_stati_check(**kwargs)
+        else:
+            combined = monero_health.daemon_combined_status_check(**kwargs)
+            results[CHECK_COMBINED] = combined
+            results[CHECK_LAST_BLOCK] = combined.last_block
+            stati = combined.daemon
+        results.update(
+            {CHECK_STATI: stati, CHECK_RPC: stati.rpc, CHECK_P2P: stati.p2p}
+        )
+
+    return {check: results[check] for check in CHECKS if check in checks}
+
+
+def host_response(target, checks=(CHECK_COMBINED,), **kwargs):
+    """Get the response of one target.
+
+    The response of the check, if a single check is requested. Otherwise,
+    the responses keyed by check with the worst status as 'status'.
+    """
+
+    try:
+        results = run_checks(target, checks=checks, **kwargs)
+    except Exception as e:
+        data = {"message": "Cannot determine status.", "error": str(e)}
+        _log(logging.ERROR, data)
+        return {
+            "status": DAEMON_STATUS_UNKNOWN,
+            "host": target_key(target),
+            "error": data,
+        }
+
+    if len(results) == 1:
+        return next(iter(results.values())).to_dict()
+
+    response = {check: result.to_dict() for check, result in results.items()}
+    max_weight = max(
+        DAEMON_STATUS_WEIGHTS_.get(result.status, -1)
+        for result in results.values()
+    )
+    response.update(
+        {
+            "status": DAEMON_STATUS_WEIGHTS[max_weight],
+            "host": target_key(target),
+        }
+    )
+    return response
+
+
+def iter_hosts(targets, parallel=MAX_WORKERS_DEFAULT, **kwargs):
+    """Yield '(url:rpc_port, response)' of all targets as they complete.
+
+    Checks at most 'parallel' targets concurrently.
+    """
+
+    for target, response in _imap_completed(
+        lambda target: host_response(target, **kwargs),
+        targets,
+        max_workers=parallel,
+    ):
+        yield target_key(target), response
+
+
+def check_hosts(targets, parallel=MAX_WORKERS_DEFAULT, **kwargs):
+    """Get the responses of all targets keyed by 'url:rpc_port'.
+
+    In the order of 'targets'.
+    """
+
+    responses = dict(iter_hosts(targets, parallel=parallel, **kwargs))
+    return {
+        target_key(target): responses[target_key(target)] for target in targets
+    }
+
+
+def exit_code(status) -> int:
+    return EXIT_CODES.get(status, EXIT_CODE_UNKNOWN)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="monero-health", description="Check health of monero daemons."
+    )
+    parser.add_argument(
+        "--hosts-file",
+        type=argparse.FileType("r"),
+        help="Check the daemons of this file ('-' for stdin) instead of "
+        "the one configured by the environment variables.",
+    )
+    parser.add_argument(
+        "--check",
+        nargs="+",
+        choices=CHECKS,
+        default=[CHECK_COMBINED],
+        help="Checks to run per daemon.",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=MAX_WORKERS_DEFAULT,
+        help="Daemons to check concurrently.",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="INTERVAL",
+        help="Check again every INTERVAL seconds until interrupted.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=FORMAT_JSON,
+        help="'json': one document per run, 'ndjson': one line per daemon "
+        "as soon as it is checked, "
+        "'exit-code': no output, the exit code is 0 for 'OK', 2 for "
+        "'ERROR' and 3 for 'UNKNOWN'.",
+    )
+    return parser
+
+
+def _output(targets, fmt, single, out, **kwargs):
+    """Check the targets and write the responses, return the status.
+
+    'ndjson' writes every response as soon as it is available, in
+    completion order, without keeping the responses.
+    """
+
+    if fmt == FORMAT_JSON:
+        responses = check_hosts(targets, **kwargs)
+        summary = fleet_summary(responses)
+        if single:
+            document = next(iter(responses.values()))
+        else:
+            document = {FLEET_HOSTS_KEY: responses, FLEET_SUMMARY_KEY: summary}
+        print(json.dumps(document), file=out, flush=True)
+        return summary["status"]
+
+    def responses():
+        for _, response in iter_hosts(targets, **kwargs):
+            if fmt == FORMAT_NDJSON:
+                print(json.dumps(response), file=out, flush=True)
+            yield response
+
+    return summarize(responses())["status"]
+
+
+def main(argv=None, out=None, stop=None):
+    """Run the CLI, return the exit code.
+
+    Stops watching when the 'threading.Event' 'stop' is set.
+    """
+
+    args = _parser().parse_args(argv)
+    out = out if out is not None else sys.stdout
+    stop = stop if stop is not None else threading.Event()
+    logging.basicConfig()
+
+    single = args.hosts_file is None
+    if single:
+        targets = [make_target((URL, RPC_PORT, P2P_PORT, USER, PASSWD))]
+    else:
+        with args.hosts_file:
+            targets = read_hosts(args.hosts_file)
+
+    # Keep-alive connections across the runs.
+    pool = monero_health.ConnectionPool()
+    status = DAEMON_STATUS_UNKNOWN
+    try:
+        while True:
+            status = _output(
+                targets,
+                args.format,
+                single,
+                out,
+                parallel=args.parallel,
+                checks=args.check,
+                pool=pool,
+            )
+            if args.watch is None or stop.wait(args.watch):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.clear()
+
+    return exit_code(status)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""Fleet level health checks.
+
+Runs the health checks for many Monero daemons on a bounded thread pool,
+so the wall-clock time of a sweep scales with the slowest daemon instead of
+the sum of all daemons.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+
+from monero_health import monero_health
+from monero_health.monero_health import (
+    _log,
+    URL_DEFAULT,
+    RPC_PORT_DEFAULT,
+    P2P_PORT_DEFAULT,
+    USER_DEFAULT,
+    PASSWD_DEFAULT,
+    CONSIDER_P2P_STATUS,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS,
+    DAEMON_STATUS_WEIGHTS_,
+)
+
+FLEET_HOSTS_KEY = "hosts"
+FLEET_SUMMARY_KEY = "summary"
+FLEET_TIP_KEY = "tip"
+
+MAX_WORKERS_DEFAULT = 16
+
+# Blocks a daemon may be behind the fleet's tip.
+MAX_LAG_DEFAULT = 2
+
+TARGET_DEFAULTS = (
+    URL_DEFAULT,
+    RPC_PORT_DEFAULT,
+    P2P_PORT_DEFAULT,
+    USER_DEFAULT,
+    PASSWD_DEFAULT,
+)
+
+
+def make_target(target):
+    """Complete a '(url, rpc_port, p2p_port, user, passwd)' target.
+
+    Missing trailing values are taken from the defaults, i.e. '("node",)'
+    becomes '("node", 18081, 18080, "", "")'.
+    """
+
+    if isinstance(target, str):
+        target = (target,)
+    target = tuple(target)
+    if len(target) > len(TARGET_DEFAULTS):
+        raise ValueError(f"Invalid target '{target}'.")
+
+    given = len(target)
+    return target + TARGET_DEFAULTS[given:]
+
+
+def target_key(target) -> str:
+    """Key a target by 'url:rpc_port'."""
+
+    url, rpc_port = make_target(target)[:2]
+    return f"{url}:{rpc_port}"
+
+
+def _check_target(target, consider_p2p, pool=None):
+    url, rpc_port, p2p_port, user, passwd = target
+    try:
+        return monero_health.daemon_combined_status_check(
+            url=url,
+            port=rpc_port,
+            p2p_port=p2p_port,
+            user=user,
+            passwd=passwd,
+            consider_p2p=consider_p2p,
+            pool=pool,
+        )
+    except Exception as e:
+        data = {"message": "Cannot determine status.", "error": str(e)}
+        _log(logging.ERROR, data)
+        return {"status": DAEMON_STATUS_UNKNOWN, "host": url, "error": data}
+
+
+def summarize(responses):
+    """Summarize an iterable of combined responses.
+
+    Consumes 'responses' without keeping them, the status is the worst
+    status of all responses.
+    """
+
+    summary = {
+        DAEMON_STATUS_OK: 0,
+        DAEMON_STATUS_UNKNOWN: 0,
+        DAEMON_STATUS_ERROR: 0,
+    }
+    hosts = 0
+    max_weight = -1
+    for response in responses:
+        status = response.get("status", DAEMON_STATUS_UNKNOWN)
+        summary[status] = summary.get(status, 0) + 1
+        max_weight = max(max_weight, DAEMON_STATUS_WEIGHTS_.get(status, -1))
+        hosts += 1
+
+    summary.update(
+        {"status": DAEMON_STATUS_WEIGHTS[max_weight], "hosts": hosts}
+    )
+
+    return summary
+
+
+def fleet_summary(results):
+    """Summarize the combined responses of a fleet.
+
+    The fleet status is the worst status of all hosts.
+    """
+
+    return summarize(results.values())
+
+
+def _imap_completed(func, items, max_workers=MAX_WORKERS_DEFAULT):
+    """Yield '(item, func(item))' in the order the calls complete.
+
+    Runs 'func' on a thread pool of at most 'max_workers' threads.
+    'items' is consumed lazily and at most 'max_workers' calls are pending
+    at any time, so memory use does not grow with the number of items.
+    """
+
+    items = iter(items)
+    max_workers = max(1, max_workers)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as executor:
+        pending = {
+            executor.submit(func, item): item
+            for item in itertools.islice(items, max_workers)
+        }
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                item = pending.pop(future)
+                for next_item in itertools.islice(items, 1):
+                    pending[executor.submit(func, next_item)] = next_item
+                yield item, future.result()
+
+
+def iter_fleet(
+    hosts,
+    max_workers=MAX_WORKERS_DEFAULT,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    pool=None,
+):
+    """Check the combined status of many daemons concurrently.
+
+    Like 'check_fleet', but yields '(url:rpc_port, response)' as soon as
+    the check of a daemon completes, i.e. in completion order.
+    'hosts' may be any iterable, e.g. the lines of a large file.
+    """
+
+    for target, response in _imap_completed(
+        lambda target: _check_target(target, consider_p2p, pool),
+        (make_target(target) for target in hosts),
+        max_workers=max_workers,
+    ):
+        yield target_key(target), response
+
+
+def check_fleet(
+    hosts,
+    max_workers=MAX_WORKERS_DEFAULT,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    pool=None,
+):
+    """Check the combined status of many daemons concurrently.
+
+    'hosts' is a list of '(url, rpc_port, p2p_port, user, passwd)' targets.
+    Runs 'daemon_combined_status_check' for every target on a thread pool
+    of at most 'max_workers' threads.
+    Uses the keep-alive connections of 'pool', if given.
+
+    Returns the combined responses keyed by 'url:rpc_port' and a fleet summary.
+    """
+
+    targets = [make_target(target) for target in hosts]
+    responses = dict(
+        iter_fleet(
+            targets,
+            max_workers=max_workers,
+            consider_p2p=consider_p2p,
+            pool=pool,
+        )
+    )
+    # In the order of 'hosts'.
+    keys = [target_key(target) for target in targets]
+    results = {key: responses[key] for key in keys}
+
+    summary = fleet_summary(results)
+
+    message = f"Fleet status is '{summary['status']}'."
+    data = {"message": message}
+    _log(logging.INFO, data)
+
+    return {FLEET_HOSTS_KEY: results, FLEET_SUMMARY_KEY: summary}
+
+
+def _get_tip(target, pool=None):
+    url, rpc_port, _, user, passwd = target
+    try:
+        session = None
+        if pool is not None:
+            session = pool.session(
+                url=url, port=rpc_port, user=user, passwd=passwd
+            )
+        response = monero_health.daemon_get_height(
+            session=session, url=url, port=rpc_port, user=user, passwd=passwd
+        )
+        return {
+            "height": int(response["height"]),
+            "hash": response.get("hash"),
+        }
+    except Exception as e:
+        data = {"message": "Cannot determine chain tip.", "error": str(e)}
+        _log(logging.ERROR, data)
+        return {"error": data}
+
+
+def majority_tip(tips):
+    """Get the '(height, hash)' reported by most daemons.
+
+    'tips' is an iterable of '(height, hash)'. Ties go to the highest tip.
+    Returns '(None, None)' without any tip.
+    """
+
+    counts = collections.Counter(tips)
+    if not counts:
+        return None, None
+    return max(counts, key=lambda tip: (counts[tip], tip[0]))
+
+
+def _tip_response(key, tip, majority, max_lag):
+    response = {"status": DAEMON_STATUS_UNKNOWN, "host": key}
+    if "error" in tip:
+        response["error"] = tip["error"]
+        return response
+
+    height, top_hash = majority
+    lag = height - tip["height"]
+    forked = lag == 0 and tip["hash"] != top_hash
+    lagging = lag > max_lag
+    response.update(
+        {
+            "status": (
+                DAEMON_STATUS_ERROR if forked or lagging else DAEMON_STATUS_OK
+            ),
+            "height": tip["height"],
+            "hash": tip["hash"],
+            "lag": lag,
+            "lagging": lagging,
+            "forked": forked,
+        }
+    )
+    return response
+
+
+def check_fleet_consensus(
+    hosts,
+    max_workers=MAX_WORKERS_DEFAULT,
+    max_lag=MAX_LAG_DEFAULT,
+    pool=None,
+):
+    """Compare the chain tips of many daemons.
+
+    Gets the height and top block hash ('/get_height') of every target
+    concurrently and determines the tip reported by most daemons.
+    A daemon is 'ERROR', if it is more than 'max_lag' blocks behind this
+    tip ('lagging') or at the same height with a different hash
+    ('forked'). This way a stalled or forked daemon is found before its
+    last block becomes older than 'OFFSET'.
+
+    Returns the responses keyed by 'url:rpc_port', the fleet summary and
+    the majority 'tip'.
+    """
+
+    targets = [make_target(target) for target in hosts]
+    tips = {
+        target_key(target): tip
+        for target, tip in _imap_completed(
+            lambda target: _get_tip(target, pool),
+            targets,
+            max_workers=max_workers,
+        )
+    }
+    majority = majority_tip(
+        (tip["height"], tip["hash"])
+        for tip in tips.values()
+        if "error" not in tip
+    )
+    height, top_hash = majority
+
+    keys = [target_key(target) for target in targets]
+    results = {
+        key: _tip_response(key, tips[key], majority, max_lag) for key in keys
+    }
+    summary = fleet_summary(results)
+    tip = {
+        "height": height,
+        "hash": top_hash,
+        "hosts": sum(
+            1
+            for response in results.values()
+            if response.get("lag") == 0 and not response.get("forked")
+        ),
+    }
+
+    message = (
+        f"Fleet tip is '{top_hash}' at height '{height}', "
+        f"status is '{summary['status']}'."
+    )
+    data = {"message": message}
+    _log(logging.INFO, data)
+
+    return {
+        FLEET_HOSTS_KEY: results,
+        FLEET_SUMMARY_KEY: summary,
+        FLEET_TIP_KEY: tip,
+    }
@@ -0,0 +1,261 @@
+"""Opt-in in-memory history of the health checks.
+
+Keeps the last 'size' results of every check per host in a fixed-size ring
+buffer. The results are stored as packed numeric arrays (timestamp, status
+weight, block age and latency in seconds), so a buffer does not grow and
+holds no response dicts.
+
+Answers questions like "how stale was this daemon over the last hour"
+without an external time series database:
+    history = CheckHistory()
+    check = history.wrap(daemon_last_block_check)
+    ...
+    history.stats("daemon_last_block_check", "node", 18081, window=3600)
+"""
+
+import array
+import math
+import threading
+import time
+
+from monero_health.monero_health import (
+    _get,
+    _respond,
+    LastBlockResult,
+    CombinedResult,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS,
+    DAEMON_STATUS_WEIGHTS_,
+)
+
+HISTORY_SIZE_DEFAULT = 1024
+
+_NAN = float("nan")
+
+
+class _Buffer:
+    """Ring buffer of the results of one check and host."""
+
+    __slots__ = (
+        "timestamps",
+        "stati",
+        "block_ages",
+        "latencies",
+        "index",
+        "count",
+    )
+
+    def __init__(self, size):
+        self.timestamps = array.array("d", bytes(8 * size))
+        self.stati = array.array("b", bytes(size))
+        # NaN, if unknown.
+        self.block_ages = array.array("d", [_NAN]) * size
+        self.latencies = array.array("d", [_NAN]) * size
+        # Next position to write.
+        self.index = 0
+        self.count = 0
+
+    def append(self, timestamp, status, block_age, latency):
+        i = self.index
+        self.timestamps[i] = timestamp
+        self.stati[i] = status
+        self.block_ages[i] = _NAN if block_age is None else block_age
+        self.latencies[i] = _NAN if latency is None else latency
+        self.index = (i + 1) % len(self.timestamps)
+        self.count = min(self.count + 1, len(self.timestamps))
+
+    def positions(self, since=None):
+        """Get the positions of the stored results, oldest first."""
+
+        size = len(self.timestamps)
+        start = (self.index - self.count) % size
+        positions = [(start + i) % size for i in range(self.count)]
+        if since is not None:
+            positions = [i for i in positions if self.timestamps[i] >= since]
+        return positions
+
+
+def _percentile(values, percentile):
+    """Nearest-rank percentile of the sorted 'values'."""
+
+    rank = math.ceil(percentile / 100 * len(values))
+    return values[max(0, rank - 1)]
+
+
+def _distribution(values):
+    values = sorted(value for value in values if not math.isnan(value))
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    return {
+        "p50": _percentile(values, 50),
+        "p95": _percentile(values, 95),
+        "max": values[-1],
+    }
+
+
+def _block_age(result):
+    """Get the last block's age of a result in seconds, 'None' if unknown."""
+
+    if isinstance(result, CombinedResult):
+        result = result.last_block
+    if (
+        not isinstance(result, LastBlockResult)
+        or result.block_timestamp is None
+    ):
+        return None
+    return result.check_timestamp - result.block_timestamp
+
+
+def _height(result):
+    if isinstance(result, CombinedResult):
+        result = result.last_block
+    if isinstance(result, LastBlockResult):
+        return result.height
+    return None
+
+
+class CheckHistory:
+    """Last 'size' results of every check keyed by '(check, url, port)'.
+
+    Every result is also appended to the 'store.HistoryStore' 'store', if
+    given.
+    """
+
+    def __init__(self, size=HISTORY_SIZE_DEFAULT, store=None):
+        self.size = int(size)
+        if self.size < 1:
+            raise ValueError(f"Invalid history size '{size}'.")
+        self.store = store
+        self._lock = threading.Lock()
+        self._buffers = {}
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def keys(self):
+        """Get the '(check, url, port)' keys with a history."""
+
+        with self._lock:
+            return list(self._buffers)
+
+    def record(
+        self,
+        check,
+        url,
+        port=None,
+        status=DAEMON_STATUS_UNKNOWN,
+        block_age=None,
+        latency=None,
+        timestamp=None,
+        height=None,
+    ):
+        """Record a single result.
+
+        'block_age' and 'latency' are seconds, 'timestamp' defaults to now
+        ('time.time()').
+        The 'height' is only kept by the 'store'.
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+        key = (check, url, None if port is None else int(port))
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = _Buffer(self.size)
+            buffer.append(
+                timestamp,
+                DAEMON_STATUS_WEIGHTS_.get(
+                    status, DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_UNKNOWN]
+                ),
+                block_age,
+                latency,
+            )
+        if self.store is not None:
+            self.store.append(
+                check,
+                url,
+                port=port,
+                status=status,
+                height=height,
+                block_age=block_age,
+                latency=latency,
+                timestamp=timestamp,
+            )
+
+    def record_result(self, check, result, latency=None, timestamp=None):
+        """Record a result ('_Result' or response dict) of 'check'."""
+
+        self.record(
+            check,
+            _get(result, "url", _get(result, "host")),
+            port=_get(result, "port"),
+            status=_get(result, "status", DAEMON_STATUS_UNKNOWN),
+            block_age=_block_age(result),
+            latency=latency,
+            timestamp=timestamp,
+            height=_height(result),
+        )
+
+    def call(self, check, **kwargs):
+        """Call 'check' with 'kwargs' and record its result and latency."""
+
+        as_dict = kwargs.pop("as_dict", True)
+        start = time.monotonic()
+        result = check(as_dict=False, **kwargs)
+        latency = time.monotonic() - start
+        self.record_result(
+            getattr(check, "__name__", repr(check)), result, latency=latency
+        )
+        return _respond(result, as_dict)
+
+    def wrap(self, check):
+        """Return a version of 'check' recording its results."""
+
+        def recorded_check(**kwargs):
+            return self.call(check, **kwargs)
+
+        recorded_check.__name__ = getattr(check, "__name__", "recorded_check")
+        recorded_check.__doc__ = getattr(check, "__doc__", None)
+
+        return recorded_check
+
+    def stats(self, check, url, port=None, window=None, now=None):
+        """Summarize the history of a check and host.
+
+        Considers the results of the last 'window' seconds, if given, all
+        stored results otherwise.
+        Returns the number of results ('samples'), the share of 'OK' results
+        ('uptime'), the worst status and p50/p95/max of the block age and
+        the latency in seconds ('None', if unknown).
+        """
+
+        key = (check, url, None if port is None else int(port))
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                positions = []
+            else:
+                since = None
+                if window is not None:
+                    since = (time.time() if now is None else now) - window
+                positions = buffer.positions(since=since)
+            stati = [buffer.stati[i] for i in positions]
+            block_ages = [buffer.block_ages[i] for i in positions]
+            latencies = [buffer.latencies[i] for i in positions]
+
+        ok = DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_OK]
+        return {
+            "samples": len(stati),
+            "uptime": stati.count(ok) / len(stati) if stati else None,
+            "status": DAEMON_STATUS_WEIGHTS[max(stati, default=-1)],
+            "block_age": _distribution(block_ages),
+            "latency": _distribution(latencies),
+        }
+
+    def clear(self):
+        """Remove all recorded results."""
+
+        with self._lock:
+            self._buffers.clear()
@@ -0,0 +1,423 @@
+"""Minimal Levin (Monero P2P protocol) client.
+
+Serializes and parses the portable storage format.
+
+Supports the probes used by 'daemon_p2p_status_check':
+* 'tcp': TCP connect, closed right away.
+* 'levin-header': Sends a 'COMMAND_HANDSHAKE' request and checks the Levin
+  signature of the first packet received.
+* 'handshake': Full 'COMMAND_HANDSHAKE', waits for the handshake response.
+
+References:
+* https://github.com/monero-project/monero/blob/master/docs/LEVIN_PROTOCOL.md
+* https://github.com/monero-project/monero/blob/master/docs/PORTABLE_STORAGE.md
+"""
+
+import os
+import socket
+import struct
+import time
+
+PROBE_DEPTH_TCP = "tcp"
+PROBE_DEPTH_LEVIN_HEADER = "levin-header"
+PROBE_DEPTH_HANDSHAKE = "handshake"
+PROBE_DEPTHS = (
+    PROBE_DEPTH_TCP,
+    PROBE_DEPTH_LEVIN_HEADER,
+    PROBE_DEPTH_HANDSHAKE,
+)
+
+# Seconds, same as 'monero_scripts.connect_to_node'.
+TIMEOUT_DEFAULT = 5
+
+LEVIN_SIGNATURE = 0x0101010101012101
+LEVIN_PROTOCOL_VERSION = 1
+LEVIN_PACKET_REQUEST = 0x00000001
+LEVIN_PACKET_RESPONSE = 0x00000002
+# signature, body size, expects response, command, return code, flags, protocol version
+LEVIN_HEADER = struct.Struct("<QQ?IiII")
+
+COMMAND_HANDSHAKE = 1001
+COMMAND_REQUEST_SUPPORT_FLAGS = 1007
+
+# Maximum number of packets to skip while waiting for the handshake response.
+MAX_PACKETS = 8
+# Maximum accepted body size of a packet, in bytes.
+MAX_BODY_SIZE = 8 * 1024 * 1024
+
+PORTABLE_STORAGE_SIGNATURE_A = 0x01011101
+PORTABLE_STORAGE_SIGNATURE_B = 0x01020101
+PORTABLE_STORAGE_FORMAT_VERSION = 1
+PORTABLE_STORAGE_HEADER = struct.Struct("<IIB")
+
+SERIALIZE_TYPE_INT64 = 1
+SERIALIZE_TYPE_INT32 = 2
+SERIALIZE_TYPE_INT16 = 3
+SERIALIZE_TYPE_INT8 = 4
+SERIALIZE_TYPE_UINT64 = 5
+SERIALIZE_TYPE_UINT32 = 6
+SERIALIZE_TYPE_UINT16 = 7
+SERIALIZE_TYPE_UINT8 = 8
+SERIALIZE_TYPE_DOUBLE = 9
+SERIALIZE_TYPE_STRING = 10
+SERIALIZE_TYPE_BOOL = 11
+SERIALIZE_TYPE_OBJECT = 12
+SERIALIZE_TYPE_ARRAY = 13
+SERIALIZE_FLAG_ARRAY = 0x80
+
+SERIALIZE_FORMATS = {
+    SERIALIZE_TYPE_INT64: struct.Struct("<q"),
+    SERIALIZE_TYPE_INT32: struct.Struct("<i"),
+    SERIALIZE_TYPE_INT16: struct.Struct("<h"),
+    SERIALIZE_TYPE_INT8: struct.Struct("<b"),
+    SERIALIZE_TYPE_UINT64: struct.Struct("<Q"),
+    SERIALIZE_TYPE_UINT32: struct.Struct("<I"),
+    SERIALIZE_TYPE_UINT16: struct.Struct("<H"),
+    SERIALIZE_TYPE_UINT8: struct.Struct("<B"),
+    SERIALIZE_TYPE_DOUBLE: struct.Struct("<d"),
+    SERIALIZE_TYPE_BOOL: struct.Struct("<?"),
+}
+
+NETWORK_MAINNET = "mainnet"
+NETWORK_TESTNET = "testnet"
+NETWORK_STAGENET = "stagenet"
+
+NETWORK_IDS = {
+    NETWORK_MAINNET: bytes.fromhex("1230f171610441611731008216a1a110"),
+    NETWORK_TESTNET: bytes.fromhex("1230f171610441611731008216a1a111"),
+    NETWORK_STAGENET: bytes.fromhex("1230f171610441611731008216a1a112"),
+}
+
+GENESIS_IDS = {
+    NETWORK_MAINNET: bytes.fromhex(
+        "418015bb9ae982a1975da7d79277c2705727a56894ba0fb246adaabb1f4632e3"
+    ),
+    NETWORK_TESTNET: bytes.fromhex(
+        "48ca7cd3c8de5b6a4d53d2861fbdaedca141553559f9be9520068053cda8430b"
+    ),
+    NETWORK_STAGENET: bytes.fromhex(
+        "76ee3cc98646292206cd3e86f74d88b4dcc1d937088645e9b0cbca84b7ce74eb"
+    ),
+}
+
+
+class LevinError(ConnectionError):
+    """The peer does not speak the Levin protocol as expected."""
+
+
+def pack_varint(value: int) -> bytes:
+    """Pack a portable storage varint, the lowest 2 bits encode its size."""
+
+    if value < 1 << 6:
+        return struct.pack("<B", value << 2)
+    if value < 1 << 14:
+        return struct.pack("<H", value << 2 | 1)
+    if value < 1 << 30:
+        return struct.pack("<I", value << 2 | 2)
+    return struct.pack("<Q", value << 2 | 3)
+
+
+def _pack_value(value) -> bytes:
+    """Pack a typed value.
+
+    'bytes' and 'str' are packed as string, 'dict' as object, 'list' as
+    array, 'bool' as bool, numbers have to be given as
+    '(SERIALIZE_TYPE_*, value)'.
+    """
+
+    if isinstance(value, bool):
+        return bytes((SERIALIZE_TYPE_BOOL, value))
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, bytes):
+        return (
+            bytes((SERIALIZE_TYPE_STRING,)) + pack_varint(len(value)) + value
+        )
+    if isinstance(value, dict):
+        return bytes((SERIALIZE_TYPE_OBJECT,)) + _pack_section(value)
+    if isinstance(value, list):
+        # Array items share the type of the first item and omit the type byte.
+        items = [_pack_value(item) for item in value]
+        type_ = items[0][0] if items else SERIALIZE_TYPE_OBJECT
+        return (
+            bytes((type_ | SERIALIZE_FLAG_ARRAY,))
+            + pack_varint(len(items))
+            + b"".join(item[1:] for item in items)
+        )
+    type_, value = value
+    return bytes((type_,)) + SERIALIZE_FORMATS[type_].pack(value)
+
+
+def _pack_section(section: dict) -> bytes:
+    packed = [pack_varint(len(section))]
+    for name, value in section.items():
+        name = name.encode("ascii")
+        packed += [bytes((len(name),)), name, _pack_value(value)]
+    return b"".join(packed)
+
+
+def pack_storage(section: dict) -> bytes:
+    """Serialize a section to the portable storage format."""
+
+    return (
+        PORTABLE_STORAGE_HEADER.pack(
+            PORTABLE_STORAGE_SIGNATURE_A,
+            PORTABLE_STORAGE_SIGNATURE_B,
+            PORTABLE_STORAGE_FORMAT_VERSION,
+        )
+        + _pack_section(section)
+    )
+
+
+def pack_packet(
+    command,
+    body=b"",
+    expects_response=True,
+    flags=LEVIN_PACKET_REQUEST,
+    return_code=0,
+) -> bytes:
+    """Prefix a body with a Levin header."""
+
+    return (
+        LEVIN_HEADER.pack(
+            LEVIN_SIGNATURE,
+            len(body),
+            expects_response,
+            command,
+            return_code,
+            flags,
+            LEVIN_PROTOCOL_VERSION,
+        )
+        + body
+    )
+
+
+def handshake_request(network=NETWORK_MAINNET, peer_id=None) -> bytes:
+    """Build a 'COMMAND_HANDSHAKE' request packet.
+
+    Announces the genesis block as top block and no P2P port, so the daemon
+    neither tries to sync from nor to connect back to the prober.
+    """
+
+    if peer_id is None:
+        peer_id = int.from_bytes(os.urandom(8), "little")
+    body = pack_storage(
+        {
+            "node_data": {
+                "network_id": NETWORK_IDS[network],
+                "my_port": (SERIALIZE_TYPE_UINT32, 0),
+                "rpc_port": (SERIALIZE_TYPE_UINT16, 0),
+                "rpc_credits_per_hash": (SERIALIZE_TYPE_UINT32, 0),
+                "peer_id": (SERIALIZE_TYPE_UINT64, peer_id),
+                "support_flags": (SERIALIZE_TYPE_UINT32, 1),
+            },
+            "payload_data": {
+                "current_height": (SERIALIZE_TYPE_UINT64, 1),
+                "cumulative_difficulty": (SERIALIZE_TYPE_UINT64, 1),
+                "cumulative_difficulty_top64": (SERIALIZE_TYPE_UINT64, 0),
+                "top_id": GENESIS_IDS[network],
+                "top_version": (SERIALIZE_TYPE_UINT8, 1),
+                "pruning_seed": (SERIALIZE_TYPE_UINT32, 0),
+            },
+        }
+    )
+    return pack_packet(COMMAND_HANDSHAKE, body)
+
+
+def _unpack_varint(view, offset):
+    size = 1 << (view[offset] & 0x03)
+    if offset + size > len(view):
+        raise LevinError("Truncated portable storage varint.")
+    end = offset + size
+    value = int.from_bytes(view[offset:end], "little")
+    return value >> 2, end
+
+
+def _unpack_value(view, offset, type_):
+    if type_ & SERIALIZE_FLAG_ARRAY:
+        count, offset = _unpack_varint(view, offset)
+        items = []
+        for _ in range(count):
+            item, offset = _unpack_value(
+                view, offset, type_ & ~SERIALIZE_FLAG_ARRAY
+            )
+            items.append(item)
+        return items, offset
+    if type_ == SERIALIZE_TYPE_STRING:
+        size, offset = _unpack_varint(view, offset)
+        if offset + size > len(view):
+            raise LevinError("Truncated portable storage string.")
+        end = offset + size
+        # Slice of the received buffer, not a copy.
+        return view[offset:end], end
+    if type_ == SERIALIZE_TYPE_OBJECT:
+        return _unpack_section(view, offset)
+    if type_ == SERIALIZE_TYPE_ARRAY:
+        return _unpack_value(view, offset + 1, view[offset])
+
+    format_ = SERIALIZE_FORMATS.get(type_)
+    if format_ is None:
+        raise LevinError(f"Unknown portable storage type '{type_}'.")
+    (value,) = format_.unpack_from(view, offset)
+    return value, offset + format_.size
+
+
+def _unpack_section(view, offset):
+    section = {}
+    count, offset = _unpack_varint(view, offset)
+    for _ in range(count):
+        start, end = offset + 1, offset + 1 + view[offset]
+        name = bytes(view[start:end]).decode("ascii")
+        offset = end
+        section[name], offset = _unpack_value(view, offset + 1, view[offset])
+    return section, offset
+
+
+def unpack_storage(buffer) -> dict:
+    """Deserialize a section in the portable storage format.
+
+    Parses a 'memoryview' of 'buffer', strings are returned as 'memoryview'
+    slices of 'buffer' without copying.
+    """
+
+    view = memoryview(buffer)
+    try:
+        if PORTABLE_STORAGE_HEADER.unpack_from(view) != (
+            PORTABLE_STORAGE_SIGNATURE_A,
+            PORTABLE_STORAGE_SIGNATURE_B,
+            PORTABLE_STORAGE_FORMAT_VERSION,
+        ):
+            raise LevinError("Invalid portable storage signature.")
+        section, _ = _unpack_section(view, PORTABLE_STORAGE_HEADER.size)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise LevinError(f"Invalid portable storage: '{str(e)}'.")
+    return section
+
+
+def handshake_info(body) -> dict:
+    """Get the daemon's chain data of a handshake response body.
+
+    Returns the hard fork version of the top block ('version'), the chain
+    height ('height') and the top block hash ('hash').
+    """
+
+    try:
+        payload = unpack_storage(body)["payload_data"]
+        return {
+            "version": payload["top_version"],
+            "height": payload["current_height"],
+            "hash": payload["top_id"].hex(),
+        }
+    except (KeyError, TypeError, AttributeError) as e:
+        raise LevinError(f"Invalid handshake response, missing '{str(e)}'.")
+
+
+def recv_exactly(sock, size, expires=None) -> bytearray:
+    """Receive exactly 'size' bytes.
+
+    Raises 'socket.timeout' after the 'time.monotonic()' timestamp 'expires'.
+    """
+
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        if expires is not None:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            sock.settimeout(remaining)
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            raise LevinError(
+                f"Connection closed after {received} of {size} bytes."
+            )
+        received += count
+    return buffer
+
+
+def read_header(sock, expires=None):
+    """Read a Levin header and check its signature.
+
+    Returns '(body size, expects response, command, return code, flags, protocol version)'.
+    """
+
+    (signature, *header) = LEVIN_HEADER.unpack(
+        recv_exactly(sock, LEVIN_HEADER.size, expires=expires)
+    )
+    if signature != LEVIN_SIGNATURE:
+        raise LevinError(f"Invalid Levin signature '{signature:#018x}'.")
+    return header
+
+
+def read_handshake_response(
+    sock, max_packets=MAX_PACKETS, expires=None
+) -> bytearray:
+    """Read packets until the handshake response, return its body.
+
+    Requests the daemon sends in the meantime (e.g. support flags) are skipped.
+    """
+
+    for _ in range(max_packets):
+        size, _, command, return_code, flags, _ = read_header(
+            sock, expires=expires
+        )
+        if size > MAX_BODY_SIZE:
+            raise LevinError(f"Levin packet too large '{size}' bytes.")
+        body = recv_exactly(sock, size, expires=expires)
+        if command == COMMAND_HANDSHAKE and flags & LEVIN_PACKET_RESPONSE:
+            if return_code < 0:
+                raise LevinError(
+                    f"Handshake failed with return code '{return_code}'."
+                )
+            return body
+
+    raise LevinError(f"No handshake response within {max_packets} packets.")
+
+
+def _connect(node, timeout):
+    return socket.create_connection((node[0], int(node[1])), timeout=timeout)
+
+
+def _close(sock, reset=False):
+    if reset:
+        # Close with RST right away, the prober does not keep TIME_WAIT sockets.
+        sock.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+        )
+    sock.close()
+
+
+def probe(
+    node,
+    depth=PROBE_DEPTH_TCP,
+    timeout=TIMEOUT_DEFAULT,
+    network=NETWORK_MAINNET,
+):
+    """Probe a daemon's P2P port to the given depth within 'timeout' seconds.
+
+    Returns the body of the handshake response for the depth 'handshake',
+    'None' otherwise.
+    Raises 'ConnectionError' (including 'LevinError') if the peer refused,
+    aborted or does not speak Levin, other 'OSError' (e.g. timeouts) if
+    the status cannot be determined.
+    """
+
+    if depth not in PROBE_DEPTHS:
+        raise ValueError(f"Unknown P2P probe depth '{depth}'.")
+
+    expires = time.monotonic() + timeout
+    sock = _connect(node, timeout)
+    if depth == PROBE_DEPTH_TCP:
+        _close(sock, reset=True)
+        return None
+
+    try:
+        sock.settimeout(max(0.001, expires - time.monotonic()))
+        sock.sendall(handshake_request(network=network))
+        if depth == PROBE_DEPTH_LEVIN_HEADER:
+            read_header(sock, expires=expires)
+            return None
+        return read_handshake_response(sock, expires=expires)
+    finally:
+        _close(sock)
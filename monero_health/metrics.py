@@ -0,0 +1,242 @@
+"""Prometheus metrics for the health checks.
+
+Renders the Prometheus text exposition format without any additional
+dependency:
+* 'monero_health_status': Status per host and check, mapped through
+  'DAEMON_STATUS_WEIGHTS_' (0: OK, 1: UNKNOWN, 2: ERROR).
+* 'monero_health_last_block_age_seconds': Age of the last block per host.
+* 'monero_health_sync_lag_blocks': Blocks behind the target height per host.
+* 'monero_health_hard_fork_version': Hard fork version per host.
+* 'monero_health_request_duration_seconds': Histogram of the duration of
+  the daemon requests ('get_last_block_header', 'hard_fork_info', 'batch',
+  'p2p_connect') per host.
+
+With 'sync=True' the combined responses contain the sync status instead of
+the last block: The sync lag replaces the last block age and the hard fork
+version is only known from a P2P 'handshake' probe.
+
+The request durations are only collected after 'enable()'.
+"""
+
+import datetime
+import threading
+
+from monero_health import monero_health
+from monero_health.monero_health import (
+    LAST_BLOCK_KEY,
+    SYNC_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+    HEALTH_KEY,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS_,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds.
+BUCKETS_DEFAULT = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _labels(**labels) -> str:
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()
+    )
+
+
+def _value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _block_age(last_block):
+    """Get the last block's age in seconds, 'None' if unknown."""
+
+    try:
+        return (
+            datetime.datetime.fromisoformat(last_block["check_timestamp"])
+            - datetime.datetime.fromisoformat(last_block["block_timestamp"])
+        ).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _sync_lag(response):
+    """Get the blocks behind the target height, 'None' if unknown."""
+
+    lag = (response.get(SYNC_KEY) or {}).get("lag", -1)
+    return lag if lag >= 0 else None
+
+
+def _hard_fork_version(response):
+    """Get the hard fork version, 'None' if unknown."""
+
+    version = response.get(DAEMON_KEY, {}).get("version", -1)
+    return version if version is not None and version >= 0 else None
+
+
+def _gauge(name, help_, values):
+    """Render a gauge of '(host, value)' pairs, skipping unknown values."""
+
+    lines = [f"# HELP {name} {help_}", f"# TYPE {name} gauge"]
+    for host, value in values:
+        if value is not None:
+            lines.append(f"{name}{{{_labels(host=host)}}} {_value(value)}")
+    return lines
+
+
+def _status(response):
+    return DAEMON_STATUS_WEIGHTS_.get(
+        response.get("status"), DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_UNKNOWN]
+    )
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=BUCKETS_DEFAULT):
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Collects request durations and renders the metrics of check responses."""
+
+    def __init__(self, buckets=BUCKETS_DEFAULT):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (call, host) -> Histogram
+        self._histograms = {}
+
+    def observe(self, call, host, seconds):
+        """Latency observer, see 'monero_health.add_latency_observer'."""
+
+        with self._lock:
+            histogram = self._histograms.get((call, host))
+            if histogram is None:
+                histogram = self._histograms[(call, host)] = Histogram(
+                    self.buckets
+                )
+            histogram.observe(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self, responses=None) -> str:
+        """Render the Prometheus text format.
+
+        'responses' are responses of 'daemon_combined_status_check' keyed by host.
+        """
+
+        responses = responses if responses else {}
+        lines = [
+            "# HELP monero_health_status Health status (0: OK, 1: UNKNOWN, 2: ERROR).",
+            "# TYPE monero_health_status gauge",
+        ]
+        for host, response in responses.items():
+            daemon = response.get(DAEMON_KEY, {})
+            stati = (
+                (HEALTH_KEY, response),
+                (LAST_BLOCK_KEY, response.get(LAST_BLOCK_KEY)),
+                (SYNC_KEY, response.get(SYNC_KEY)),
+                (DAEMON_RPC_KEY, daemon.get(DAEMON_RPC_KEY)),
+                (DAEMON_P2P_KEY, daemon.get(DAEMON_P2P_KEY)),
+            )
+            for check, result in stati:
+                if result is not None:
+                    lines.append(
+                        f"monero_health_status{{{_labels(host=host, check=check)}}} {_status(result)}"
+                    )
+
+        lines += _gauge(
+            "monero_health_last_block_age_seconds",
+            "Age of the last block.",
+            (
+                (host, _block_age(response.get(LAST_BLOCK_KEY, {})))
+                for host, response in responses.items()
+            ),
+        )
+        lines += _gauge(
+            "monero_health_sync_lag_blocks",
+            "Blocks behind the target height.",
+            (
+                (host, _sync_lag(response))
+                for host, response in responses.items()
+            ),
+        )
+        lines += _gauge(
+            "monero_health_hard_fork_version",
+            "Hard fork version.",
+            (
+                (host, _hard_fork_version(response))
+                for host, response in responses.items()
+            ),
+        )
+
+        lines += [
+            "# HELP monero_health_request_duration_seconds Duration of daemon requests.",
+            "# TYPE monero_health_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            for (call, host), histogram in histograms:
+                labels = _labels(host=host, call=call)
+                for bucket, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(
+                        f'monero_health_request_duration_seconds_bucket{{{labels},le="{_value(bucket)}"}} {count}'
+                    )
+                lines += [
+                    f"monero_health_request_duration_seconds_sum{{{labels}}} {_value(histogram.sum)}",
+                    f"monero_health_request_duration_seconds_count{{{labels}}} {histogram.count}",
+                ]
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def enable(registry=REGISTRY):
+    """Collect the request durations of all checks in 'registry'."""
+
+    monero_health.add_latency_observer(registry.observe)
+
+
+def disable(registry=REGISTRY):
+    monero_health.remove_latency_observer(registry.observe)
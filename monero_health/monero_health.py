@@ -3,22 +3,119 @@ import datetime
 import os
 import sys
 import json
-from distutils.util import strtobool
-
-from monerorpc.authproxy import (
-    AuthServiceProxy,
-    JSONRPCException,
-    HTTP_TIMEOUT as MONERO_RPC_HTTP_TIMEOUT,
+import decimal
+import collections
+import dataclasses
+import concurrent.futures
+import contextlib
+import functools
+import threading
+import time
+
+from monero_health import levin
+
+# Imported on first use by '_load', importing the module stays cheap.
+_LAZY_NAMES = (
+    "AuthServiceProxy",
+    "JSONRPCException",
+    "MONERO_RPC_MAX_RETRIES",
+    "MONERO_RPC_USER_AGENT",
+    "Session",
+    "codes",
+    "HTTPAdapter",
+    "HTTPDigestAuth",
+    "RequestException",
+    "connect_to_node",
 )
-from requests.exceptions import RequestException
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def _load():
+    """Import 'monerorpc', 'requests' and 'monero_scripts'.
+
+    The names become module globals, like eager imports, so they can be
+    patched ('mock.patch("monero_health.monero_health.AuthServiceProxy")').
+    Called at the beginning of every function using them.
+    """
+
+    global _loaded, AuthServiceProxy, JSONRPCException
+    global MONERO_RPC_MAX_RETRIES, MONERO_RPC_USER_AGENT
+    global Session, codes, HTTPAdapter, HTTPDigestAuth, RequestException
+    global connect_to_node
+
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        from monerorpc.authproxy import (
+            AuthServiceProxy,
+            JSONRPCException,
+            MAX_RETRIES as MONERO_RPC_MAX_RETRIES,
+            USER_AGENT as MONERO_RPC_USER_AGENT,
+        )
+        from requests import Session, codes
+        from requests.adapters import HTTPAdapter
+        from requests.auth import HTTPDigestAuth
+        from requests.exceptions import RequestException
+
+        from monero_scripts import connect_to_node
 
-from monero_scripts import connect_to_node
+        _loaded = True
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES and not _loaded:
+        _load()
+        return globals()[name]
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+# Possible values: 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'.
+LOG_LEVEL_DEFAULT = "DEBUG"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", LOG_LEVEL_DEFAULT).upper()
 
-logging.basicConfig()
 logger = logging.getLogger("DaemonHealth")
-logger.setLevel(logging.DEBUG)
+try:
+    logger.setLevel(LOG_LEVEL)
+except ValueError:
+    logger.setLevel(LOG_LEVEL_DEFAULT)
 # logging.getLogger("MoneroRPC").setLevel(logging.DEBUG)
 
+
+# The record points to the caller of '_log', 'stacklevel' needs Python 3.8.
+_LOG_KWARGS = {"stacklevel": 3} if sys.version_info >= (3, 8) else {}
+
+
+def _log_json(level, data):
+    """Log 'data' as JSON message, the default log hook."""
+
+    logger.log(level, json.dumps(data), **_LOG_KWARGS)
+
+
+_log_hook = _log_json
+
+
+def set_log_hook(hook=None):
+    """Send the structured log records to 'hook(level, data)'.
+
+    'data' is the dict otherwise logged as JSON message, e.g.
+    '{"message": "Cannot determine status.", "error": "..."}'.
+    Logs JSON messages again, if 'hook' is None.
+    """
+
+    global _log_hook
+    _log_hook = hook if hook is not None else _log_json
+
+
+def _log(level, data):
+    """Log 'data' through the log hook, if 'level' is enabled."""
+
+    if logger.isEnabledFor(level):
+        _log_hook(level, data)
+
+
 URL_DEFAULT = "127.0.0.1"
 RPC_PORT_DEFAULT = 18081
 P2P_PORT_DEFAULT = 18080
@@ -28,32 +125,150 @@ PASSWD_DEFAULT = ""  # nosec
 OFFSET_DEFAULT = 12
 # Possible values: https://docs.python.org/2/library/datetime.html#timedelta-objects
 OFFSET_UNIT_DEFAULT = "minutes"
-HTTP_TIMEOUT_DEFAULT = MONERO_RPC_HTTP_TIMEOUT
+# Same as 'monerorpc.authproxy.HTTP_TIMEOUT'.
+HTTP_TIMEOUT_DEFAULT = 30
+
+
+def _strtobool(value) -> int:
+    """Convert a string representation of truth to 1 or 0.
+
+    Same as the deprecated 'distutils.util.strtobool', which takes longer to
+    import than all of the checks.
+    Raises 'ValueError' if 'value' is anything else.
+    """
+
+    value = value.lower()
+    if value in ("y", "yes", "t", "true", "on", "1"):
+        return 1
+    if value in ("n", "no", "f", "false", "off", "0"):
+        return 0
+    raise ValueError(f"Invalid truth value '{value}'.")
+
+
+def _env_int(name, default):
+    """Get an integer environment variable, 'default' if not set or invalid."""
+
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    """Get a float environment variable, 'default' if not set or invalid."""
+
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    """Get a boolean environment variable, 'default' if not set or invalid."""
+
+    try:
+        return bool(_strtobool(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
 
 URL = os.environ.get("MONEROD_URL", URL_DEFAULT)
-RPC_PORT = os.environ.get("MONEROD_RPC_PORT", RPC_PORT_DEFAULT)
-P2P_PORT = os.environ.get("MONEROD_P2P_PORT", P2P_PORT_DEFAULT)
+RPC_PORT = _env_int("MONEROD_RPC_PORT", RPC_PORT_DEFAULT)
+P2P_PORT = _env_int("MONEROD_P2P_PORT", P2P_PORT_DEFAULT)
 USER = os.environ.get("MONEROD_RPC_USER", USER_DEFAULT)
 PASSWD = os.environ.get("MONEROD_RPC_PASSWORD", PASSWD_DEFAULT)
-OFFSET = os.environ.get("OFFSET", OFFSET_DEFAULT)
+OFFSET = _env_int("OFFSET", OFFSET_DEFAULT)
 OFFSET_UNIT = os.environ.get("OFFSET_UNIT", OFFSET_UNIT_DEFAULT)
-HTTP_TIMEOUT = os.environ.get("HTTP_TIMEOUT", HTTP_TIMEOUT_DEFAULT)
+# Seconds.
+HTTP_TIMEOUT = _env_float("HTTP_TIMEOUT", HTTP_TIMEOUT_DEFAULT)
 
 CONSIDER_P2P_STATUS_DEFAULT = False
-try:
-    # https://docs.python.org/3/distutils/apiref.html#distutils.util.strtobool
-    CONSIDER_P2P_STATUS = bool(
-        strtobool(
-            os.environ.get(
-                "CONSIDER_P2P_STATUS", str(CONSIDER_P2P_STATUS_DEFAULT)
-            )
-        )
-    )
-except ValueError:
-    CONSIDER_P2P_STATUS = CONSIDER_P2P_STATUS_DEFAULT
+CONSIDER_P2P_STATUS = _env_bool(
+    "CONSIDER_P2P_STATUS", CONSIDER_P2P_STATUS_DEFAULT
+)
+
+USE_CONNECTION_POOL_DEFAULT = False
+USE_CONNECTION_POOL = _env_bool(
+    "USE_CONNECTION_POOL", USE_CONNECTION_POOL_DEFAULT
+)
+USE_CIRCUIT_BREAKER_DEFAULT = False
+USE_CIRCUIT_BREAKER = _env_bool(
+    "USE_CIRCUIT_BREAKER", USE_CIRCUIT_BREAKER_DEFAULT
+)
+CIRCUIT_BREAKER_FAILURES_DEFAULT = 3
+# Seconds.
+CIRCUIT_BREAKER_COOLDOWN_DEFAULT = 30
+CIRCUIT_BREAKER_FAILURES = _env_int(
+    "CIRCUIT_BREAKER_FAILURES", CIRCUIT_BREAKER_FAILURES_DEFAULT
+)
+CIRCUIT_BREAKER_COOLDOWN = _env_float(
+    "CIRCUIT_BREAKER_COOLDOWN", CIRCUIT_BREAKER_COOLDOWN_DEFAULT
+)
+INCREMENTAL_LAST_BLOCK_DEFAULT = False
+INCREMENTAL_LAST_BLOCK = _env_bool(
+    "INCREMENTAL_LAST_BLOCK", INCREMENTAL_LAST_BLOCK_DEFAULT
+)
+PARALLEL_CHECKS_DEFAULT = True
+PARALLEL_CHECKS = _env_bool("PARALLEL_CHECKS", PARALLEL_CHECKS_DEFAULT)
+# Worker threads shared by all parallel checks.
+PARALLEL_CHECKS_WORKERS_DEFAULT = 128
+PARALLEL_CHECKS_WORKERS = _env_int(
+    "PARALLEL_CHECKS_WORKERS", PARALLEL_CHECKS_WORKERS_DEFAULT
+)
+CONNECTION_POOL_SIZE_DEFAULT = 64
+# Seconds.
+CONNECTION_POOL_IDLE_DEFAULT = 60
+CONNECTION_POOL_SIZE = _env_int(
+    "CONNECTION_POOL_SIZE", CONNECTION_POOL_SIZE_DEFAULT
+)
+CONNECTION_POOL_IDLE = _env_float(
+    "CONNECTION_POOL_IDLE", CONNECTION_POOL_IDLE_DEFAULT
+)
+
+# Possible values: 'tcp', 'levin-header', 'handshake'.
+# Not set: 'monero_scripts.connect_to_node' checks the connectivity.
+P2P_PROBE_DEPTH_DEFAULT = None
+# Possible values: 'mainnet', 'testnet', 'stagenet'.
+NETWORK_DEFAULT = levin.NETWORK_MAINNET
+P2P_PROBE_DEPTH = os.environ.get("P2P_PROBE_DEPTH", P2P_PROBE_DEPTH_DEFAULT)
+NETWORK = os.environ.get("MONEROD_NETWORK", NETWORK_DEFAULT)
+
+HEALTH_SERVER_ADDRESS_DEFAULT = "127.0.0.1"
+HEALTH_SERVER_PORT_DEFAULT = 8080
+# Seconds.
+HEALTH_POLL_INTERVAL_DEFAULT = 5
+HEALTH_SERVER_ADDRESS = os.environ.get(
+    "HEALTH_SERVER_ADDRESS", HEALTH_SERVER_ADDRESS_DEFAULT
+)
+HEALTH_SERVER_PORT = _env_int("HEALTH_SERVER_PORT", HEALTH_SERVER_PORT_DEFAULT)
+HEALTH_POLL_INTERVAL = _env_float(
+    "HEALTH_POLL_INTERVAL", HEALTH_POLL_INTERVAL_DEFAULT
+)
+
+# Seconds.
+WATCH_MIN_INTERVAL_DEFAULT = 1
+WATCH_MAX_INTERVAL_DEFAULT = 60
+WATCH_BACKOFF_DEFAULT = 2
+WATCH_MIN_INTERVAL = _env_float(
+    "WATCH_MIN_INTERVAL", WATCH_MIN_INTERVAL_DEFAULT
+)
+WATCH_MAX_INTERVAL = _env_float(
+    "WATCH_MAX_INTERVAL", WATCH_MAX_INTERVAL_DEFAULT
+)
+WATCH_BACKOFF = _env_float("WATCH_BACKOFF", WATCH_BACKOFF_DEFAULT)
+
+# Blocks behind the target height.
+SYNC_MAX_LAG_DEFAULT = 2
+# Incoming and outgoing P2P connections.
+SYNC_MIN_CONNECTIONS_DEFAULT = 1
+SYNC_MAX_LAG = _env_int("SYNC_MAX_LAG", SYNC_MAX_LAG_DEFAULT)
+SYNC_MIN_CONNECTIONS = _env_int(
+    "SYNC_MIN_CONNECTIONS", SYNC_MIN_CONNECTIONS_DEFAULT
+)
 
 HEALTH_KEY = "health"
 LAST_BLOCK_KEY = "last_block"
+SYNC_KEY = "sync"
 DAEMON_KEY = "monerod"
 DAEMON_P2P_KEY = "p2p"
 DAEMON_RPC_KEY = "rpc"
@@ -76,14 +291,156 @@ DAEMON_STATUS_WEIGHTS_ = {
 }
 
 
+@dataclasses.dataclass(frozen=True)
+class HealthConfig:
+    """Validated, immutable configuration of the checks.
+
+    Every check accepts it as 'config', its settings replace the ones given
+    as arguments ('url', 'port', 'offset', ...).
+    'offset_delta' is computed once from 'offset' and 'offset_unit'.
+
+    Raises 'ValueError' for invalid settings.
+    """
+
+    url: str = URL_DEFAULT
+    rpc_port: int = RPC_PORT_DEFAULT
+    p2p_port: int = P2P_PORT_DEFAULT
+    user: str = USER_DEFAULT
+    passwd: str = dataclasses.field(default=PASSWD_DEFAULT, repr=False)
+    offset: int = OFFSET_DEFAULT
+    offset_unit: str = OFFSET_UNIT_DEFAULT
+    # Seconds.
+    http_timeout: float = HTTP_TIMEOUT_DEFAULT
+    consider_p2p: bool = CONSIDER_P2P_STATUS_DEFAULT
+    p2p_depth: str = P2P_PROBE_DEPTH_DEFAULT
+    network: str = NETWORK_DEFAULT
+    sync_max_lag: int = SYNC_MAX_LAG_DEFAULT
+    sync_min_connections: int = SYNC_MIN_CONNECTIONS_DEFAULT
+    offset_delta: datetime.timedelta = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        # Frozen, set the converted values once.
+        set_ = functools.partial(object.__setattr__, self)
+
+        self._validate_ports(set_)
+        self._validate_offset(set_)
+
+        http_timeout = float(self.http_timeout)
+        if not http_timeout > 0:
+            raise ValueError(f"Invalid HTTP timeout '{http_timeout}'.")
+        set_("http_timeout", http_timeout)
+
+        self._validate_p2p(set_)
+        self._validate_sync(set_)
+
+    def _validate_ports(self, set_):
+        for name in ("rpc_port", "p2p_port"):
+            port = int(getattr(self, name))
+            if not 0 < port < 65536:
+                raise ValueError(f"Invalid port '{port}' ('{name}').")
+            set_(name, port)
+
+    def _validate_offset(self, set_):
+        offset = int(self.offset)
+        if offset < 0:
+            raise ValueError(f"Invalid offset '{offset}'.")
+        try:
+            offset_delta = datetime.timedelta(**{self.offset_unit: offset})
+        except (TypeError) as e:
+            raise ValueError(
+                f"Invalid offset unit '{self.offset_unit}': '{str(e)}'."
+            )
+        set_("offset", offset)
+        set_("offset_delta", offset_delta)
+
+    def _validate_p2p(self, set_):
+        if self.p2p_depth and self.p2p_depth not in levin.PROBE_DEPTHS:
+            raise ValueError(f"Invalid P2P probe depth '{self.p2p_depth}'.")
+        if self.network not in levin.NETWORK_IDS:
+            raise ValueError(f"Invalid network '{self.network}'.")
+        set_("consider_p2p", bool(self.consider_p2p))
+
+    def _validate_sync(self, set_):
+        for name in ("sync_max_lag", "sync_min_connections"):
+            value = int(getattr(self, name))
+            if value < 0:
+                raise ValueError(f"Invalid '{name}' '{value}'.")
+            set_(name, value)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """Build the configuration from the environment variables.
+
+        Reads 'os.environ' by default, when called and not at import.
+        """
+
+        environ = os.environ if environ is None else environ
+
+        return cls(
+            url=environ.get("MONEROD_URL", URL_DEFAULT),
+            rpc_port=environ.get("MONEROD_RPC_PORT", RPC_PORT_DEFAULT),
+            p2p_port=environ.get("MONEROD_P2P_PORT", P2P_PORT_DEFAULT),
+            user=environ.get("MONEROD_RPC_USER", USER_DEFAULT),
+            passwd=environ.get("MONEROD_RPC_PASSWORD", PASSWD_DEFAULT),
+            offset=environ.get("OFFSET", OFFSET_DEFAULT),
+            offset_unit=environ.get("OFFSET_UNIT", OFFSET_UNIT_DEFAULT),
+            http_timeout=environ.get("HTTP_TIMEOUT", HTTP_TIMEOUT_DEFAULT),
+            consider_p2p=_strtobool(
+                environ.get(
+                    "CONSIDER_P2P_STATUS", str(CONSIDER_P2P_STATUS_DEFAULT)
+                )
+            ),
+            p2p_depth=environ.get("P2P_PROBE_DEPTH", P2P_PROBE_DEPTH_DEFAULT),
+            network=environ.get("MONEROD_NETWORK", NETWORK_DEFAULT),
+            sync_max_lag=environ.get("SYNC_MAX_LAG", SYNC_MAX_LAG_DEFAULT),
+            sync_min_connections=environ.get(
+                "SYNC_MIN_CONNECTIONS", SYNC_MIN_CONNECTIONS_DEFAULT
+            ),
+        )
+
+
+# Check argument -> 'HealthConfig' field, if named differently.
+_CONFIG_FIELDS = {
+    "delta": "offset_delta",
+    "depth": "p2p_depth",
+    "max_lag": "sync_max_lag",
+    "min_connections": "sync_min_connections",
+}
+
+
+def _configure(config, port_field="rpc_port", **settings):
+    """Get the settings of a check from the 'HealthConfig' 'config'.
+
+    'settings' are the check's arguments, e.g. 'url=url, port=port'. Their
+    values are replaced by the ones of 'config', if given. 'port' is the
+    'port_field' of 'config'.
+    Returns the values in the order of 'settings'.
+    """
+
+    if config is None:
+        return tuple(settings.values())
+    fields = dict(_CONFIG_FIELDS, port=port_field)
+    return tuple(getattr(config, fields.get(name, name)) for name in settings)
+
+
 def is_timestamp_within_offset(
-    timestamp=None, now=None, offset: int = OFFSET, offset_unit=OFFSET_UNIT
+    timestamp=None,
+    now=None,
+    offset: int = OFFSET,
+    offset_unit=OFFSET_UNIT,
+    delta=None,
 ) -> bool:
     if not timestamp or not now:
         return None
 
     block_offset = now - timestamp
 
+    # Precomputed, e.g. 'HealthConfig.offset_delta'.
+    if delta is not None:
+        return block_offset <= delta, offset, offset_unit
+
     offset = int(offset)
 
     # Get timedelta (age) for a given block.
@@ -103,382 +460,2306 @@ def is_timestamp_within_offset(
     return block_offset <= delta, offset, offset_unit
 
 
-def daemon_last_block_check(
-    conn=None,
-    url=URL,
-    port=RPC_PORT,
-    user=USER,
-    passwd=PASSWD,
-    offset=OFFSET,
-    offset_unit=OFFSET_UNIT,
-):
-    """Check last block status.
+LATENCY_GET_LAST_BLOCK_HEADER = "get_last_block_header"
+LATENCY_GET_HEIGHT = "get_height"
+LATENCY_HARD_FORK_INFO = "hard_fork_info"
+LATENCY_GET_INFO = "get_info"
+LATENCY_BATCH = "batch"
+LATENCY_P2P_CONNECT = "p2p_connect"
 
-    Uses an offset to determine an 'old'/'outdated' last block.
+_latency_observers = []
+
+
+def add_latency_observer(observer):
+    """Register 'observer(call, host, seconds)'.
+
+    Observers are called with the duration of every daemon request made by
+    the checks, i.e. 'get_last_block_header', 'get_height', 'hard_fork_info',
+    'batch' and 'p2p_connect'.
     """
 
-    error = None
-    response = None
-    block_recent = False
-    status = DAEMON_STATUS_UNKNOWN
-    last_block_timestamp = -1
-    timestamp_obj = None
-    block_age = None
-    last_block_hash = "---"
-    check_timestamp = datetime.datetime.utcnow().replace(microsecond=0)
+    if observer not in _latency_observers:
+        _latency_observers.append(observer)
+
+
+def remove_latency_observer(observer):
+    if observer in _latency_observers:
+        _latency_observers.remove(observer)
+
+
+def _observe_latency(call, host, seconds):
+    for observer in _latency_observers:
+        try:
+            observer(call, host, seconds)
+        except Exception as e:
+            logger.warning(f"Latency observer failed: '{str(e)}'.")
+
+
+def _timed(call, host, request, *args):
+    """Run a daemon request and report its duration to the latency observers."""
+
+    start = time.monotonic()
     try:
-        if not conn:
-            conn = AuthServiceProxy(
-                f"http://{user}@{url}:{port}/json_rpc",
-                password=f"{passwd}",
-                timeout=HTTP_TIMEOUT,
-            )
+        return request(*args)
+    finally:
+        if _latency_observers:
+            _observe_latency(call, host, time.monotonic() - start)
 
-        logger.info(f"Checking '{url}:{port}'.")
 
-        last_block_header = conn.get_last_block_header()["block_header"]
-        last_block_timestamp = float(last_block_header["timestamp"])
-        timestamp_obj = datetime.datetime.utcfromtimestamp(
-            last_block_timestamp
-        )
-        last_block_hash = last_block_header["hash"]
-        block_recent, offset, offset_unit = is_timestamp_within_offset(
-            timestamp=timestamp_obj,
-            now=check_timestamp,
-            offset=offset,
-            offset_unit=offset_unit,
-        )
-        status = DAEMON_STATUS_OK if block_recent else DAEMON_STATUS_ERROR
-        block_age = str(check_timestamp - timestamp_obj)
+ERROR_DEADLINE_EXCEEDED = "deadline_exceeded"
 
-        response = {}
-    except (ValueError, JSONRPCException, RequestException) as e:
-        error = {"error": str(e)}
 
-    if response is None:
-        if not error:
-            error = {"error": f"No response."}
+def _expires(deadline=None):
+    """Get the 'time.monotonic()' timestamp 'deadline' seconds from now.
 
-    response = {
-        "hash": last_block_hash,
-        "block_age": block_age if block_age else -1,
-        "block_timestamp": timestamp_obj.isoformat()
-        if timestamp_obj
-        else "---",
-        "check_timestamp": check_timestamp.isoformat(),
-        "status": status,
-        "block_recent": block_recent,
-        "block_recent_offset": offset,
-        "block_recent_offset_unit": offset_unit,
-    }
-    response.update({"host": f"{url}:{port}"})
+    'None' for no deadline.
+    """
 
-    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
-        if status == DAEMON_STATUS_ERROR:
-            message = f"Last block's timestamp is older than '{offset} [{offset_unit}]'."
-        else:
-            message = f"Cannot determine status."
-        data = {"message": message}
+    if deadline is None:
+        return None
+    return time.monotonic() + float(deadline)
 
-        if not error:
-            error = {"error": f"Last block's age is '{block_age}'."}
-        data.update(error)
-        response.update({"error": data})
-        logger.error(json.dumps(data))
 
-    return response
+def _exceeded(expires) -> bool:
+    return expires is not None and time.monotonic() >= expires
 
 
-def daemon_rpc_status_check(
-    conn=None, url=URL, port=RPC_PORT, user=USER, passwd=PASSWD
-):
-    """Check daemon status.
+def _remaining(expires, timeout=None):
+    """Get the timeout of the next request.
 
-    Uses Monero daemon RPC 'hard_fork_info'.
+    'None' (the default timeout) without deadline, otherwise 'timeout'
+    ('HTTP_TIMEOUT' by default) or the time left until 'expires', if shorter.
     """
 
-    error = None
-    response = None
-    status = DAEMON_STATUS_UNKNOWN
-    version = -1
-    try:
-        if not conn:
-            conn = AuthServiceProxy(
-                f"http://{user}@{url}:{port}/json_rpc",
-                password=f"{passwd}",
-                timeout=HTTP_TIMEOUT,
-            )
+    if expires is None:
+        return timeout
+    timeout = HTTP_TIMEOUT if timeout is None else timeout
+    return max(0.001, min(timeout, expires - time.monotonic()))
 
-        logger.info(f"Checking '{url}:{port}'.")
 
-        hard_fork_info = conn.hard_fork_info()
-        status = hard_fork_info["status"]
-        version = hard_fork_info["version"]
+def _deadline_error(expires, error):
+    """Replace 'error' by 'deadline_exceeded', if 'expires' has passed."""
 
-        response = {}
-    except (ValueError, JSONRPCException, RequestException) as e:
-        error = {"error": str(e)}
+    if _exceeded(expires):
+        return {"error": ERROR_DEADLINE_EXCEEDED}
+    return error
 
-    if response is None:
-        if not error:
-            error = {"error": f"No response."}
 
-    response = {"status": status, "version": version}
-    response.update({"host": f"{url}:{port}"})
+def _within(expires, check, **kwargs):
+    """Run 'check' with the time left until 'expires' as 'deadline'."""
 
-    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
-        if status == DAEMON_STATUS_ERROR:
-            message = f"Status is '{status}'."
-        else:
-            message = f"Cannot determine status."
-        data = {"message": message}
+    if expires is not None:
+        kwargs["deadline"] = expires - time.monotonic()
+    return check(**kwargs)
 
-        if not error:
-            error = {"error": message}
-        data.update(error)
-        response.update({"error": data})
-        logger.error(json.dumps(data))
 
-    return response
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
 
 
-def daemon_p2p_status_check(url=URL, port=P2P_PORT):
-    """Check daemon P2P status.
+def _executor():
+    """Get the thread pool running the parallel checks.
 
-    Simply connects to the daemon's P2P port to check connectivity.
-    Checks Monero daemon P2P status.
+    Created on first use and kept for the life time of the process: Its
+    worker threads keep their digest authentication state (the nonce is
+    stored per thread) across checks and calls.
     """
 
-    error = None
-    response = None
-    status = DAEMON_STATUS_UNKNOWN
+    global _EXECUTOR
 
-    try:
-        logger.info(f"Checking '{url}:{port}'.")
-        connect_to_node.try_to_connect_keep_errors((url, int(port)))
-        status = DAEMON_STATUS_OK
-    # ConnectionError: connection attempt is aborted /refused or connection aborted by the peer.
-    except (ConnectionError) as e:
-        error = {"error": str(e)}
-        status = DAEMON_STATUS_ERROR
-    except Exception as e:
-        error = {"error": str(e)}
-        status = DAEMON_STATUS_UNKNOWN
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, PARALLEL_CHECKS_WORKERS),
+                thread_name_prefix="monero_health",
+            )
+        return _EXECUTOR
 
-    response = {"status": status}
-    response.update({"host": f"{url}:{port}"})
 
-    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
-        if status == DAEMON_STATUS_ERROR:
-            message = f"Status is '{status}'."
-        else:
-            message = f"Cannot determine status."
-        data = {"message": message}
+def _run_checks(*checks, parallel=PARALLEL_CHECKS):
+    """Run the given checks and return their results in order.
 
-        if not error:
-            error = {"error": message}
-        data.update(error)
-        response.update({"error": data})
-        logger.error(json.dumps(data))
+    With 'parallel==True' the checks run concurrently: all but the last
+    check run on worker threads, the last one on the calling thread.
+    This way the latency is the maximum and not the sum of the checks.
+    """
 
-    return response
+    if not parallel or len(checks) < 2:
+        return [check() for check in checks]
 
+    executor = _executor()
+    futures = [executor.submit(check) for check in checks[:-1]]
+    result = checks[-1]()
+    return [future.result() for future in futures] + [result]
 
-def daemon_stati_check(
-    conn=None,
-    url=URL,
-    port=RPC_PORT,
-    p2p_port=P2P_PORT,
-    user=USER,
-    passwd=PASSWD,
-    consider_p2p=CONSIDER_P2P_STATUS,
-):
-    """Check combined daemon status.
 
-    Gets Monero daemon status from Monero daemon RPC 'hard_fork_info'.
-    Considers Monero daemon P2P status in daemon status, if 'consider_p2p==True'. The result of the P2P check will always be included.
+# The 'time.monotonic()' timestamp the check of the calling thread has to
+# be done by, see '_deadline'.
+_DEADLINE = threading.local()
 
-    Workaround: Get P2P hardfork version from Monero RPC.
-    Issue: https://github.com/normoes/monero_health/issues/4
+
+@contextlib.contextmanager
+def _deadline(expires):
+    """Bound all HTTP requests of the calling thread by 'expires'.
+
+    Applies to the sessions created by '_rpc_session', also to the request
+    answering the digest authentication challenge ('401').
     """
 
-    response = {}
-    data = {}
+    previous = getattr(_DEADLINE, "expires", None)
+    _DEADLINE.expires = expires
+    try:
+        yield
+    finally:
+        _DEADLINE.expires = previous
+
+
+def _send(send, request, timeout=None, **kwargs):
+    """Call the adapter's 'send' with at most the time left as 'timeout'."""
+
+    expires = getattr(_DEADLINE, "expires", None)
+    if expires is not None:
+        left = expires - time.monotonic()
+        if left <= 0:
+            raise RequestException("Deadline exceeded.")
+        if isinstance(timeout, tuple):
+            timeout = tuple(
+                left if value is None else min(value, left)
+                for value in timeout
+            )
+        else:
+            timeout = left if timeout is None else min(timeout, left)
+    return send(request, timeout=timeout, **kwargs)
 
-    daemon_rpc_status = DAEMON_STATUS_UNKNOWN
-    daemon_p2p_status = DAEMON_STATUS_UNKNOWN
-    version = version_rpc = version_p2p = -1
 
-    result = daemon_rpc_status_check(
-        url=url, port=port, user=user, passwd=passwd
-    )
-    if result:
-        daemon_rpc_status = result.get("status", daemon_rpc_status)
-        if "version" in result:
-            version_rpc = result.get("version", version)
-            del result["version"]
-        data.update({DAEMON_RPC_KEY: result})
-        response.update(data)
+def _rpc_session(url=URL, user=USER, passwd=PASSWD, retries=True):
+    """Create a HTTP session configured like the one of 'AuthServiceProxy'.
 
-    # Always do the  P2P check, independent of 'consider_p2p'
-    # in order to get the correct combined RPC/P2P status.
-    result = daemon_p2p_status_check(url=url, port=p2p_port)
-    if result:
-        daemon_p2p_status = result.get("status", daemon_p2p_status)
-        if "version" in result:
-            version_p2p = result.get("version", version)
-            del result["version"]
-        data.update({DAEMON_P2P_KEY: result})
-        response.update(data)
+    The session can be given to 'AuthServiceProxy' as 'connection' in order
+    to share the keep-alive connection and the digest authentication state.
 
-    version = max(version_rpc, version_p2p)
+    Failed connects are not retried with 'retries==False', i.e. within a
+    deadline every retry would get the whole time left again.
+    Requests are bounded by the deadline of the calling thread ('_deadline').
+    """
 
-    stati_to_consider = [daemon_rpc_status]
-    if consider_p2p:
-        stati_to_consider.append(daemon_p2p_status)
+    _load()
+
+    session = Session()
+    adapter = HTTPAdapter(max_retries=MONERO_RPC_MAX_RETRIES if retries else 0)
+    adapter.send = functools.partial(_send, adapter.send)
+    session.mount(f"http://{url}", adapter)
+    session.auth = HTTPDigestAuth(user, passwd)
+    session.headers = {
+        "Content-Type": "application/json",
+        "User-Agent": MONERO_RPC_USER_AGENT,
+        "Host": url,
+    }
 
-    status = None
-    max_weight = -1
-    for status_ in stati_to_consider:
-        max_weight = max(max_weight, DAEMON_STATUS_WEIGHTS_.get(status_, -1))
+    return session
 
-    status = DAEMON_STATUS_WEIGHTS[max_weight]
 
-    data = {"status": status, "host": url, "version": version}
-    response.update(data)
+class _PoolEntry:
+    """Pooled HTTP sessions and 'AuthServiceProxy' of a daemon."""
 
-    message = f"Combined daemon status (RPC, P2P) is '{status}'."
-    data = {"message": message}
-    logger.info(json.dumps(data))
+    __slots__ = (
+        "passwd",
+        "session",
+        "connection",
+        "deadline_session",
+        "last_used",
+    )
 
-    return response
+    def __init__(self, url, port, user, passwd, now):
+        self.passwd = passwd
+        self.session = _rpc_session(url=url, user=user, passwd=passwd)
+        self.connection = AuthServiceProxy(
+            f"http://{user}@{url}:{port}/json_rpc",
+            password=f"{passwd}",
+            timeout=HTTP_TIMEOUT,
+            connection=self.session,
+        )
+        # Without retries, created when first used within a deadline.
+        self.deadline_session = None
+        self.last_used = now
 
+    def close(self):
+        self.session.close()
+        if self.deadline_session is not None:
+            self.deadline_session.close()
 
-def daemon_combined_status_check(
+
+class ConnectionPool:
+    """Keep-alive Monero daemon RPC connections keyed by '(url, port, user)'.
+
+    The pooled connections share their HTTP session, i.e. the keep-alive
+    connection and the digest authentication nonce, across checks and calls.
+
+    Holds at most 'max_size' connections, the least recently used one is
+    evicted first. Connections idle for longer than 'max_idle' seconds are
+    evicted as well.
+    """
+
+    def __init__(
+        self, max_size=CONNECTION_POOL_SIZE, max_idle=CONNECTION_POOL_IDLE
+    ):
+        self.max_size = int(max_size)
+        self.max_idle = float(max_idle)
+        self._lock = threading.Lock()
+        # key -> '_PoolEntry'
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        for key in [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.last_used > self.max_idle
+        ]:
+            self._entries.pop(key).close()
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)[1].close()
+
+    def _entry(self, url, port, user, passwd, retries=True):
+        _load()
+
+        key = (url, int(port), user)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.pop(key, None)
+            if entry is None or entry.passwd != passwd:
+                if entry is not None:
+                    entry.close()
+                entry = _PoolEntry(url, port, user, passwd, now)
+            entry.last_used = now
+            if not retries and entry.deadline_session is None:
+                entry.deadline_session = _rpc_session(
+                    url=url, user=user, passwd=passwd, retries=False
+                )
+                # Shares the digest authentication nonce.
+                entry.deadline_session.auth = entry.session.auth
+            self._entries[key] = entry
+            self._evict(now)
+
+        return entry
+
+    def session(
+        self, url=URL, port=RPC_PORT, user=USER, passwd=PASSWD, retries=True
+    ):
+        """Get the pooled HTTP session of a daemon.
+
+        Gets a session not retrying failed connects with 'retries==False'.
+        """
+
+        entry = self._entry(url, port, user, passwd, retries=retries)
+        return entry.session if retries else entry.deadline_session
+
+    def connection(self, url=URL, port=RPC_PORT, user=USER, passwd=PASSWD):
+        """Get the pooled 'AuthServiceProxy' of a daemon."""
+
+        return self._entry(url, port, user, passwd).connection
+
+    def clear(self):
+        """Close and remove all pooled connections."""
+
+        with self._lock:
+            while self._entries:
+                self._entries.popitem()[1].close()
+
+
+CONNECTION_POOL = ConnectionPool()
+
+# '(url, port)' of the daemons known not to support batch requests.
+_NO_BATCH = set()
+
+
+def _connection(
     conn=None,
     url=URL,
     port=RPC_PORT,
-    p2p_port=P2P_PORT,
     user=USER,
     passwd=PASSWD,
-    consider_p2p=CONSIDER_P2P_STATUS,
+    pool=None,
+    timeout=None,
+    retries=True,
+    expires=None,
 ):
-    """Check combined daemon status.
-
-    Checks all stati. Can inlcude dameon's P2P status.
+    """Get the RPC connection to use for a check.
 
-    Gets last block status from offset to determine an 'old'/'outdated' last block.
-    Gets Monero daemon status from Monero daemon RPC 'hard_fork_info'.
-    Considers Monero daemon P2P status in daemon status, if 'consider_p2p==True'. The result of the P2P check will always be included.
+    Prefers the given connection, then the given pool, then the module-level
+    pool (if 'USE_CONNECTION_POOL') and creates a new connection otherwise.
+    Requests time out after 'timeout' seconds, after 'HTTP_TIMEOUT' by default.
+    Failed connects are not retried with 'retries==False'.
+    Calls of the given connection return by 'expires', if given.
     """
 
-    response = {}
+    _load()
 
-    last_block_status = DAEMON_STATUS_UNKNOWN
-    daemon_status = DAEMON_STATUS_UNKNOWN
-
-    result = daemon_last_block_check(
-        url=url, port=port, user=user, passwd=passwd
+    if conn:
+        return conn if expires is None else _BoundedRPC(conn, expires)
+    if pool is None and USE_CONNECTION_POOL:
+        pool = CONNECTION_POOL
+    if timeout is not None:
+        if pool is not None:
+            session = pool.session(
+                url=url, port=port, user=user, passwd=passwd, retries=retries
+            )
+        else:
+            session = _rpc_session(
+                url=url, user=user, passwd=passwd, retries=retries
+            )
+        return _SessionRPC(session, url=url, port=port, timeout=timeout)
+    if pool is not None:
+        return pool.connection(url=url, port=port, user=user, passwd=passwd)
+
+    return AuthServiceProxy(
+        f"http://{user}@{url}:{port}/json_rpc",
+        password=f"{passwd}",
+        timeout=HTTP_TIMEOUT,
     )
-    if result:
-        last_block_status = result.get("status", last_block_status)
-        data = {LAST_BLOCK_KEY: result}
-        response.update(data)
 
-    # Check daemon stati.
-    result = daemon_stati_check(
-        url=url,
-        port=port,
-        p2p_port=p2p_port,
-        user=user,
-        passwd=passwd,
-        consider_p2p=consider_p2p,
-    )
-    if result:
-        daemon_status = result.get("status", daemon_status)
-        data = {DAEMON_KEY: result}
-        response.update(data)
 
-    stati_to_consider = (last_block_status, daemon_status)
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+ERROR_CIRCUIT_OPEN = "circuit_open"
 
-    status = None
-    max_weight = -1
-    for status_ in stati_to_consider:
-        max_weight = max(max_weight, DAEMON_STATUS_WEIGHTS_.get(status_, -1))
 
-    status = DAEMON_STATUS_WEIGHTS[max_weight]
+class CircuitBreaker:
+    """Per daemon circuit breaker keyed by '(url, port)'.
 
-    data = {"status": status, "host": url}
-    response.update(data)
+    The circuit of a daemon opens after 'failures' consecutive failed
+    checks. While it is open, the checks do not contact the daemon and
+    return 'UNKNOWN' right away.
+    After 'cooldown' seconds the circuit is half-open: a single trial check
+    is let through per 'cooldown' window, a successful one closes the circuit.
+    """
 
-    message = f"Combined status is '{status}'."
-    data = {"message": message}
-    logger.info(json.dumps(data))
+    def __init__(
+        self,
+        failures=CIRCUIT_BREAKER_FAILURES,
+        cooldown=CIRCUIT_BREAKER_COOLDOWN,
+    ):
+        self.failures = max(1, int(failures))
+        self.cooldown = float(cooldown)
+        self._lock = threading.Lock()
+        # key -> [consecutive failures, opened or last trial]
+        self._circuits = {}
+
+    def __len__(self):
+        return len(self._circuits)
+
+    def _state(self, circuit, now):
+        if circuit is None or circuit[0] < self.failures:
+            return CIRCUIT_CLOSED
+        if now - circuit[1] < self.cooldown:
+            return CIRCUIT_OPEN
+        return CIRCUIT_HALF_OPEN
+
+    def state(self, url=URL, port=RPC_PORT):
+        with self._lock:
+            return self._state(
+                self._circuits.get((url, int(port))), time.monotonic()
+            )
+
+    def allow(self, url=URL, port=RPC_PORT) -> bool:
+        """Whether to check the daemon, i.e. closed circuit or trial check."""
+
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuits.get((url, int(port)))
+            state = self._state(circuit, now)
+            if state == CIRCUIT_HALF_OPEN:
+                # The next trial check is due in 'cooldown' seconds.
+                circuit[1] = now
+            return state != CIRCUIT_OPEN
+
+    def record(self, url=URL, port=RPC_PORT, success=True):
+        """Record the outcome of a check."""
+
+        key = (url, int(port))
+        with self._lock:
+            if success:
+                self._circuits.pop(key, None)
+                return
+            circuit = self._circuits.setdefault(key, [0, 0.0])
+            circuit[0] += 1
+            if circuit[0] >= self.failures:
+                circuit[1] = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._circuits.clear()
+
+
+CIRCUIT_BREAKER = CircuitBreaker()
+
+
+def _circuit_breaker(breaker=None):
+    """Get the given circuit breaker or the module-level one (if 'USE_CIRCUIT_BREAKER')."""
+
+    if breaker is None and USE_CIRCUIT_BREAKER:
+        return CIRCUIT_BREAKER
+    return breaker
+
+
+def _blocked(expires, breaker, url, port):
+    """Get the error keeping a check from contacting the daemon.
+
+    'deadline_exceeded' without time left, 'circuit_open' while the circuit
+    of 'breaker' is open and 'None' otherwise.
+    """
+
+    if _exceeded(expires):
+        return {"error": ERROR_DEADLINE_EXCEEDED}
+    if breaker is not None and not breaker.allow(url=url, port=port):
+        return {"error": ERROR_CIRCUIT_OPEN}
+    return None
+
+
+class LastBlockTracker:
+    """Last block headers keyed by '(url, port)'.
+
+    Remembers the last block header of every daemon for the incremental
+    last block check.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> last block header
+        self._headers = {}
+
+    def __len__(self):
+        return len(self._headers)
+
+    def get(self, url=URL, port=RPC_PORT):
+        with self._lock:
+            return self._headers.get((url, int(port)))
+
+    def update(self, url=URL, port=RPC_PORT, header=None):
+        with self._lock:
+            if header is None:
+                self._headers.pop((url, int(port)), None)
+            else:
+                self._headers[(url, int(port))] = header
+
+    def clear(self):
+        with self._lock:
+            self._headers.clear()
+
+
+LAST_BLOCK_TRACKER = LastBlockTracker()
+
+
+def _rpc_post(session, url, port, path, postdata, timeout=None):
+    """POST to a Monero daemon RPC path and decode the JSON response.
+
+    Raises 'JSONRPCException' like 'AuthServiceProxy' does.
+    """
+
+    _load()
+
+    try:
+        r = session.post(
+            url=f"http://{url}:{port}{path}",
+            data=postdata,
+            timeout=HTTP_TIMEOUT if timeout is None else timeout,
+        )
+    except (RequestException) as e:
+        raise JSONRPCException(
+            {
+                "code": -341,
+                "message": f"Could not establish a connection, original error: '{str(e)}'.",
+            }
+        )
+
+    if r.status_code != codes.ok:
+        raise JSONRPCException(
+            {
+                "code": -344,
+                "message": f"Received HTTP status code '{r.status_code}'.",
+            }
+        )
+
+    try:
+        return json.loads(r.text, parse_float=decimal.Decimal)
+    except (json.JSONDecodeError) as e:
+        raise ValueError(f"Error: '{str(e)}'. Response: '{r.text}'.")
+
+
+def _rpc_call(
+    session, method, params=None, url=URL, port=RPC_PORT, timeout=None
+):
+    """Call a Monero daemon RPC method like 'AuthServiceProxy' does."""
+
+    _load()
+
+    postdata = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params if params else {},
+            "id": 0,
+        }
+    )
+    response = _rpc_post(
+        session, url, port, "/json_rpc", postdata, timeout=timeout
+    )
+    if response.get("error", None) is not None:
+        raise JSONRPCException(response["error"])
+    if "result" not in response:
+        raise JSONRPCException(
+            {"code": -343, "message": "Missing JSON-RPC result."}
+        )
+
+    return response["result"]
+
+
+class _SessionRPC:
+    """Monero daemon RPC methods on an HTTP session with a timeout.
+
+    'AuthServiceProxy' does not pass its 'timeout' on to the method calls,
+    which always use the default timeout.
+    """
+
+    def __init__(self, session, url=URL, port=RPC_PORT, timeout=None):
+        self._session = session
+        self._url = url
+        self._port = port
+        self._timeout = timeout
+
+    def __getattr__(self, method):
+        if method.startswith("__") and method.endswith("__"):
+            raise AttributeError(method)
+        return functools.partial(
+            _rpc_call,
+            self._session,
+            method,
+            url=self._url,
+            port=self._port,
+            timeout=self._timeout,
+        )
+
+
+class _BoundedRPC:
+    """RPC connection whose calls return by 'expires'.
+
+    Wraps a connection given by the caller, whose HTTP session is not bound
+    by '_deadline'. The calls run on the thread pool of the parallel checks,
+    a call not done in time keeps running in the background.
+    """
+
+    def __init__(self, conn, expires):
+        self._conn = conn
+        self._expires = expires
+
+    def __getattr__(self, method):
+        if method.startswith("__") and method.endswith("__"):
+            raise AttributeError(method)
+        return functools.partial(self._call, getattr(self._conn, method))
+
+    def _call(self, call, *args):
+        future = _executor().submit(call, *args)
+        try:
+            return future.result(
+                timeout=max(0, self._expires - time.monotonic())
+            )
+        except concurrent.futures.TimeoutError:
+            raise JSONRPCException(
+                {"code": -341, "message": "Deadline exceeded."}
+            )
+
+
+def daemon_get_height(
+    session=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    timeout=None,
+):
+    """Get the daemon's chain height and top block hash.
+
+    Uses the Monero daemon RPC path '/get_height', which is cheaper than
+    'get_last_block_header'.
+    Returns the response, e.g. '{"hash": "...", "height": 2200000, "status": "OK"}'.
+    """
+
+    _load()
+
+    if not session:
+        session = _rpc_session(url=url, user=user, passwd=passwd)
+
+    response = _rpc_post(
+        session, url, port, "/get_height", "{}", timeout=timeout
+    )
+    if not isinstance(response, dict) or "height" not in response:
+        raise JSONRPCException(
+            {"code": -343, "message": "Missing '/get_height' result."}
+        )
 
     return response
 
 
-def main():
+def daemon_rpc_batch(
+    calls,
+    session=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    timeout=None,
+):
+    """Call several Monero daemon RPC methods in one JSON-RPC 2.0 batch request.
+
+    'calls' is a list of '(method,)' or '(method, params)' tuples.
+    Returns the results in the order of 'calls'. A failed call is returned as
+    'JSONRPCException' instead of a result.
+
+    Raises 'JSONRPCException' if the request itself fails or if the daemon
+    does not answer with a batch response.
+    """
+
+    _load()
+
+    if not session:
+        session = _rpc_session(url=url, user=user, passwd=passwd)
+
+    postdata = json.dumps(
+        [
+            {
+                "jsonrpc": "2.0",
+                "method": call[0],
+                "params": call[1] if len(call) > 1 else {},
+                "id": id_,
+            }
+            for id_, call in enumerate(calls)
+        ]
+    )
+    response = _rpc_post(
+        session, url, port, "/json_rpc", postdata, timeout=timeout
+    )
+
+    if not isinstance(response, list):
+        # Daemons not supporting batch requests answer with a single error.
+        error = response.get("error") if isinstance(response, dict) else None
+        raise JSONRPCException(
+            error
+            if error
+            else {"code": -343, "message": "Missing JSON-RPC batch result."}
+        )
+
+    responses = {
+        item.get("id"): item for item in response if isinstance(item, dict)
+    }
+    results = []
+    for id_ in range(len(calls)):
+        item = responses.get(id_, {})
+        if item.get("error", None) is not None:
+            results.append(JSONRPCException(item["error"]))
+        elif "result" not in item:
+            results.append(
+                JSONRPCException(
+                    {"code": -343, "message": "Missing JSON-RPC result."}
+                )
+            )
+        else:
+            results.append(item["result"])
+
+    return results
+
+
+class _Result:
+    """Result of a check, rendered to the response dict only when asked."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        raise NotImplementedError
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def _get(result, key, default=None):
+    """Get 'key' of a result, which may be a '_Result' or a response dict."""
+
+    if isinstance(result, _Result):
+        value = getattr(result, key, None)
+        return default if value is None else value
+    return result.get(key, default)
+
+
+def _render(result, exclude=None):
+    """Render a result, which may be a '_Result' or a response dict."""
+
+    if isinstance(result, _Result):
+        response = result.to_dict()
+    else:
+        response = dict(result)
+    if exclude:
+        response.pop(exclude, None)
+    return response
+
+
+def _timestamp(timestamp):
+    return datetime.datetime.utcfromtimestamp(timestamp)
+
+
+class LastBlockResult(_Result):
+    """Result of 'daemon_last_block_check'.
+
+    Keeps the timestamps as seconds since the epoch (UTC), the ISO formats
+    and the block age are computed by 'to_dict'.
+    """
+
+    __slots__ = (
+        "url",
+        "port",
+        "hash",
+        "height",
+        "block_timestamp",
+        "check_timestamp",
+        "status",
+        "block_recent",
+        "offset",
+        "offset_unit",
+        "error",
+    )
+
+    def __init__(
+        self,
+        url,
+        port,
+        check_timestamp,
+        offset=OFFSET,
+        offset_unit=OFFSET_UNIT,
+        status=DAEMON_STATUS_UNKNOWN,
+        hash="---",
+        height=-1,
+        block_timestamp=None,
+        block_recent=False,
+        error=None,
+    ):
+        self.url = url
+        self.port = port
+        self.check_timestamp = check_timestamp
+        self.offset = offset
+        self.offset_unit = offset_unit
+        self.status = status
+        self.hash = hash
+        self.height = height
+        self.block_timestamp = block_timestamp
+        self.block_recent = block_recent
+        self.error = error
+
+    @property
+    def block_age(self):
+        # Only known for a block compared to the offset.
+        if self.status == DAEMON_STATUS_UNKNOWN:
+            return -1
+        return str(
+            _timestamp(self.check_timestamp) - _timestamp(self.block_timestamp)
+        )
+
+    def to_dict(self) -> dict:
+        response = {
+            "hash": self.hash,
+            "height": self.height,
+            "block_age": self.block_age,
+            "block_timestamp": _timestamp(self.block_timestamp).isoformat()
+            if self.block_timestamp is not None
+            else "---",
+            "check_timestamp": _timestamp(self.check_timestamp).isoformat(),
+            "status": self.status,
+            "block_recent": self.block_recent,
+            "block_recent_offset": self.offset,
+            "block_recent_offset_unit": self.offset_unit,
+            "host": f"{self.url}:{self.port}",
+        }
+        if self.error is not None:
+            response.update({"error": self.error})
+        return response
+
+
+class RpcStatusResult(_Result):
+    """Result of 'daemon_rpc_status_check'."""
+
+    __slots__ = ("url", "port", "status", "version", "error")
+
+    def __init__(
+        self, url, port, status=DAEMON_STATUS_UNKNOWN, version=-1, error=None
+    ):
+        self.url = url
+        self.port = port
+        self.status = status
+        self.version = version
+        self.error = error
+
+    def to_dict(self) -> dict:
+        response = {
+            "status": self.status,
+            "version": self.version,
+            "host": f"{self.url}:{self.port}",
+        }
+        if self.error is not None:
+            response.update({"error": self.error})
+        return response
+
+
+class SyncStatusResult(_Result):
+    """Result of 'daemon_sync_check'."""
+
+    __slots__ = (
+        "url",
+        "port",
+        "status",
+        "height",
+        "target_height",
+        "synchronized",
+        "busy_syncing",
+        "incoming",
+        "outgoing",
+        "rpc_status",
+        "error",
+    )
+
+    def __init__(
+        self,
+        url,
+        port,
+        status=DAEMON_STATUS_UNKNOWN,
+        height=-1,
+        target_height=-1,
+        synchronized=False,
+        busy_syncing=False,
+        incoming=-1,
+        outgoing=-1,
+        rpc_status=None,
+        error=None,
+    ):
+        self.url = url
+        self.port = port
+        self.status = status
+        self.height = height
+        self.target_height = target_height
+        self.synchronized = synchronized
+        self.busy_syncing = busy_syncing
+        self.incoming = incoming
+        self.outgoing = outgoing
+        # Status reported by 'get_info', 'None' without response.
+        self.rpc_status = rpc_status
+        self.error = error
+
+    @property
+    def lag(self):
+        # The daemon reports a target height of 0, once synchronized.
+        if self.height < 0:
+            return -1
+        return max(0, self.target_height - self.height)
+
+    def to_dict(self) -> dict:
+        response = {
+            "status": self.status,
+            "height": self.height,
+            "target_height": self.target_height,
+            "lag": self.lag,
+            "synchronized": self.synchronized,
+            "busy_syncing": self.busy_syncing,
+            "connections": {
+                "incoming": self.incoming,
+                "outgoing": self.outgoing,
+            },
+            "host": f"{self.url}:{self.port}",
+        }
+        if self.error is not None:
+            response.update({"error": self.error})
+        return response
+
+
+class P2PStatusResult(_Result):
+    """Result of 'daemon_p2p_status_check'.
+
+    The chain data ('version', 'height', 'hash') is only known from a
+    'handshake' probe.
+    """
+
+    __slots__ = (
+        "url",
+        "port",
+        "status",
+        "probe",
+        "version",
+        "height",
+        "hash",
+        "error",
+    )
+
+    def __init__(
+        self,
+        url,
+        port,
+        status=DAEMON_STATUS_UNKNOWN,
+        probe=None,
+        version=None,
+        height=None,
+        hash=None,
+        error=None,
+    ):
+        self.url = url
+        self.port = port
+        self.status = status
+        self.probe = probe
+        self.version = version
+        self.height = height
+        self.hash = hash
+        self.error = error
+
+    def to_dict(self) -> dict:
+        response = {"status": self.status, "host": f"{self.url}:{self.port}"}
+        if self.probe is not None:
+            response.update({"probe": self.probe})
+        if self.error is not None:
+            response.update({"error": self.error})
+        if self.version is not None:
+            response.update(
+                {
+                    "version": self.version,
+                    "height": self.height,
+                    "hash": self.hash,
+                }
+            )
+        return response
+
+
+class StatiResult(_Result):
+    """Result of 'daemon_stati_check'.
+
+    The versions of the RPC and the P2P results move to the combined
+    'version' when rendered.
+    """
+
+    __slots__ = ("url", "rpc", "p2p", "status", "version")
+
+    def __init__(self, url, rpc=None, p2p=None, status=None, version=-1):
+        self.url = url
+        self.rpc = rpc
+        self.p2p = p2p
+        self.status = status
+        self.version = version
 
-    print("----Last block check----:")
-    print(
-        json.dumps(
-            daemon_last_block_check(
-                url=URL,
-                port=RPC_PORT,
-                user=USER,
-                passwd=PASSWD,
-                offset=OFFSET,
-                offset_unit=OFFSET_UNIT,
+    def to_dict(self) -> dict:
+        response = {}
+        if self.rpc:
+            response.update(
+                {DAEMON_RPC_KEY: _render(self.rpc, exclude="version")}
+            )
+        if self.p2p:
+            response.update(
+                {DAEMON_P2P_KEY: _render(self.p2p, exclude="version")}
             )
+        response.update(
+            {"status": self.status, "host": self.url, "version": self.version}
         )
+        return response
+
+
+class CombinedResult(_Result):
+    """Result of 'daemon_combined_status_check'."""
+
+    __slots__ = ("url", "last_block", "sync", "daemon", "status")
+
+    def __init__(
+        self, url, last_block=None, daemon=None, status=None, sync=None
+    ):
+        self.url = url
+        self.last_block = last_block
+        self.sync = sync
+        self.daemon = daemon
+        self.status = status
+
+    def to_dict(self) -> dict:
+        response = {}
+        if self.last_block:
+            response.update({LAST_BLOCK_KEY: _render(self.last_block)})
+        if self.sync:
+            response.update({SYNC_KEY: _render(self.sync)})
+        if self.daemon:
+            response.update({DAEMON_KEY: _render(self.daemon)})
+        response.update({"status": self.status, "host": self.url})
+        return response
+
+
+def _respond(result, as_dict=True):
+    """Render 'result' to the response dict, if 'as_dict==True'."""
+
+    return result.to_dict() if as_dict else result
+
+
+def _last_block_response(
+    url,
+    port,
+    last_block_header=None,
+    error=None,
+    check_timestamp=None,
+    offset=OFFSET,
+    offset_unit=OFFSET_UNIT,
+    delta=None,
+):
+    """Build the last block result from a 'get_last_block_header' result.
+
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    if not check_timestamp:
+        check_timestamp = datetime.datetime.utcnow().replace(microsecond=0)
+    result = LastBlockResult(
+        url,
+        port,
+        check_timestamp.replace(tzinfo=datetime.timezone.utc).timestamp(),
+        offset=offset,
+        offset_unit=offset_unit,
     )
-    print("----Daemon rpc check----")
-    print(
-        json.dumps(
-            daemon_rpc_status_check(
-                url=URL, port=RPC_PORT, user=USER, passwd=PASSWD
+    block_age = None
+    if last_block_header is not None and not error:
+        try:
+            result.block_timestamp = float(last_block_header["timestamp"])
+            timestamp_obj = _timestamp(result.block_timestamp)
+            result.hash = last_block_header["hash"]
+            result.height = last_block_header.get("height", -1)
+            (
+                result.block_recent,
+                result.offset,
+                result.offset_unit,
+            ) = is_timestamp_within_offset(
+                timestamp=timestamp_obj,
+                now=check_timestamp,
+                offset=offset,
+                offset_unit=offset_unit,
+                delta=delta,
             )
+            result.status = (
+                DAEMON_STATUS_OK
+                if result.block_recent
+                else DAEMON_STATUS_ERROR
+            )
+            block_age = check_timestamp - timestamp_obj
+        except (ValueError) as e:
+            error = {"error": str(e)}
+
+    # Neither a header nor an error.
+    if result.status == DAEMON_STATUS_UNKNOWN and not error:
+        error = {"error": f"No response."}
+
+    status = result.status
+    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
+        if status == DAEMON_STATUS_ERROR:
+            message = f"Last block's timestamp is older than '{result.offset} [{result.offset_unit}]'."
+        else:
+            message = f"Cannot determine status."
+        data = {"message": message}
+
+        if not error:
+            error = {"error": f"Last block's age is '{block_age}'."}
+        data.update(error)
+        result.error = data
+        _log(logging.ERROR, data)
+
+    return result
+
+
+def _tracked_last_block_header(
+    rpc,
+    tracker,
+    pool,
+    url,
+    port,
+    user,
+    passwd,
+    reconnect=False,
+    expires=None,
+    http_timeout=None,
+):
+    """Get the last block header of the incremental last block check.
+
+    Gets the header with 'rpc' only, if the daemon's top block is not the
+    one of the header remembered by 'tracker'.
+    Gets a new connection of 'pool' with 'reconnect==True', i.e. within the
+    time left.
+    """
+
+    tracked_header = tracker.get(url=url, port=port)
+    top = _timed(
+        LATENCY_GET_HEIGHT,
+        f"{url}:{port}",
+        functools.partial(
+            daemon_get_height,
+            pool.session(
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                retries=expires is None,
+            ),
+            url,
+            port,
+            timeout=_remaining(expires, http_timeout),
+        ),
+    )
+    if tracked_header is not None and tracked_header.get("hash") == top.get(
+        "hash"
+    ):
+        return tracked_header
+
+    if reconnect:
+        rpc = _connection(
+            url=url,
+            port=port,
+            user=user,
+            passwd=passwd,
+            pool=pool,
+            timeout=_remaining(expires, http_timeout),
+            retries=expires is None,
         )
+    # New top block (or reorg), get its header.
+    last_block_header = _timed(
+        LATENCY_GET_LAST_BLOCK_HEADER,
+        f"{url}:{port}",
+        rpc.get_last_block_header,
+    )["block_header"]
+    tracker.update(url=url, port=port, header=last_block_header)
+
+    return last_block_header
+
+
+def daemon_last_block_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    offset=OFFSET,
+    offset_unit=OFFSET_UNIT,
+    pool=None,
+    tracker=None,
+    breaker=None,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check last block status.
+
+    Uses an offset to determine an 'old'/'outdated' last block.
+    Uses a keep-alive connection of 'pool', if given.
+
+    Incremental mode, if 'tracker' is given (or 'INCREMENTAL_LAST_BLOCK'):
+    Polls the cheap '/get_height' and only gets the last block header, if
+    the daemon's top block changed since the last check. Otherwise, the
+    block age is computed from the remembered header.
+    Uses the module-level pool, if no 'pool' is given.
+
+    Does not contact the daemon while the circuit of 'breaker' is open.
+    Returns within 'deadline' seconds, if given.
+    Returns a 'LastBlockResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+    """
+
+    _load()
+
+    (
+        url,
+        port,
+        user,
+        passwd,
+        http_timeout,
+        offset,
+        offset_unit,
+        delta,
+    ) = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+        offset=offset,
+        offset_unit=offset_unit,
+        delta=None,
     )
-    print("----Daemon p2p check----")
-    print(json.dumps(daemon_p2p_status_check(url=URL, port=P2P_PORT)))
-    print("----Daemon stati check, not considering P2P status----")
-    print(
-        json.dumps(
-            daemon_stati_check(url=URL, port=RPC_PORT, p2p_port=P2P_PORT)
+    last_block_header = None
+    check_timestamp = datetime.datetime.utcnow().replace(microsecond=0)
+    expires = _expires(deadline)
+    breaker = _circuit_breaker(breaker)
+    error = _blocked(expires, breaker, url, port)
+    if error:
+        return _respond(
+            _last_block_response(
+                url,
+                port,
+                error=error,
+                check_timestamp=check_timestamp,
+                offset=offset,
+                offset_unit=offset_unit,
+                delta=delta,
+            ),
+            as_dict,
         )
+    if tracker is None and INCREMENTAL_LAST_BLOCK:
+        tracker = LAST_BLOCK_TRACKER
+    if tracker is not None and pool is None:
+        pool = CONNECTION_POOL
+    with _deadline(expires):
+        try:
+            rpc = _connection(
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                timeout=_remaining(expires, http_timeout),
+                retries=expires is None,
+                expires=expires,
+            )
+
+            logger.info("Checking '%s:%s'.", url, port)
+
+            if tracker is not None:
+                last_block_header = _tracked_last_block_header(
+                    rpc,
+                    tracker,
+                    pool,
+                    url,
+                    port,
+                    user,
+                    passwd,
+                    reconnect=expires is not None and not conn,
+                    expires=expires,
+                    http_timeout=http_timeout,
+                )
+            else:
+                last_block_header = _timed(
+                    LATENCY_GET_LAST_BLOCK_HEADER,
+                    f"{url}:{port}",
+                    rpc.get_last_block_header,
+                )["block_header"]
+        except (ValueError, JSONRPCException, RequestException) as e:
+            error = {"error": str(e)}
+    error = _deadline_error(expires, error)
+    if breaker is not None:
+        breaker.record(url=url, port=port, success=error is None)
+
+    return _respond(
+        _last_block_response(
+            url,
+            port,
+            last_block_header=last_block_header,
+            error=error,
+            check_timestamp=check_timestamp,
+            offset=offset,
+            offset_unit=offset_unit,
+            delta=delta,
+        ),
+        as_dict,
     )
-    print("----Daemon stati check, also considering P2P status----")
-    print(
-        json.dumps(
-            daemon_stati_check(
-                url=URL, port=RPC_PORT, p2p_port=P2P_PORT, consider_p2p=True
+
+
+def _rpc_status_response(url, port, hard_fork_info=None, error=None):
+    """Build the daemon RPC status result from a 'hard_fork_info' result.
+
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    result = RpcStatusResult(url, port)
+    response = None
+    if hard_fork_info is not None and not error:
+        result.status = hard_fork_info["status"]
+        result.version = hard_fork_info["version"]
+
+        response = {}
+
+    if response is None:
+        if not error:
+            error = {"error": f"No response."}
+
+    status = result.status
+    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
+        if status == DAEMON_STATUS_ERROR:
+            message = f"Status is '{status}'."
+        else:
+            message = f"Cannot determine status."
+        data = {"message": message}
+
+        if not error:
+            error = {"error": message}
+        data.update(error)
+        result.error = data
+        _log(logging.ERROR, data)
+
+    return result
+
+
+def daemon_rpc_status_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    pool=None,
+    breaker=None,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check daemon status.
+
+    Uses Monero daemon RPC 'hard_fork_info'.
+    Uses a keep-alive connection of 'pool', if given.
+    Does not contact the daemon while the circuit of 'breaker' is open.
+    Returns within 'deadline' seconds, if given.
+    Returns a 'RpcStatusResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+    """
+
+    _load()
+
+    url, port, user, passwd, http_timeout = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+    )
+    hard_fork_info = None
+    expires = _expires(deadline)
+    breaker = _circuit_breaker(breaker)
+    error = _blocked(expires, breaker, url, port)
+    if error:
+        return _respond(_rpc_status_response(url, port, error=error), as_dict)
+    with _deadline(expires):
+        try:
+            conn = _connection(
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                timeout=_remaining(expires, http_timeout),
+                retries=expires is None,
+                expires=expires,
             )
+
+            logger.info("Checking '%s:%s'.", url, port)
+
+            hard_fork_info = _timed(
+                LATENCY_HARD_FORK_INFO, f"{url}:{port}", conn.hard_fork_info
+            )
+        except (ValueError, JSONRPCException, RequestException) as e:
+            error = {"error": str(e)}
+    error = _deadline_error(expires, error)
+    if breaker is not None:
+        breaker.record(url=url, port=port, success=error is None)
+
+    return _respond(
+        _rpc_status_response(
+            url, port, hard_fork_info=hard_fork_info, error=error
+        ),
+        as_dict,
+    )
+
+
+def _sync_error_message(result, max_lag, min_connections):
+    """Get why the daemon of the sync status result is not 'OK'.
+
+    'None', if it is 'OK'.
+    """
+
+    connections = result.incoming + result.outgoing
+    if result.rpc_status != DAEMON_STATUS_OK:
+        return f"Status is '{result.rpc_status}'."
+    if result.busy_syncing or not result.synchronized:
+        return "Daemon is syncing."
+    if result.lag > int(max_lag):
+        return f"Daemon is '{result.lag}' blocks behind."
+    if connections < int(min_connections):
+        return f"Daemon has '{connections}' P2P connections."
+    return None
+
+
+def _sync_status_response(
+    url,
+    port,
+    info=None,
+    error=None,
+    max_lag=SYNC_MAX_LAG,
+    min_connections=SYNC_MIN_CONNECTIONS,
+):
+    """Build the sync status result from a 'get_info' result.
+
+    'ERROR', if the daemon is syncing, more than 'max_lag' blocks behind its
+    target height or has less than 'min_connections' P2P connections.
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    result = SyncStatusResult(url, port)
+    message = None
+    if info is not None and not error:
+        try:
+            result.rpc_status = info.get("status", DAEMON_STATUS_UNKNOWN)
+            result.height = int(info["height"])
+            result.target_height = int(info.get("target_height", 0))
+            result.busy_syncing = bool(info.get("busy_syncing", False))
+            result.incoming = int(info.get("incoming_connections_count", 0))
+            result.outgoing = int(info.get("outgoing_connections_count", 0))
+            result.synchronized = bool(
+                info.get("synchronized", result.lag <= int(max_lag))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            error = {"error": str(e)}
+        else:
+            message = _sync_error_message(result, max_lag, min_connections)
+            result.status = (
+                DAEMON_STATUS_OK if message is None else DAEMON_STATUS_ERROR
+            )
+
+    if result.status == DAEMON_STATUS_UNKNOWN and not error:
+        error = {"error": "No response."}
+
+    if result.status == DAEMON_STATUS_ERROR or error:
+        data = {"message": message or "Cannot determine status."}
+        if not error:
+            error = {
+                "error": f"Height '{result.height}', target height "
+                f"'{result.target_height}', connections "
+                f"'{result.incoming}/{result.outgoing}' (in/out)."
+            }
+        data.update(error)
+        result.error = data
+        _log(logging.ERROR, data)
+
+    return result
+
+
+def daemon_sync_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    max_lag=SYNC_MAX_LAG,
+    min_connections=SYNC_MIN_CONNECTIONS,
+    pool=None,
+    breaker=None,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check daemon synchronization.
+
+    Uses Monero daemon RPC 'get_info' (not available with restricted RPC).
+    Reports height, target height, 'synchronized', 'busy_syncing' and the
+    incoming and outgoing P2P connections.
+    'ERROR', if the daemon is syncing, more than 'max_lag' blocks behind its
+    target height or has less than 'min_connections' P2P connections.
+    Uses a keep-alive connection of 'pool', if given.
+    Does not contact the daemon while the circuit of 'breaker' is open.
+    Returns within 'deadline' seconds, if given.
+    Returns a 'SyncStatusResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+    """
+
+    _load()
+
+    (
+        url,
+        port,
+        user,
+        passwd,
+        http_timeout,
+        max_lag,
+        min_connections,
+    ) = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+        max_lag=max_lag,
+        min_connections=min_connections,
+    )
+    thresholds = {"max_lag": max_lag, "min_connections": min_connections}
+    info = None
+    expires = _expires(deadline)
+    breaker = _circuit_breaker(breaker)
+    error = _blocked(expires, breaker, url, port)
+    if error:
+        return _respond(
+            _sync_status_response(url, port, error=error, **thresholds),
+            as_dict,
         )
+    with _deadline(expires):
+        try:
+            conn = _connection(
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                timeout=_remaining(expires, http_timeout),
+                retries=expires is None,
+                expires=expires,
+            )
+
+            logger.info("Checking '%s:%s'.", url, port)
+
+            info = _timed(LATENCY_GET_INFO, f"{url}:{port}", conn.get_info)
+        except (ValueError, JSONRPCException, RequestException) as e:
+            error = {"error": str(e)}
+    error = _deadline_error(expires, error)
+    if breaker is not None:
+        breaker.record(url=url, port=port, success=error is None)
+
+    return _respond(
+        _sync_status_response(url, port, info=info, error=error, **thresholds),
+        as_dict,
+    )
+
+
+def _sync_rpc_status_response(sync_result):
+    """Build the daemon RPC status result from a sync status result.
+
+    'get_info' does not report the hard fork version, it is '-1'.
+    """
+
+    if sync_result.rpc_status is None:
+        return _rpc_status_response(
+            sync_result.url,
+            sync_result.port,
+            error={
+                "error": (sync_result.error or {}).get("error", "No response.")
+            },
+        )
+    return _rpc_status_response(
+        sync_result.url,
+        sync_result.port,
+        hard_fork_info={"status": sync_result.rpc_status, "version": -1},
+    )
+
+
+def _p2p_status_response(
+    url, port, status=DAEMON_STATUS_UNKNOWN, error=None, probe=None
+):
+    """Build the daemon P2P status result.
+
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    result = P2PStatusResult(url, port, status=status, probe=probe)
+
+    if status in (DAEMON_STATUS_ERROR, DAEMON_STATUS_UNKNOWN) or error:
+        if status == DAEMON_STATUS_ERROR:
+            message = f"Status is '{status}'."
+        else:
+            message = f"Cannot determine status."
+        data = {"message": message}
+
+        if not error:
+            error = {"error": message}
+        data.update(error)
+        result.error = data
+        _log(logging.ERROR, data)
+
+    return result
+
+
+def daemon_p2p_status_check(
+    url=URL,
+    port=P2P_PORT,
+    depth=P2P_PROBE_DEPTH,
+    network=NETWORK,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check daemon P2P status.
+
+    Simply connects to the daemon's P2P port to check connectivity.
+    Checks Monero daemon P2P status.
+
+    With 'depth' set, the P2P port is probed by 'monero_health.levin':
+    * 'tcp': TCP connect only, closed right away.
+    * 'levin-header': Checks the Levin signature of the daemon's answer to a handshake.
+    * 'handshake': Full Levin 'COMMAND_HANDSHAKE'.
+    The probe depth and its duration are included as 'probe'.
+
+    The 'handshake' response includes the daemon's hard fork version
+    ('version'), chain height ('height') and top block hash ('hash').
+
+    Returns within 'deadline' seconds, if given.
+    Returns a 'P2PStatusResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+    """
+
+    _load()
+
+    url, port, depth, network = _configure(
+        config,
+        port_field="p2p_port",
+        url=url,
+        port=port,
+        depth=depth,
+        network=network,
     )
-    print("----Overall check, not considering P2P status----")
-    print(
-        json.dumps(
-            daemon_combined_status_check(
-                url=URL, port=RPC_PORT, user=USER, passwd=PASSWD
+    error = None
+    status = DAEMON_STATUS_UNKNOWN
+    probe = None
+    chain = None
+    expires = _expires(deadline)
+    if _exceeded(expires):
+        return _respond(
+            _p2p_status_response(
+                url, port, error={"error": ERROR_DEADLINE_EXCEEDED}
+            ),
+            as_dict,
+        )
+
+    try:
+        logger.info("Checking '%s:%s'.", url, port)
+        if depth or expires is not None:
+            if depth:
+                probe = {"depth": depth}
+            start = time.monotonic()
+            try:
+                body = levin.probe(
+                    (url, port),
+                    depth=depth if depth else levin.PROBE_DEPTH_TCP,
+                    timeout=_remaining(expires, levin.TIMEOUT_DEFAULT),
+                    network=network,
+                )
+                if body is not None:
+                    chain = levin.handshake_info(body)
+            finally:
+                duration = time.monotonic() - start
+                if probe is not None:
+                    probe.update({"duration": round(duration, 6)})
+                if _latency_observers:
+                    _observe_latency(
+                        LATENCY_P2P_CONNECT, f"{url}:{port}", duration
+                    )
+        else:
+            _timed(
+                LATENCY_P2P_CONNECT,
+                f"{url}:{port}",
+                connect_to_node.try_to_connect_keep_errors,
+                (url, int(port)),
             )
+        status = DAEMON_STATUS_OK
+    # ConnectionError: connection attempt is aborted /refused or connection aborted by the peer.
+    except (ConnectionError) as e:
+        error = {"error": str(e)}
+        status = DAEMON_STATUS_ERROR
+    except Exception as e:
+        error = _deadline_error(expires, {"error": str(e)})
+        status = DAEMON_STATUS_UNKNOWN
+
+    result = _p2p_status_response(
+        url, port, status=status, error=error, probe=probe
+    )
+    if chain is not None:
+        result.version = chain["version"]
+        result.height = chain["height"]
+        result.hash = chain["hash"]
+
+    return _respond(result, as_dict)
+
+
+def _stati_response(url, rpc_result, p2p_result, consider_p2p):
+    """Combine the daemon RPC and P2P results.
+
+    The results may be '_Result's or response dicts.
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    result = StatiResult(url)
+
+    daemon_rpc_status = DAEMON_STATUS_UNKNOWN
+    daemon_p2p_status = DAEMON_STATUS_UNKNOWN
+    version_rpc = version_p2p = -1
+
+    if rpc_result:
+        daemon_rpc_status = _get(rpc_result, "status", daemon_rpc_status)
+        version_rpc = _get(rpc_result, "version", version_rpc)
+        result.rpc = rpc_result
+
+    if p2p_result:
+        daemon_p2p_status = _get(p2p_result, "status", daemon_p2p_status)
+        version_p2p = _get(p2p_result, "version", version_p2p)
+        result.p2p = p2p_result
+
+    result.version = max(version_rpc, version_p2p)
+
+    stati_to_consider = [daemon_rpc_status]
+    if consider_p2p:
+        stati_to_consider.append(daemon_p2p_status)
+
+    max_weight = -1
+    for status_ in stati_to_consider:
+        max_weight = max(max_weight, DAEMON_STATUS_WEIGHTS_.get(status_, -1))
+
+    result.status = DAEMON_STATUS_WEIGHTS[max_weight]
+
+    message = f"Combined daemon status (RPC, P2P) is '{result.status}'."
+    data = {"message": message}
+    _log(logging.INFO, data)
+
+    return result
+
+
+def daemon_stati_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    p2p_port=P2P_PORT,
+    user=USER,
+    passwd=PASSWD,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    pool=None,
+    parallel=PARALLEL_CHECKS,
+    p2p_depth=P2P_PROBE_DEPTH,
+    breaker=None,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check combined daemon status.
+
+    Gets Monero daemon status from Monero daemon RPC 'hard_fork_info'.
+    Considers Monero daemon P2P status in daemon status, if 'consider_p2p==True'. The result of the P2P check will always be included.
+    The RPC and the P2P checks run concurrently, if 'parallel==True'.
+    The P2P port is probed to 'p2p_depth', see 'daemon_p2p_status_check'.
+    The RPC check respects the circuit of 'breaker', if given.
+    Returns within 'deadline' seconds, if given.
+    Returns a 'StatiResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+
+    The hardfork version is the maximum of the RPC and the P2P version.
+    The P2P version is only known for 'p2p_depth=="handshake"', otherwise
+    it comes from Monero RPC.
+    Issue: https://github.com/normoes/monero_health/issues/4
+    """
+
+    url, consider_p2p = _configure(config, url=url, consider_p2p=consider_p2p)
+    expires = _expires(deadline)
+    # Always do the  P2P check, independent of 'consider_p2p'
+    # in order to get the correct combined RPC/P2P status.
+    rpc_result, p2p_result = _run_checks(
+        functools.partial(
+            _within,
+            expires,
+            daemon_rpc_status_check,
+            conn=conn,
+            url=url,
+            port=port,
+            user=user,
+            passwd=passwd,
+            pool=pool,
+            breaker=breaker,
+            as_dict=False,
+            config=config,
+        ),
+        functools.partial(
+            _within,
+            expires,
+            daemon_p2p_status_check,
+            url=url,
+            port=p2p_port,
+            depth=p2p_depth,
+            as_dict=False,
+            config=config,
+        ),
+        parallel=parallel,
+    )
+
+    return _respond(
+        _stati_response(url, rpc_result, p2p_result, consider_p2p), as_dict
+    )
+
+
+def _single_last_block_rpc_status(
+    session, url, port, user, passwd, expires=None, http_timeout=None
+):
+    """Get the last block header and the hard fork info request by request.
+
+    Re-uses 'session', i.e. the keep-alive connection and the digest
+    authentication of the batch request.
+    Returns '(last_block_header, hard_fork_info, last_block_error, rpc_error)'.
+    """
+
+    def connection():
+        if expires is not None or http_timeout is not None:
+            return _SessionRPC(
+                session,
+                url=url,
+                port=port,
+                timeout=_remaining(expires, http_timeout),
+            )
+        return AuthServiceProxy(
+            f"http://{user}@{url}:{port}/json_rpc",
+            password=f"{passwd}",
+            timeout=HTTP_TIMEOUT,
+            connection=session,
+        )
+
+    last_block_header = hard_fork_info = None
+    last_block_error = rpc_error = None
+    try:
+        last_block_header = _timed(
+            LATENCY_GET_LAST_BLOCK_HEADER,
+            f"{url}:{port}",
+            connection().get_last_block_header,
+        )["block_header"]
+    except (ValueError, JSONRPCException, RequestException) as e:
+        last_block_error = _deadline_error(expires, {"error": str(e)})
+    try:
+        hard_fork_info = _timed(
+            LATENCY_HARD_FORK_INFO,
+            f"{url}:{port}",
+            connection().hard_fork_info,
         )
+    except (ValueError, JSONRPCException, RequestException) as e:
+        rpc_error = _deadline_error(expires, {"error": str(e)})
+
+    return last_block_header, hard_fork_info, last_block_error, rpc_error
+
+
+def _batch_session(pool, url, port, user, passwd, retries=True):
+    """Get the HTTP session of the batched check."""
+
+    if pool is None:
+        return _rpc_session(url=url, user=user, passwd=passwd, retries=retries)
+    return pool.session(
+        url=url, port=port, user=user, passwd=passwd, retries=retries
     )
-    print("----Overall check, also considering P2P status----")
-    print(
-        json.dumps(
-            daemon_combined_status_check(
-                url=URL,
-                port=RPC_PORT,
-                p2p_port=P2P_PORT,
-                user=USER,
-                passwd=PASSWD,
-                consider_p2p=True,
+
+
+def _batch_last_block_rpc_status(
+    session, url, port, expires=None, http_timeout=None
+):
+    """Get the last block header and the hard fork info in a batch request.
+
+    Returns '(last_block_header, hard_fork_info, last_block_error, rpc_error)'
+    or 'None', if the daemon does not support batch requests.
+    """
+
+    try:
+        last_block, hard_fork_info = _timed(
+            LATENCY_BATCH,
+            f"{url}:{port}",
+            functools.partial(
+                daemon_rpc_batch,
+                [("get_last_block_header",), ("hard_fork_info",)],
+                session=session,
+                url=url,
+                port=port,
+                timeout=_remaining(expires, http_timeout),
+            ),
+        )
+    except (ValueError, JSONRPCException) as e:
+        if getattr(e, "code", None) == -341:
+            error = _deadline_error(expires, {"error": str(e)})
+            return None, None, error, error
+        _log(
+            logging.INFO,
+            {
+                "message": "Batch request failed, falling back to single requests.",
+                "error": str(e),
+            },
+        )
+        return None
+
+    last_block_header = last_block_error = rpc_error = None
+    if isinstance(last_block, Exception):
+        last_block_error = {"error": str(last_block)}
+    else:
+        last_block_header = last_block["block_header"]
+    if isinstance(hard_fork_info, Exception):
+        rpc_error = {"error": str(hard_fork_info)}
+        hard_fork_info = None
+
+    return last_block_header, hard_fork_info, last_block_error, rpc_error
+
+
+def _batched_last_block_rpc_status_check(
+    url=URL,
+    port=RPC_PORT,
+    user=USER,
+    passwd=PASSWD,
+    offset=OFFSET,
+    offset_unit=OFFSET_UNIT,
+    pool=None,
+    breaker=None,
+    deadline=None,
+    config=None,
+):
+    """Get last block and daemon RPC status with a single batch request.
+
+    Sends 'get_last_block_header' and 'hard_fork_info' in one JSON-RPC 2.0
+    batch request and splits the results into the results of
+    'daemon_last_block_check' and 'daemon_rpc_status_check'
+    ('LastBlockResult', 'RpcStatusResult').
+
+    Daemons not supporting batch requests are asked again method by method,
+    re-using the same HTTP session (keep-alive connection and digest
+    authentication). Such daemons are remembered by '(url, port)' and asked
+    method by method right away after their first failed batch request.
+    """
+
+    _load()
+
+    (
+        url,
+        port,
+        user,
+        passwd,
+        http_timeout,
+        offset,
+        offset_unit,
+        delta,
+    ) = _configure(
+        config,
+        url=url,
+        port=port,
+        user=user,
+        passwd=passwd,
+        http_timeout=None,
+        offset=offset,
+        offset_unit=offset_unit,
+        delta=None,
+    )
+    check_timestamp = datetime.datetime.utcnow().replace(microsecond=0)
+    expires = _expires(deadline)
+    breaker = _circuit_breaker(breaker)
+    error = _blocked(expires, breaker, url, port)
+    if error:
+        return (
+            _last_block_response(
+                url,
+                port,
+                error=error,
+                check_timestamp=check_timestamp,
+                offset=offset,
+                offset_unit=offset_unit,
+                delta=delta,
+            ),
+            _rpc_status_response(url, port, error=error),
+        )
+    if pool is None and USE_CONNECTION_POOL:
+        pool = CONNECTION_POOL
+    session = _batch_session(
+        pool, url, port, user, passwd, retries=expires is None
+    )
+    key = (url, int(port))
+
+    logger.info("Checking '%s:%s'.", url, port)
+
+    results = None
+    with _deadline(expires):
+        if key not in _NO_BATCH:
+            results = _batch_last_block_rpc_status(
+                session, url, port, expires=expires, http_timeout=http_timeout
+            )
+            if results is None:
+                _NO_BATCH.add(key)
+        if results is None:
+            results = _single_last_block_rpc_status(
+                session,
+                url,
+                port,
+                user,
+                passwd,
+                expires=expires,
+                http_timeout=http_timeout,
             )
+    last_block_header, hard_fork_info, last_block_error, rpc_error = results
+    last_block_error = _deadline_error(expires, last_block_error)
+    rpc_error = _deadline_error(expires, rpc_error)
+    if breaker is not None:
+        breaker.record(
+            url=url,
+            port=port,
+            success=last_block_error is None or rpc_error is None,
         )
+
+    last_block_result = _last_block_response(
+        url,
+        port,
+        last_block_header=last_block_header,
+        error=last_block_error,
+        check_timestamp=check_timestamp,
+        offset=offset,
+        offset_unit=offset_unit,
+        delta=delta,
+    )
+    rpc_result = _rpc_status_response(
+        url, port, hard_fork_info=hard_fork_info, error=rpc_error
     )
 
+    return last_block_result, rpc_result
+
+
+def _combined_response(url, last_block_result, stati_result, sync_result=None):
+    """Combine the last block (or sync) and the daemon stati results.
+
+    The results may be '_Result's or response dicts.
+    Used by the blocking and the asyncio checks alike.
+    """
+
+    result = CombinedResult(url)
+
+    last_block_status = DAEMON_STATUS_UNKNOWN
+    daemon_status = DAEMON_STATUS_UNKNOWN
+
+    if last_block_result:
+        last_block_status = _get(
+            last_block_result, "status", last_block_status
+        )
+        result.last_block = last_block_result
+
+    if sync_result:
+        # Replaces the last block.
+        last_block_status = _get(sync_result, "status", last_block_status)
+        result.sync = sync_result
+
+    if stati_result:
+        daemon_status = _get(stati_result, "status", daemon_status)
+        result.daemon = stati_result
+
+    stati_to_consider = (last_block_status, daemon_status)
+
+    max_weight = -1
+    for status_ in stati_to_consider:
+        max_weight = max(max_weight, DAEMON_STATUS_WEIGHTS_.get(status_, -1))
+
+    result.status = DAEMON_STATUS_WEIGHTS[max_weight]
+
+    message = f"Combined status is '{result.status}'."
+    data = {"message": message}
+    _log(logging.INFO, data)
+
+    return result
+
+
+def daemon_combined_status_check(
+    conn=None,
+    url=URL,
+    port=RPC_PORT,
+    p2p_port=P2P_PORT,
+    user=USER,
+    passwd=PASSWD,
+    consider_p2p=CONSIDER_P2P_STATUS,
+    batch=False,
+    sync=False,
+    pool=None,
+    parallel=PARALLEL_CHECKS,
+    p2p_depth=P2P_PROBE_DEPTH,
+    tracker=None,
+    breaker=None,
+    deadline=None,
+    as_dict=True,
+    config=None,
+):
+    """Check combined daemon status.
+
+    Checks all stati. Can inlcude dameon's P2P status.
+
+    Gets last block status from offset to determine an 'old'/'outdated' last block.
+    Gets Monero daemon status from Monero daemon RPC 'hard_fork_info'.
+    Considers Monero daemon P2P status in daemon status, if 'consider_p2p==True'. The result of the P2P check will always be included.
+
+    With 'batch==True' 'get_last_block_header' and 'hard_fork_info' are sent
+    in a single JSON-RPC 2.0 batch request.
+    With 'sync==True' a single 'get_info' ('daemon_sync_check') replaces
+    both: The result contains 'sync' instead of 'last_block' and the RPC
+    status is the one reported by 'get_info' (without hard fork version).
+    A syncing daemon is 'ERROR' because of the sync status, not because of
+    its old last block. Requires unrestricted RPC.
+    Uses a keep-alive connection of 'pool', if given.
+    All checks run concurrently, if 'parallel==True'.
+    The P2P port is probed to 'p2p_depth', see 'daemon_p2p_status_check'.
+    The last block is checked incrementally with 'tracker', see
+    'daemon_last_block_check' (not with 'batch==True').
+    The RPC checks respect the circuit of 'breaker', if given.
+
+    Returns within 'deadline' seconds, if given: Every sub-check gets the
+    time left as timeout for connecting and reading. Sub-checks running out
+    of time are 'UNKNOWN' with the error 'deadline_exceeded'.
+
+    Returns a 'CombinedResult', if 'as_dict==False'.
+    Uses the settings of the 'HealthConfig' 'config', if given.
+    """
+
+    url, consider_p2p = _configure(config, url=url, consider_p2p=consider_p2p)
+    expires = _expires(deadline)
+
+    sync_result = None
+    if sync:
+        last_block_result = None
+        sync_result, p2p_result = _run_checks(
+            functools.partial(
+                _within,
+                expires,
+                daemon_sync_check,
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                breaker=breaker,
+                as_dict=False,
+                config=config,
+            ),
+            functools.partial(
+                _within,
+                expires,
+                daemon_p2p_status_check,
+                url=url,
+                port=p2p_port,
+                depth=p2p_depth,
+                as_dict=False,
+                config=config,
+            ),
+            parallel=parallel,
+        )
+        stati_result = _stati_response(
+            url,
+            _sync_rpc_status_response(sync_result),
+            p2p_result,
+            consider_p2p,
+        )
+    elif batch:
+        (last_block_result, rpc_result), p2p_result = _run_checks(
+            functools.partial(
+                _within,
+                expires,
+                _batched_last_block_rpc_status_check,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                breaker=breaker,
+                config=config,
+            ),
+            functools.partial(
+                _within,
+                expires,
+                daemon_p2p_status_check,
+                url=url,
+                port=p2p_port,
+                depth=p2p_depth,
+                as_dict=False,
+                config=config,
+            ),
+            parallel=parallel,
+        )
+        stati_result = _stati_response(
+            url, rpc_result, p2p_result, consider_p2p
+        )
+    else:
+        last_block_result, stati_result = _run_checks(
+            functools.partial(
+                _within,
+                expires,
+                daemon_last_block_check,
+                conn=conn,
+                url=url,
+                port=port,
+                user=user,
+                passwd=passwd,
+                pool=pool,
+                tracker=tracker,
+                breaker=breaker,
+                as_dict=False,
+                config=config,
+            ),
+            # Check daemon stati.
+            functools.partial(
+                _within,
+                expires,
+                daemon_stati_check,
+                conn=conn,
+                url=url,
+                port=port,
+                p2p_port=p2p_port,
+                user=user,
+                passwd=passwd,
+                consider_p2p=consider_p2p,
+                pool=pool,
+                parallel=parallel,
+                p2p_depth=p2p_depth,
+                breaker=breaker,
+                as_dict=False,
+                config=config,
+            ),
+            parallel=parallel,
+        )
+
+    return _respond(
+        _combined_response(
+            url, last_block_result, stati_result, sync_result=sync_result
+        ),
+        as_dict,
+    )
+
+
+def main(argv=None):
+    """Run the command line interface, see 'monero_health.cli'."""
+
+    from monero_health import cli
+
+    return cli.main(argv)
+
+
+def serve(
+    address=HEALTH_SERVER_ADDRESS,
+    port=HEALTH_SERVER_PORT,
+    interval=HEALTH_POLL_INTERVAL,
+    check_kwargs=None,
+):
+    """Serve the daemon health via HTTP.
+
+    Exposes '/health', '/last_block', '/rpc' and '/p2p'.
+    The responses are refreshed in the background every 'interval' seconds
+    using 'daemon_combined_status_check(**check_kwargs)' and are answered
+    from memory.
+    """
+
+    from monero_health.server import HealthPoller, HealthServer
+
+    logging.basicConfig()
+    poller = HealthPoller(interval=interval, check_kwargs=check_kwargs)
+    poller.start()
+    server = HealthServer((address, int(port)), poller)
+    logger.info(f"Serving health on '{address}:{port}'.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        poller.stop()
+
 
 if __name__ == "__main__":
     sys.exit(main())
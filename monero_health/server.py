@@ -0,0 +1,215 @@
+"""HTTP health server backed by a background poller.
+
+A background thread runs 'daemon_combined_status_check' on an interval and
+keeps the rendered responses in memory.
+HTTP requests are answered from memory, so the probe latency does not depend
+on the daemon latency.
+
+Paths:
+* '/health': Response of 'daemon_combined_status_check'.
+* '/last_block': Response of 'daemon_last_block_check'.
+* '/sync': Response of 'daemon_sync_check'.
+* '/rpc': Response of 'daemon_rpc_status_check'.
+* '/p2p': Response of 'daemon_p2p_status_check'.
+* '/metrics': Prometheus metrics, see 'monero_health.metrics'.
+
+The HTTP status code is '200' for the status 'OK' and '503' otherwise.
+Polling with 'sync=True' answers '/sync' instead of '/last_block', the other
+one has no response.
+"""
+
+import http.server
+import json
+import logging
+import sys
+import threading
+import time
+
+from monero_health import metrics, monero_health
+from monero_health.monero_health import (
+    logger,
+    _log,
+    LAST_BLOCK_KEY,
+    SYNC_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+)
+
+HEALTH_PATH = "/health"
+LAST_BLOCK_PATH = "/last_block"
+SYNC_PATH = "/sync"
+RPC_PATH = "/rpc"
+P2P_PATH = "/p2p"
+METRICS_PATH = "/metrics"
+
+
+def _rpc_response(response):
+    """Restore the response of 'daemon_rpc_status_check'.
+
+    'daemon_stati_check' moves the RPC 'version' to the combined response.
+    """
+
+    daemon = response.get(DAEMON_KEY, {})
+    rpc = daemon.get(DAEMON_RPC_KEY)
+    if rpc is None:
+        return None
+    rpc = dict(rpc)
+    error = rpc.pop("error", None)
+    host = rpc.pop("host", None)
+    rpc["version"] = daemon.get("version", -1)
+    rpc["host"] = host
+    if error is not None:
+        rpc["error"] = error
+    return rpc
+
+
+def _p2p_response(response):
+    """Restore the response of 'daemon_p2p_status_check'.
+
+    'daemon_stati_check' moves the P2P 'version' of a 'handshake' probe to
+    the combined response.
+    """
+
+    daemon = response.get(DAEMON_KEY, {})
+    p2p = daemon.get(DAEMON_P2P_KEY)
+    if p2p is None or "height" not in p2p:
+        return p2p
+    p2p = dict(p2p)
+    height = p2p.pop("height")
+    hash_ = p2p.pop("hash", None)
+    p2p.update(
+        {"version": daemon.get("version", -1), "height": height, "hash": hash_}
+    )
+    return p2p
+
+
+RESPONSES = {
+    HEALTH_PATH: lambda response: response,
+    LAST_BLOCK_PATH: lambda response: response.get(LAST_BLOCK_KEY),
+    SYNC_PATH: lambda response: response.get(SYNC_KEY),
+    RPC_PATH: _rpc_response,
+    P2P_PATH: _p2p_response,
+}
+
+
+def _render(response):
+    """Render an HTTP status code and JSON body for a response."""
+
+    if response is None:
+        response = {
+            "status": DAEMON_STATUS_UNKNOWN,
+            "error": {
+                "message": "Cannot determine status.",
+                "error": "No response.",
+            },
+        }
+    code = 200 if response.get("status") == DAEMON_STATUS_OK else 503
+    return code, json.dumps(response).encode("utf-8")
+
+
+class HealthPoller:
+    """Refresh the combined daemon status in a background thread.
+
+    Keeps the rendered responses of all paths in memory.
+    """
+
+    def __init__(self, interval=5, check_kwargs=None, registry=None):
+        self.interval = float(interval)
+        self.check_kwargs = check_kwargs if check_kwargs else {}
+        self.registry = registry if registry else metrics.REGISTRY
+        self.result = None
+        self.timestamp = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._responses = {path: _render(None) for path in RESPONSES}
+
+    def poll(self):
+        """Run the combined check once and update the responses."""
+
+        try:
+            response = monero_health.daemon_combined_status_check(
+                **self.check_kwargs
+            )
+        except Exception as e:
+            data = {"message": "Cannot determine status.", "error": str(e)}
+            _log(logging.ERROR, data)
+            response = None
+
+        self.result = response
+        self._responses = {
+            path: _render(render(response) if response else None)
+            for path, render in RESPONSES.items()
+        }
+        self.timestamp = time.time()
+
+    def response(self, path):
+        """Get the HTTP status code and JSON body of a path, 'None' for unknown paths."""
+
+        return self._responses.get(path)
+
+    def metrics(self) -> bytes:
+        """Render the Prometheus metrics of the latest result."""
+
+        responses = {}
+        if self.result:
+            responses[self.result.get("host", "")] = self.result
+        return self.registry.render(responses).encode("utf-8")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        metrics.enable(self.registry)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        metrics.disable(self.registry)
+
+
+class HealthRequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "monero_health"
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        content_type = "application/json"
+        if path == METRICS_PATH:
+            code, body = 200, self.server.poller.metrics()
+            content_type = metrics.CONTENT_TYPE
+        else:
+            response = self.server.poller.response(path)
+            if response is None:
+                code, body = 404, json.dumps({"error": "Not found."}).encode()
+            else:
+                code, body = response
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class HealthServer(http.server.ThreadingHTTPServer):
+    """HTTP server answering health requests from a 'HealthPoller'."""
+
+    daemon_threads = True
+
+    def __init__(self, address, poller):
+        super().__init__(address, HealthRequestHandler)
+        self.poller = poller
+
+
+if __name__ == "__main__":
+    sys.exit(monero_health.serve())
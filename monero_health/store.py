@@ -0,0 +1,195 @@
+"""Opt-in on-disk history of the health checks.
+
+Appends the results of every check per host to a binary file of
+fixed-width records:
+    timestamp (float64), height (int64), block age (float64, seconds),
+    latency (float64, seconds), status weight (int8)
+Unknown block ages and latencies are NaN, unknown heights -1.
+
+The files are read through 'mmap', so any record is found in O(1) and a
+time range by binary search, without parsing JSON:
+    store = HistoryStore("/var/lib/monero_health")
+    history = CheckHistory(store=store)
+    ...
+    store.downtime("daemon_last_block_check", "node", 18081, since=start)
+"""
+
+import collections
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from monero_health.monero_health import (
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS_,
+)
+
+MAGIC = b"MHST\x01\x00\x00\x00"
+RECORD = struct.Struct("<dqddb7x")
+
+SUFFIX = ".mhs"
+
+Record = collections.namedtuple(
+    "Record", ("timestamp", "height", "block_age", "latency", "status")
+)
+
+_NAN = float("nan")
+
+
+def _name(value) -> str:
+    return re.sub(r"[^A-Za-z0-9.-]", "_", str(value))
+
+
+class RecordFile:
+    """Read-only, memory-mapped view of a history file.
+
+    Supports 'len()' and indexing, records are in the order appended.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Invalid history file '{path}'.")
+        # A partially written last record is ignored.
+        self._length = (len(self._mmap) - len(MAGIC)) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Record index out of range.")
+        return Record(
+            *RECORD.unpack_from(self._mmap, len(MAGIC) + index * RECORD.size)
+        )
+
+    def timestamp(self, index):
+        return struct.unpack_from(
+            "<d", self._mmap, len(MAGIC) + index * RECORD.size
+        )[0]
+
+    def bisect(self, timestamp):
+        """Get the index of the first record not older than 'timestamp'."""
+
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def records(self, since=None, until=None):
+        """Yield the records between 'since' and 'until' (inclusive)."""
+
+        start = 0 if since is None else self.bisect(since)
+        for index in range(start, self._length):
+            record = self[index]
+            if until is not None and record.timestamp > until:
+                break
+            yield record
+
+    def close(self):
+        self._mmap.close()
+
+
+class HistoryStore:
+    """Append-only history files keyed by '(check, url, port)'.
+
+    One file per check and host below 'directory'.
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self._lock = threading.Lock()
+
+    def path(self, check, url, port=None) -> str:
+        host = _name(url) if port is None else f"{_name(url)}_{int(port)}"
+        return os.path.join(self.directory, _name(check), host + SUFFIX)
+
+    def append(
+        self,
+        check,
+        url,
+        port=None,
+        status=DAEMON_STATUS_UNKNOWN,
+        height=None,
+        block_age=None,
+        latency=None,
+        timestamp=None,
+    ):
+        """Append a single result.
+
+        'block_age' and 'latency' are seconds, 'timestamp' defaults to now
+        ('time.time()').
+        """
+
+        record = RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            -1 if height is None else height,
+            _NAN if block_age is None else block_age,
+            _NAN if latency is None else latency,
+            DAEMON_STATUS_WEIGHTS_.get(
+                status, DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_UNKNOWN]
+            ),
+        )
+        path = self.path(check, url, port)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                f.write(record)
+
+    def open(self, check, url, port=None):
+        """Get the 'RecordFile' of a check and host.
+
+        Raises 'FileNotFoundError' if nothing was recorded.
+        """
+
+        return RecordFile(self.path(check, url, port))
+
+    def downtime(self, check, url, port=None, since=None, until=None):
+        """Get the intervals a check was not 'OK'.
+
+        Returns '(start, end)' timestamps: A downtime starts with the first
+        result not 'OK' and ends with the next 'OK' result. A downtime
+        lasting until the last result ends with 'until', if given, or the
+        last result.
+        """
+
+        ok = DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_OK]
+        intervals = []
+        try:
+            records = self.open(check, url, port)
+        except FileNotFoundError:
+            return intervals
+
+        with records:
+            start = last = None
+            for record in records.records(since=since, until=until):
+                last = record.timestamp
+                if record.status != ok and start is None:
+                    start = record.timestamp
+                elif record.status == ok and start is not None:
+                    intervals.append((start, record.timestamp))
+                    start = None
+            if start is not None:
+                intervals.append((start, last if until is None else until))
+
+        return intervals
@@ -0,0 +1,119 @@
+"""Watch the daemon health with an adaptive polling interval.
+
+Runs 'daemon_combined_status_check' repeatedly:
+* While all stati are 'OK', the interval backs off towards 'max_interval'.
+* As soon as any status (combined, last block, RPC, P2P) is 'UNKNOWN' or
+  'ERROR', the interval drops to 'min_interval'.
+
+Run as a script to print every result as a JSON line:
+    MONEROD_URL=mainnet.community.xmr.to python -m monero_health.watch
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+
+from monero_health import monero_health
+from monero_health.monero_health import (
+    _log,
+    DAEMON_STATUS_OK,
+    WATCH_MIN_INTERVAL,
+    WATCH_MAX_INTERVAL,
+    WATCH_BACKOFF,
+)
+
+
+def stati(response):
+    """Get all stati of a (nested) check response."""
+
+    found = []
+    if isinstance(response, dict):
+        if "status" in response:
+            found.append(response["status"])
+        for value in response.values():
+            if isinstance(value, dict):
+                found += stati(value)
+    return found
+
+
+class AdaptiveInterval:
+    """Polling interval backing off while healthy.
+
+    Multiplies the interval by 'backoff' after every healthy result up to
+    'max_interval', resets it to 'min_interval' after any unhealthy one.
+    """
+
+    def __init__(
+        self,
+        min_interval=WATCH_MIN_INTERVAL,
+        max_interval=WATCH_MAX_INTERVAL,
+        backoff=WATCH_BACKOFF,
+    ):
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.backoff = max(float(backoff), 1.0)
+        self.interval = self.min_interval
+
+    def update(self, response):
+        """Get the interval until the next check after 'response'."""
+
+        if response and all(
+            status == DAEMON_STATUS_OK for status in stati(response)
+        ):
+            self.interval = min(
+                self.interval * self.backoff, self.max_interval
+            )
+        else:
+            self.interval = self.min_interval
+        return self.interval
+
+
+def watch(
+    check_kwargs=None,
+    min_interval=WATCH_MIN_INTERVAL,
+    max_interval=WATCH_MAX_INTERVAL,
+    backoff=WATCH_BACKOFF,
+    stop=None,
+):
+    """Yield 'daemon_combined_status_check(**check_kwargs)' results.
+
+    Waits an adaptive interval (see 'AdaptiveInterval') between the starts
+    of two checks. Stops when the 'threading.Event' 'stop' is set.
+    """
+
+    check_kwargs = check_kwargs if check_kwargs else {}
+    stop = stop if stop is not None else threading.Event()
+    interval = AdaptiveInterval(
+        min_interval=min_interval, max_interval=max_interval, backoff=backoff
+    )
+    while not stop.is_set():
+        start = time.monotonic()
+        try:
+            response = monero_health.daemon_combined_status_check(
+                **check_kwargs
+            )
+        except Exception as e:
+            data = {"message": "Cannot determine status.", "error": str(e)}
+            _log(logging.ERROR, data)
+            response = None
+        yield response
+        stop.wait(
+            max(0.0, interval.update(response) - (time.monotonic() - start))
+        )
+
+
+def main():
+    logging.basicConfig()
+    try:
+        for response in watch():
+            print(json.dumps(response), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,7 +22,8 @@ setup(
         "Natural Language :: English",
         "Programming Language :: Python",
     ],
-    packages=find_packages(exclude=["tests*"]),
+    packages=find_packages(exclude=["tests*", "benchmarks*"]),
     install_requires=["python-monerorpc>=0.5.12", "monero-scripts>=0.0.7"],
     extras_require={"test": ["mock", "pytest"]},
+    entry_points={"console_scripts": ["monero-health=monero_health.cli:main"]},
 )
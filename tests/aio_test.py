@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import re
+
+from monero_health import aio
+from monero_health.monero_health import (
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+REALM = "monero-rpc"
+NONCE = "abcdef0123456789"
+
+RESULTS = {
+    "get_last_block_header": {
+        "block_header": {
+            "timestamp": 1576828533,
+            "hash": "3f82c93e6f7726a54724d0b8b1026bec878af449bc2f97e9a916c6af72a6367a",
+        },
+        "status": "OK",
+    },
+    "hard_fork_info": {"status": DAEMON_STATUS_OK, "version": 12},
+}
+
+
+def _md5(data):
+    return hashlib.md5(data.encode()).hexdigest()
+
+
+async def _handle(reader, writer, user, passwd, requests):
+    """Tiny monerod JSON-RPC stand-in requiring digest authentication."""
+
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode().split("\r\n")
+            headers = {
+                k.strip().lower(): v.strip()
+                for k, _, v in (line.partition(":") for line in lines[1:])
+            }
+            body = await reader.readexactly(int(headers["content-length"]))
+            authorization = headers.get("authorization", "")
+            params = dict(
+                (k, a or b)
+                for k, a, b in re.findall(
+                    r'(\w+)=(?:"([^"]*)"|([^,\s]*))', authorization
+                )
+            )
+            ha1 = _md5(f"{user}:{REALM}:{passwd}")
+            ha2 = _md5(f"POST:{params.get('uri')}")
+            expected = _md5(
+                f"{ha1}:{NONCE}:{params.get('nc')}:"
+                f"{params.get('cnonce')}:auth:{ha2}"
+            )
+            if params.get("response") != expected:
+                writer.write(
+                    (
+                        "HTTP/1.1 401 Unauthorized\r\n"
+                        'WWW-Authenticate: Digest qop="auth",algorithm=MD5,'
+                        f'realm="{REALM}",nonce="{NONCE}"\r\n'
+                        "Content-Length: 0\r\n\r\n"
+                    ).encode()
+                )
+                await writer.drain()
+                continue
+            method = json.loads(body)["method"]
+            requests.append(method)
+            payload = json.dumps(
+                {"jsonrpc": "2.0", "id": 0, "result": RESULTS[method]}
+            ).encode()
+            writer.write(
+                b"HTTP/1.1 200 Ok\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _serve(user="user", passwd="passwd"):
+    requests = []
+    server = await asyncio.start_server(
+        lambda r, w: _handle(r, w, user, passwd, requests), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    return server, port, requests
+
+
+def _free_port():
+    async def _port():
+        server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        return port
+
+    return asyncio.run(_port())
+
+
+def test_async_last_block_check():
+    async def run():
+        server, port, requests = await _serve()
+        async with server:
+            return await aio.daemon_last_block_check(
+                url="127.0.0.1", port=port, user="user", passwd="passwd"
+            )
+
+    response = asyncio.run(run())
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["block_timestamp"] == "2019-12-20T07:55:33"
+    assert (
+        response["hash"]
+        == "3f82c93e6f7726a54724d0b8b1026bec878af449bc2f97e9a916c6af72a6367a"
+    )
+    assert response["error"]["message"] == (
+        "Last block's timestamp is older than '12 [minutes]'."
+    )
+
+
+def test_async_rpc_status_check_reuses_connection():
+    async def run():
+        server, port, requests = await _serve()
+        async with server:
+            async with aio.AsyncDaemonRPC(
+                url="127.0.0.1", port=port, user="user", passwd="passwd"
+            ) as conn:
+                first = await aio.daemon_rpc_status_check(
+                    conn=conn, url="127.0.0.1", port=port
+                )
+                second = await aio.daemon_rpc_status_check(
+                    conn=conn, url="127.0.0.1", port=port
+                )
+        return first, second, requests
+
+    first, second, requests = asyncio.run(run())
+
+    assert first == second
+    assert first == {
+        "status": DAEMON_STATUS_OK,
+        "version": 12,
+        "host": f"127.0.0.1:{first['host'].split(':')[1]}",
+    }
+    assert requests == ["hard_fork_info", "hard_fork_info"]
+
+
+def test_async_rpc_status_check_connection_refused():
+    port = _free_port()
+
+    response = asyncio.run(
+        aio.daemon_rpc_status_check(url="127.0.0.1", port=port)
+    )
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["version"] == -1
+    assert response["error"]["message"] == "Cannot determine status."
+    assert response["error"]["error"].startswith(
+        "-341: Could not establish a connection"
+    )
+
+
+def test_async_p2p_status_check():
+    async def run():
+        server = await asyncio.start_server(
+            lambda r, w: w.close(), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await aio.daemon_p2p_status_check(
+                url="127.0.0.1", port=port
+            )
+
+    response = asyncio.run(run())
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert "error" not in response
+
+    response = asyncio.run(
+        aio.daemon_p2p_status_check(url="127.0.0.1", port=_free_port())
+    )
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert (
+        response["error"]["message"] == f"Status is '{DAEMON_STATUS_ERROR}'."
+    )
+
+
+def test_async_combined_status_check():
+    async def run():
+        server, port, requests = await _serve()
+        async with server:
+            return await aio.daemon_combined_status_check(
+                url="127.0.0.1",
+                port=port,
+                p2p_port=port,
+                user="user",
+                passwd="passwd",
+                consider_p2p=True,
+            )
+
+    response = asyncio.run(run())
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["host"] == "127.0.0.1"
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_ERROR
+    assert response[DAEMON_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_KEY]["version"] == 12
+    assert "version" not in response[DAEMON_KEY][DAEMON_RPC_KEY]
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY]["status"] == DAEMON_STATUS_OK
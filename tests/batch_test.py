@@ -0,0 +1,175 @@
+import mock
+import json
+
+import pytest
+
+from monerorpc.authproxy import JSONRPCException
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from monero_health.monero_health import (
+    daemon_combined_status_check,
+    daemon_rpc_batch,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+LAST_BLOCK_HEADER = {
+    "block_header": {
+        "timestamp": "1576828533",
+        "hash": "3f82c93e6f7726a54724d0b8b1026bec878af449bc2f97e9a916c6af72a6367a",
+    },
+}
+HARD_FORK_INFO = {"status": DAEMON_STATUS_OK, "version": 12}
+
+
+def _http_response(payload, status_code=200):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.text = json.dumps(payload)
+    return response
+
+
+def test_daemon_rpc_batch():
+    session = mock.Mock()
+    session.post.return_value = _http_response(
+        [
+            {"jsonrpc": "2.0", "id": 1, "result": HARD_FORK_INFO},
+            {
+                "jsonrpc": "2.0",
+                "id": 0,
+                "error": {"code": -1, "message": "Some error."},
+            },
+        ]
+    )
+
+    results = daemon_rpc_batch(
+        [("get_last_block_header",), ("hard_fork_info", {})], session=session
+    )
+
+    assert isinstance(results[0], JSONRPCException)
+    assert str(results[0]) == "-1: Some error."
+    assert results[1] == HARD_FORK_INFO
+
+    postdata = json.loads(session.post.call_args[1]["data"])
+    assert [call["method"] for call in postdata] == [
+        "get_last_block_header",
+        "hard_fork_info",
+    ]
+    assert (
+        session.post.call_args[1]["url"] == "http://127.0.0.1:18081/json_rpc"
+    )
+
+
+def test_daemon_rpc_batch_not_supported():
+    session = mock.Mock()
+    session.post.return_value = _http_response(
+        {"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}
+    )
+
+    with pytest.raises(JSONRPCException) as e:
+        daemon_rpc_batch([("hard_fork_info",)], session=session)
+
+    assert str(e.value) == "-32700: Parse error"
+
+
+@mock.patch(
+    "monero_health.monero_health.connect_to_node.try_to_connect_keep_errors"
+)
+@mock.patch("monero_health.monero_health.is_timestamp_within_offset")
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_combined_status_batch(
+    mock_session, mock_monero_rpc, mock_time_range, mock_socket
+):
+    mock_session.return_value.post.return_value = _http_response(
+        [
+            {"jsonrpc": "2.0", "id": 0, "result": LAST_BLOCK_HEADER},
+            {"jsonrpc": "2.0", "id": 1, "result": HARD_FORK_INFO},
+        ]
+    )
+    mock_time_range.return_value = (True, 12, "minutes")
+
+    response = daemon_combined_status_check(batch=True, consider_p2p=True)
+
+    assert mock_session.return_value.post.call_count == 1
+    assert not mock_monero_rpc.called
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["host"] == "127.0.0.1"
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[LAST_BLOCK_KEY]["host"] == "127.0.0.1:18081"
+    assert response[LAST_BLOCK_KEY]["block_timestamp"] == "2019-12-20T07:55:33"
+    assert response[DAEMON_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_KEY]["version"] == 12
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY] == {
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1:18081",
+    }
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY] == {
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1:18080",
+    }
+
+
+@mock.patch(
+    "monero_health.monero_health.connect_to_node.try_to_connect_keep_errors"
+)
+@mock.patch("monero_health.monero_health.is_timestamp_within_offset")
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_combined_status_batch_fallback(
+    mock_session, mock_monero_rpc, mock_time_range, mock_socket
+):
+    mock_session.return_value.post.return_value = _http_response(
+        {"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}}
+    )
+    mock_monero_rpc.return_value.get_last_block_header.return_value = (
+        LAST_BLOCK_HEADER
+    )
+    mock_monero_rpc.return_value.hard_fork_info.return_value = {
+        "status": DAEMON_STATUS_ERROR,
+        "version": 12,
+    }
+    mock_time_range.return_value = (True, 12, "minutes")
+
+    response = daemon_combined_status_check(batch=True)
+
+    # The single requests re-use the HTTP session of the batch request.
+    assert (
+        mock_monero_rpc.call_args[1]["connection"] is mock_session.return_value
+    )
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY]["status"] == (
+        DAEMON_STATUS_ERROR
+    )
+
+
+@mock.patch(
+    "monero_health.monero_health.connect_to_node.try_to_connect_keep_errors"
+)
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_combined_status_batch_connection_error(
+    mock_session, mock_monero_rpc, mock_socket
+):
+    mock_session.return_value.post.side_effect = RequestsConnectionError(
+        "Connection refused."
+    )
+
+    response = daemon_combined_status_check(batch=True)
+
+    assert not mock_monero_rpc.called
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_UNKNOWN
+    assert response[LAST_BLOCK_KEY]["error"]["error"] == (
+        "-341: Could not establish a connection, original error: 'Connection refused.'."
+    )
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY]["status"] == (
+        DAEMON_STATUS_UNKNOWN
+    )
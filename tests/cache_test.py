@@ -0,0 +1,111 @@
+import threading
+import time
+
+from monero_health.cache import CheckCache, CACHE_KEY
+from monero_health.monero_health import (
+    daemon_rpc_status_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+)
+
+from tests.stub_monerod import StubMonerod
+
+
+class _Check:
+    """Check stand-in counting its calls."""
+
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.status = DAEMON_STATUS_OK
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, url="127.0.0.1", port=18081, conn=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {"status": self.status, "host": f"{url}:{port}"}
+
+
+def _check(check_):
+    def daemon_rpc_status_check(url="127.0.0.1", port=18081, conn=None):
+        return check_(url=url, port=port, conn=conn)
+
+    return daemon_rpc_status_check
+
+
+def test_cache_hit():
+    counter = _Check()
+    check = _check(counter)
+    cache = CheckCache(ttl=60)
+
+    first = cache.call(check)
+    second = cache.call(check, url="127.0.0.1", port=18081, conn=object())
+
+    assert counter.calls == 1
+    assert first["status"] == DAEMON_STATUS_OK
+    assert first[CACHE_KEY] == {"age": 0.0, "stale": False}
+    assert not second[CACHE_KEY]["stale"]
+
+    # Another host and port are cached separately.
+    cache.call(check, url="node1")
+    cache.call(check, port=28081)
+
+    assert counter.calls == 3
+    assert len(cache) == 3
+
+
+def test_cache_stale_while_revalidate():
+    counter = _Check(delay=0.2)
+    check = _check(counter)
+    cache = CheckCache(ttl=0.3)
+
+    cache.call(check)
+    counter.status = DAEMON_STATUS_ERROR
+    time.sleep(0.35)
+
+    start = time.monotonic()
+    stale = cache.call(check)
+    stale_again = cache.call(check)
+    duration = time.monotonic() - start
+
+    # The stale result is returned immediately, only one refresh is running.
+    assert duration < 0.1
+    assert stale["status"] == DAEMON_STATUS_OK
+    assert stale[CACHE_KEY]["stale"]
+    assert stale[CACHE_KEY]["age"] >= 0.35
+    assert stale_again["status"] == DAEMON_STATUS_OK
+
+    time.sleep(0.25)
+    refreshed = cache.call(check)
+
+    assert counter.calls == 2
+    assert refreshed["status"] == DAEMON_STATUS_ERROR
+    assert not refreshed[CACHE_KEY]["stale"]
+
+
+def test_cache_wrap_does_not_share_responses():
+    counter = _Check()
+    cached_check = CheckCache(ttl=60).wrap(_check(counter))
+
+    response = cached_check()
+    response["status"] = "changed"
+
+    assert cached_check.__name__ == "daemon_rpc_status_check"
+    assert cached_check()["status"] == DAEMON_STATUS_OK
+    assert counter.calls == 1
+
+
+def test_cache_result_objects():
+    cache = CheckCache(ttl=60)
+
+    with StubMonerod() as monerod:
+        response = cache.call(
+            daemon_rpc_status_check,
+            as_dict=False,
+            **monerod.check_kwargs(p2p=False),
+        )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["version"] == monerod.version
+    assert response[CACHE_KEY] == {"age": 0.0, "stale": False}
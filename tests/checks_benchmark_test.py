@@ -0,0 +1,57 @@
+import logging
+
+from benchmarks.checks_benchmark import main, percentile
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([1.0], 99) == 1.0
+
+
+def test_benchmark_smoke(capsys):
+    loggers = [
+        logging.getLogger(name)
+        for name in (
+            "DaemonHealth",
+            "monero_scripts.connect_to_node",
+            "urllib3.connectionpool",
+        )
+    ]
+    levels = [logger.level for logger in loggers]
+    try:
+        assert (
+            main(
+                [
+                    "--requests",
+                    "2",
+                    "--concurrency",
+                    "1",
+                    "2",
+                    "--checks",
+                    "(tcp)",
+                ]
+            )
+            == 0
+        )
+    finally:
+        for logger, level in zip(loggers, levels):
+            logger.setLevel(level)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == [
+        "check",
+        "conc",
+        "checks/s",
+        "p50",
+        "[ms]",
+        "p99",
+        "[ms]",
+    ]
+    assert [line.split()[:2] for line in lines[1:]] == [
+        ["daemon_p2p_status_check(tcp)", "1"],
+        ["daemon_p2p_status_check(tcp)", "2"],
+    ]
@@ -0,0 +1,172 @@
+import mock
+import os
+import subprocess  # nosec
+import sys
+import time
+
+import pytest
+
+from monerorpc.authproxy import JSONRPCException
+
+from monero_health.monero_health import (
+    CircuitBreaker,
+    daemon_last_block_check,
+    daemon_rpc_status_check,
+    daemon_combined_status_check,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
+    ERROR_CIRCUIT_OPEN,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_RPC_KEY,
+)
+
+CONNECTION_ERROR = JSONRPCException(
+    {
+        "code": -341,
+        "message": "Could not establish a connection, original error: 'Timeout.'.",
+    }
+)
+
+
+def test_circuit_breaker_states():
+    breaker = CircuitBreaker(failures=2, cooldown=0.2)
+
+    assert breaker.state(url="node", port=18081) == CIRCUIT_CLOSED
+    breaker.record(url="node", port=18081, success=False)
+    assert breaker.allow(url="node", port=18081)
+    breaker.record(url="node", port="18081", success=False)
+
+    assert breaker.state(url="node", port=18081) == CIRCUIT_OPEN
+    assert not breaker.allow(url="node", port=18081)
+    # Other daemons are not affected.
+    assert breaker.allow(url="node", port=18082)
+
+    time.sleep(0.25)
+
+    assert breaker.state(url="node", port=18081) == CIRCUIT_HALF_OPEN
+    # A single trial per cooldown window.
+    assert breaker.allow(url="node", port=18081)
+    assert not breaker.allow(url="node", port=18081)
+    # Failed trial.
+    breaker.record(url="node", port=18081, success=False)
+    assert breaker.state(url="node", port=18081) == CIRCUIT_OPEN
+
+    time.sleep(0.25)
+
+    assert breaker.allow(url="node", port=18081)
+    breaker.record(url="node", port=18081, success=True)
+    assert breaker.state(url="node", port=18081) == CIRCUIT_CLOSED
+    assert len(breaker) == 0
+
+
+def test_circuit_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failures=2, cooldown=60)
+
+    breaker.record(url="node", port=18081, success=False)
+    breaker.record(url="node", port=18081, success=True)
+    breaker.record(url="node", port=18081, success=False)
+
+    assert breaker.state(url="node", port=18081) == CIRCUIT_CLOSED
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_rpc_status_check_circuit_open(mock_monero_rpc, caplog):
+    mock_monero_rpc.return_value.hard_fork_info.side_effect = CONNECTION_ERROR
+    breaker = CircuitBreaker(failures=2, cooldown=60)
+
+    responses = [
+        daemon_rpc_status_check(url="node", port=18081, breaker=breaker)
+        for _ in range(4)
+    ]
+
+    assert [response["status"] for response in responses] == [
+        DAEMON_STATUS_UNKNOWN
+    ] * 4
+    # The daemon is not contacted while the circuit is open.
+    assert mock_monero_rpc.return_value.hard_fork_info.call_count == 2
+    assert responses[1]["error"]["error"] == str(CONNECTION_ERROR)
+    assert responses[2]["error"] == {
+        "message": "Cannot determine status.",
+        "error": ERROR_CIRCUIT_OPEN,
+    }
+    assert responses[3]["host"] == "node:18081"
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_last_block_check_circuit_open(mock_monero_rpc):
+    mock_monero_rpc.return_value.get_last_block_header.side_effect = (
+        CONNECTION_ERROR
+    )
+    breaker = CircuitBreaker(failures=1, cooldown=60)
+
+    daemon_last_block_check(url="node", port=18081, breaker=breaker)
+    response = daemon_last_block_check(url="node", port=18081, breaker=breaker)
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"]["error"] == ERROR_CIRCUIT_OPEN
+    assert mock_monero_rpc.return_value.get_last_block_header.call_count == 1
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_rpc_status_check_half_open_success(mock_monero_rpc):
+    mock_monero_rpc.return_value.hard_fork_info.side_effect = [
+        CONNECTION_ERROR,
+        {"status": DAEMON_STATUS_OK, "version": 12},
+    ]
+    breaker = CircuitBreaker(failures=1, cooldown=0.1)
+
+    daemon_rpc_status_check(url="node", port=18081, breaker=breaker)
+    time.sleep(0.15)
+    response = daemon_rpc_status_check(url="node", port=18081, breaker=breaker)
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert breaker.state(url="node", port=18081) == CIRCUIT_CLOSED
+
+
+@mock.patch("monero_health.monero_health.connect_to_node")
+@mock.patch("monero_health.monero_health.daemon_rpc_batch")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_combined_status_check_batch_circuit_open(
+    mock_session, mock_batch, mock_connect_to_node
+):
+    mock_batch.side_effect = CONNECTION_ERROR
+    breaker = CircuitBreaker(failures=1, cooldown=60)
+
+    for _ in range(2):
+        response = daemon_combined_status_check(
+            url="node", port=18081, batch=True, breaker=breaker
+        )
+
+    assert mock_batch.call_count == 1
+    assert response[LAST_BLOCK_KEY]["error"]["error"] == ERROR_CIRCUIT_OPEN
+    assert (
+        response[DAEMON_KEY][DAEMON_RPC_KEY]["error"]["error"]
+        == ERROR_CIRCUIT_OPEN
+    )
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"CIRCUIT_BREAKER_FAILURES": "abc"},
+        {"CIRCUIT_BREAKER_COOLDOWN": "x"},
+    ],
+)
+def test_circuit_breaker_invalid_environment(env):
+    output = subprocess.check_output(  # nosec
+        [
+            sys.executable,
+            "-c",
+            "from monero_health.monero_health import CIRCUIT_BREAKER;"
+            "print(CIRCUIT_BREAKER.failures, CIRCUIT_BREAKER.cooldown)",
+        ],
+        env=dict(os.environ, **env),
+    )
+
+    # Falls back to the defaults.
+    assert output.split() == [b"3", b"30.0"]
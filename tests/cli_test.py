@@ -0,0 +1,211 @@
+import io
+import json
+import threading
+
+import mock
+import pytest
+
+from monero_health import cli
+from monero_health.fleet import FLEET_HOSTS_KEY, FLEET_SUMMARY_KEY
+from monero_health.monero_health import (
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+from tests.stub_monerod import StubMonerod
+
+
+def _hosts_file(tmp_path, *monerods):
+    hosts_file = tmp_path / "hosts.txt"
+    hosts_file.write_text(
+        "# url rpc_port p2p_port user passwd\n\n"
+        + "".join(
+            f"127.0.0.1 {monerod.rpc_port} {monerod.p2p_port} "
+            f"{monerod.user} {monerod.passwd}\n"
+            for monerod in monerods
+        )
+    )
+    return str(hosts_file)
+
+
+def _run(argv):
+    out = io.StringIO()
+    code = cli.main(argv, out=out)
+    return code, out.getvalue().splitlines()
+
+
+def test_read_hosts():
+    assert cli.read_hosts(["# comment", "", " node  28081 ", "other"]) == [
+        ("node", "28081", 18080, "", ""),
+        ("other", 18081, 18080, "", ""),
+    ]
+
+
+def test_cli_single_host(monerod):
+    with mock.patch.multiple(
+        "monero_health.cli",
+        RPC_PORT=monerod.rpc_port,
+        P2P_PORT=monerod.p2p_port,
+        USER=monerod.user,
+        PASSWD=monerod.passwd,
+    ):
+        code, lines = _run([])
+
+    assert code == 0
+    assert len(lines) == 1
+    response = json.loads(lines[0])
+    assert response["status"] == DAEMON_STATUS_OK
+    assert LAST_BLOCK_KEY in response
+    assert DAEMON_KEY in response
+
+
+def test_cli_hosts_file_json(monerod, tmp_path):
+    code, lines = _run(["--hosts-file", _hosts_file(tmp_path, monerod)])
+
+    assert code == 0
+    document = json.loads(lines[0])
+    assert list(document[FLEET_HOSTS_KEY]) == [f"127.0.0.1:{monerod.rpc_port}"]
+    assert document[FLEET_SUMMARY_KEY]["status"] == DAEMON_STATUS_OK
+    assert document[FLEET_SUMMARY_KEY]["hosts"] == 1
+
+
+def test_cli_checks_run_once(monerod, tmp_path):
+    """The RPC and P2P results are taken from the stati check."""
+
+    code, lines = _run(
+        [
+            "--hosts-file",
+            _hosts_file(tmp_path, monerod),
+            "--check",
+            "rpc",
+            "p2p",
+            "stati",
+            "--format",
+            "ndjson",
+        ]
+    )
+
+    assert code == 0
+    response = json.loads(lines[0])
+    assert list(response) == ["rpc", "p2p", "stati", "status", "host"]
+    assert response["rpc"]["version"] == monerod.version
+    assert response["stati"][DAEMON_RPC_KEY] == {
+        "status": DAEMON_STATUS_OK,
+        "host": f"127.0.0.1:{monerod.rpc_port}",
+    }
+    assert response["stati"][DAEMON_P2P_KEY]["status"] == DAEMON_STATUS_OK
+    # A single 'hard_fork_info' request and P2P connection.
+    assert monerod.requests == ["/json_rpc"]
+    assert monerod.p2p_connections == 1
+
+
+@pytest.mark.parametrize(
+    "checks, called",
+    [
+        (["last_block"], "daemon_last_block_check"),
+        (["rpc"], "daemon_rpc_status_check"),
+        (["p2p"], "daemon_p2p_status_check"),
+        (["rpc", "stati"], "daemon_stati_check"),
+        (["last_block", "rpc"], "daemon_combined_status_check"),
+        (["combined", "stati"], "daemon_combined_status_check"),
+    ],
+)
+def test_run_checks_single_check(checks, called):
+    target = ("node", 18081, 18080, "", "")
+    with mock.patch.multiple(
+        "monero_health.monero_health",
+        daemon_last_block_check=mock.DEFAULT,
+        daemon_rpc_status_check=mock.DEFAULT,
+        daemon_p2p_status_check=mock.DEFAULT,
+        daemon_stati_check=mock.DEFAULT,
+        daemon_combined_status_check=mock.DEFAULT,
+    ) as mocks:
+        results = cli.run_checks(target, checks=checks)
+
+    assert list(results) == [check for check in cli.CHECKS if check in checks]
+    for name, mock_check in mocks.items():
+        assert mock_check.call_count == (1 if name == called else 0)
+
+
+def test_cli_multiple_hosts_ndjson(tmp_path):
+    with StubMonerod() as first, StubMonerod(status="ERROR") as second:
+        code, lines = _run(
+            [
+                "--hosts-file",
+                _hosts_file(tmp_path, first, second),
+                "--check",
+                "rpc",
+                "--parallel",
+                "2",
+                "--format",
+                "ndjson",
+            ]
+        )
+
+    # In completion order.
+    statuses = {
+        response["host"]: response["status"]
+        for response in map(json.loads, lines)
+    }
+    assert statuses == {
+        f"127.0.0.1:{first.rpc_port}": DAEMON_STATUS_OK,
+        f"127.0.0.1:{second.rpc_port}": DAEMON_STATUS_ERROR,
+    }
+    assert code == cli.EXIT_CODES[DAEMON_STATUS_ERROR]
+
+
+def test_cli_exit_code_unreachable(tmp_path):
+    hosts_file = tmp_path / "hosts.txt"
+    hosts_file.write_text("127.0.0.1 1 1\n")
+
+    code, lines = _run(
+        ["--hosts-file", str(hosts_file), "--format", "exit-code"]
+    )
+
+    assert lines == []
+    assert code == cli.EXIT_CODE_UNKNOWN
+
+
+def test_cli_host_error():
+    with mock.patch(
+        "monero_health.cli.run_checks", side_effect=Exception("Boom.")
+    ):
+        response = cli.host_response(("node", 18081, 18080, "", ""))
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["host"] == "node:18081"
+    assert response["error"]["error"] == "Boom."
+
+
+def test_cli_watch(monerod, tmp_path):
+    stop = threading.Event()
+    out = io.StringIO()
+    waits = []
+
+    def wait(timeout):
+        waits.append(timeout)
+        return len(waits) == 3
+
+    stop.wait = wait
+
+    code = cli.main(
+        [
+            "--hosts-file",
+            _hosts_file(tmp_path, monerod),
+            "--watch",
+            "0.5",
+            "--format",
+            "ndjson",
+        ],
+        out=out,
+        stop=stop,
+    )
+
+    assert code == 0
+    assert waits == [0.5] * 3
+    assert len(out.getvalue().splitlines()) == 3
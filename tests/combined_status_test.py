@@ -2,6 +2,7 @@ import mock
 import logging
 import json
 import socket
+import time
 
 from monerorpc.authproxy import JSONRPCException
 
@@ -815,3 +816,37 @@ def test_combined_status_unknown_daemon_p2p_status(
             json_message["message"] == "Cannot determine status."
         ), "Wrong log message."
     caplog.clear()
+
+
+@mock.patch("monero_health.monero_health.daemon_rpc_status_check")
+@mock.patch("monero_health.monero_health.daemon_p2p_status_check")
+@mock.patch("monero_health.monero_health.daemon_last_block_check")
+def test_combined_status_parallel(
+    mock_last_block, mock_daemon_p2p_status, mock_daemon_rpc_status
+):
+    def slow(result):
+        def check(**kwargs):
+            time.sleep(0.3)
+            return dict(result)
+
+        return check
+
+    mock_last_block.side_effect = slow(
+        {"status": DAEMON_STATUS_OK, "host": "127.0.0.1:18081"}
+    )
+    mock_daemon_rpc_status.side_effect = slow(
+        {"status": DAEMON_STATUS_OK, "version": 12, "host": "127.0.0.1:18081"}
+    )
+    mock_daemon_p2p_status.side_effect = slow(
+        {"status": DAEMON_STATUS_OK, "host": "127.0.0.1:18080"}
+    )
+
+    start = time.monotonic()
+    response = daemon_combined_status_check(consider_p2p=True)
+    duration = time.monotonic() - start
+
+    assert duration < 0.6
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_KEY]["version"] == 12
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_OK
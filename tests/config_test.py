@@ -0,0 +1,220 @@
+import asyncio
+import dataclasses
+import datetime
+import os
+import subprocess  # nosec
+import sys
+
+import pytest
+
+from monero_health import aio, levin
+from monero_health.monero_health import (
+    HealthConfig,
+    _configure,
+    daemon_last_block_check,
+    daemon_combined_status_check,
+    is_timestamp_within_offset,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+)
+
+
+def _config(monerod, **kwargs):
+    return HealthConfig(
+        url="127.0.0.1",
+        rpc_port=monerod.rpc_port,
+        p2p_port=monerod.p2p_port,
+        user=monerod.user,
+        passwd=monerod.passwd,
+        **kwargs,
+    )
+
+
+def test_config_from_env():
+    config = HealthConfig.from_env(
+        {
+            "MONEROD_URL": "node",
+            "MONEROD_RPC_PORT": "28081",
+            "OFFSET": "2",
+            "OFFSET_UNIT": "hours",
+            "HTTP_TIMEOUT": "2.5",
+            "CONSIDER_P2P_STATUS": "true",
+            "P2P_PROBE_DEPTH": "handshake",
+            "MONEROD_NETWORK": "testnet",
+            "SYNC_MAX_LAG": "5",
+            "SYNC_MIN_CONNECTIONS": "0",
+        }
+    )
+
+    assert config.url == "node"
+    assert config.rpc_port == 28081
+    assert config.p2p_port == 18080
+    assert config.offset == 2
+    assert config.offset_delta == datetime.timedelta(hours=2)
+    assert config.http_timeout == 2.5
+    assert config.consider_p2p is True
+    assert config.p2p_depth == levin.PROBE_DEPTH_HANDSHAKE
+    assert config.network == levin.NETWORK_TESTNET
+    assert config.sync_max_lag == 5
+    assert config.sync_min_connections == 0
+    # Not shown.
+    assert "passwd" not in repr(config)
+
+
+def test_config_defaults():
+    config = HealthConfig.from_env({})
+
+    assert config == HealthConfig()
+    assert config.offset_delta == datetime.timedelta(minutes=12)
+    assert config.http_timeout == 30.0
+
+
+def test_config_frozen():
+    config = HealthConfig()
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.url = "node"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"rpc_port": 0},
+        {"p2p_port": "port"},
+        {"offset": -1},
+        {"offset_unit": "fortnights"},
+        {"http_timeout": 0},
+        {"p2p_depth": "ping"},
+        {"network": "regtest"},
+        {"sync_max_lag": -1},
+        {"sync_min_connections": "many"},
+    ],
+)
+def test_config_invalid(kwargs):
+    with pytest.raises(ValueError):
+        HealthConfig(**kwargs)
+
+
+def test_configure():
+    config = HealthConfig(url="node", rpc_port=28081, p2p_port=28080)
+
+    assert _configure(None, url="other", port=18081, delta=None) == (
+        "other",
+        18081,
+        None,
+    )
+    assert _configure(config, url="other", port=18081, delta=None) == (
+        "node",
+        28081,
+        config.offset_delta,
+    )
+    assert _configure(
+        config, port_field="p2p_port", port=18080, depth=None
+    ) == (28080, config.p2p_depth)
+
+
+def test_is_timestamp_within_offset_delta():
+    now = datetime.datetime(2020, 1, 7, 12, 30)
+
+    assert (
+        is_timestamp_within_offset(
+            timestamp=now - datetime.timedelta(minutes=5),
+            now=now,
+            offset=1,
+            offset_unit="invalid",
+            delta=datetime.timedelta(minutes=10),
+        )
+        == (True, 1, "invalid")
+    )
+
+
+def test_last_block_check_configs(monerod):
+    """Different configurations in one process."""
+
+    recent = daemon_last_block_check(
+        config=_config(monerod, offset=2, offset_unit="minutes")
+    )
+    old = daemon_last_block_check(
+        config=_config(monerod, offset=30, offset_unit="seconds")
+    )
+
+    assert recent["status"] == DAEMON_STATUS_OK
+    assert recent["host"] == f"127.0.0.1:{monerod.rpc_port}"
+    assert old["status"] == DAEMON_STATUS_ERROR
+    assert old["block_recent_offset"] == 30
+    assert old["block_recent_offset_unit"] == "seconds"
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_combined_status_check_config(monerod, batch):
+    config = _config(
+        monerod, consider_p2p=True, p2p_depth=levin.PROBE_DEPTH_HANDSHAKE
+    )
+
+    # The settings of 'config' replace the arguments.
+    response = daemon_combined_status_check(
+        url="node", port=1, batch=batch, config=config
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["host"] == "127.0.0.1"
+    assert response[LAST_BLOCK_KEY]["host"] == f"127.0.0.1:{monerod.rpc_port}"
+    p2p = response[DAEMON_KEY][DAEMON_P2P_KEY]
+    assert p2p["host"] == f"127.0.0.1:{monerod.p2p_port}"
+    assert p2p["probe"]["depth"] == levin.PROBE_DEPTH_HANDSHAKE
+
+
+def test_async_combined_status_check_config(monerod):
+    response = asyncio.run(
+        aio.daemon_combined_status_check(config=_config(monerod))
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response[LAST_BLOCK_KEY]["host"] == f"127.0.0.1:{monerod.rpc_port}"
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("MONEROD_RPC_PORT", "18081"),
+        ("OFFSET", "12"),
+        ("SYNC_MAX_LAG", "2"),
+        ("SYNC_MIN_CONNECTIONS", "1"),
+        ("HEALTH_SERVER_PORT", "8080"),
+        ("HEALTH_POLL_INTERVAL", "5"),
+        ("WATCH_BACKOFF", "2"),
+        ("WATCH_MIN_INTERVAL", "1"),
+        ("USE_CONNECTION_POOL", "False"),
+    ],
+)
+def test_invalid_environment(name, expected):
+    output = subprocess.check_output(  # nosec
+        [
+            sys.executable,
+            "-c",
+            "from monero_health import monero_health;"
+            f"print(monero_health.{name.replace('MONEROD_', '')})",
+        ],
+        env=dict(os.environ, **{name: "abc"}),
+    )
+
+    # Falls back to the default.
+    assert output.strip() == expected.encode()
+
+
+def test_environment_parsed():
+    output = subprocess.check_output(  # nosec
+        [
+            sys.executable,
+            "-c",
+            "from monero_health import monero_health;"
+            "print(monero_health.SYNC_MAX_LAG + 1,"
+            " monero_health.WATCH_BACKOFF * 2)",
+        ],
+        env=dict(os.environ, SYNC_MAX_LAG="5", WATCH_BACKOFF="1.5"),
+    )
+
+    assert output.split() == [b"6", b"3.0"]
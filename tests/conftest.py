@@ -0,0 +1,16 @@
+import pytest
+
+from monero_health import monero_health
+from tests.stub_monerod import StubMonerod
+
+
+@pytest.fixture
+def monerod():
+    with StubMonerod() as monerod:
+        yield monerod
+
+
+@pytest.fixture(autouse=True)
+def no_batch():
+    yield
+    monero_health._NO_BATCH.clear()
@@ -0,0 +1,132 @@
+import mock
+import os
+import subprocess  # nosec
+import sys
+import time
+
+import pytest
+
+from monero_health.monero_health import (
+    ConnectionPool,
+    daemon_last_block_check,
+    daemon_rpc_status_check,
+    DAEMON_STATUS_OK,
+)
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_connection_pool_reuse(mock_session, mock_monero_rpc):
+    mock_session.side_effect = lambda **kwargs: mock.Mock()
+    mock_monero_rpc.side_effect = lambda *args, **kwargs: mock.Mock()
+    pool = ConnectionPool()
+
+    conn = pool.connection(url="node1", port=18081, user="user", passwd="pw")
+
+    assert (
+        pool.connection(url="node1", port="18081", user="user", passwd="pw")
+        is conn
+    )
+    assert (
+        pool.connection(url="node1", port=18081, user="other", passwd="pw")
+        is not conn
+    )
+    assert (
+        pool.connection(url="node2", port=18081, user="user", passwd="pw")
+        is not conn
+    )
+    assert len(pool) == 3
+    # The connection shares the pooled HTTP session.
+    assert mock_monero_rpc.call_args_list[0][1]["connection"] is pool.session(
+        url="node1", port=18081, user="user", passwd="pw"
+    )
+
+    # Changed credentials replace the pooled connection.
+    assert (
+        pool.connection(url="node1", port=18081, user="user", passwd="new")
+        is not conn
+    )
+    assert len(pool) == 3
+
+    pool.clear()
+
+    assert len(pool) == 0
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_connection_pool_size_limit(mock_session, mock_monero_rpc):
+    sessions = []
+
+    def new_session(**kwargs):
+        sessions.append(mock.Mock())
+        return sessions[-1]
+
+    mock_session.side_effect = new_session
+    pool = ConnectionPool(max_size=2)
+
+    pool.connection(url="node1")
+    pool.connection(url="node2")
+    pool.connection(url="node1")
+    pool.connection(url="node3")
+
+    assert len(pool) == 2
+    # 'node2' was the least recently used connection.
+    assert sessions[1].close.called
+    assert not sessions[0].close.called
+    assert not sessions[2].close.called
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_connection_pool_idle_eviction(mock_session, mock_monero_rpc):
+    mock_session.side_effect = lambda **kwargs: mock.Mock()
+    pool = ConnectionPool(max_idle=0.05)
+
+    session = pool.session(url="node1")
+    time.sleep(0.1)
+    pool.session(url="node2")
+
+    assert session.close.called
+    assert len(pool) == 1
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health._rpc_session")
+def test_checks_use_pool(mock_session, mock_monero_rpc):
+    mock_monero_rpc.return_value.hard_fork_info.return_value = {
+        "status": DAEMON_STATUS_OK,
+        "version": 12,
+    }
+    mock_monero_rpc.return_value.get_last_block_header.return_value = {
+        "block_header": {"timestamp": "1576828533", "hash": "abc"},
+    }
+    pool = ConnectionPool()
+
+    daemon_rpc_status_check(pool=pool)
+    daemon_rpc_status_check(pool=pool)
+    response = daemon_last_block_check(pool=pool)
+
+    assert mock_monero_rpc.call_count == 1
+    assert mock_session.call_count == 1
+    assert mock_monero_rpc.return_value.hard_fork_info.call_count == 2
+    assert response["hash"] == "abc"
+
+
+@pytest.mark.parametrize(
+    "env",
+    [{"CONNECTION_POOL_SIZE": "many"}, {"CONNECTION_POOL_IDLE": "long"}],
+)
+def test_connection_pool_invalid_environment(env):
+    output = subprocess.check_output(  # nosec
+        [
+            sys.executable,
+            "-c",
+            "from monero_health.monero_health import CONNECTION_POOL;"
+            "print(CONNECTION_POOL.max_size, CONNECTION_POOL.max_idle)",
+        ],
+        env=dict(os.environ, **env),
+    )
+
+    # Falls back to the defaults.
+    assert output.split() == [b"64", b"60.0"]
@@ -1,7 +1,9 @@
 import mock
 import logging
 import json
+import time
 
+from monero_health import monero_health
 from monero_health.monero_health import (
     daemon_stati_check,
     DAEMON_STATUS_OK,
@@ -431,3 +433,58 @@ def test_daemon_stati_p2p_unknown(
             == f"Combined daemon status (RPC, P2P) is '{DAEMON_STATUS_UNKNOWN}'."
         )
     caplog.clear()
+
+
+@mock.patch("monero_health.monero_health.daemon_rpc_status_check")
+@mock.patch("monero_health.monero_health.daemon_p2p_status_check")
+def test_daemon_stati_parallel(mock_daemon_p2p_status, mock_daemon_rpc_status):
+    def slow_rpc_status(**kwargs):
+        time.sleep(0.3)
+        return {
+            "status": DAEMON_STATUS_OK,
+            "version": 12,
+            "host": "127.0.0.1:18081",
+        }
+
+    def slow_p2p_status(**kwargs):
+        time.sleep(0.3)
+        return {"status": DAEMON_STATUS_OK, "host": "127.0.0.1:18080"}
+
+    mock_daemon_rpc_status.side_effect = slow_rpc_status
+    mock_daemon_p2p_status.side_effect = slow_p2p_status
+
+    start = time.monotonic()
+    response = daemon_stati_check(consider_p2p=True, parallel=True)
+    parallel_duration = time.monotonic() - start
+
+    start = time.monotonic()
+    sequential_response = daemon_stati_check(consider_p2p=True, parallel=False)
+    sequential_duration = time.monotonic() - start
+
+    assert parallel_duration < 0.5
+    assert sequential_duration >= 0.6
+    assert response == sequential_response
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_RPC_KEY] == {
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1:18081",
+    }
+
+
+@mock.patch("monero_health.monero_health.daemon_rpc_status_check")
+@mock.patch("monero_health.monero_health.daemon_p2p_status_check")
+def test_daemon_stati_parallel_no_workers(
+    mock_daemon_p2p_status, mock_daemon_rpc_status
+):
+    mock_daemon_rpc_status.return_value = {"status": DAEMON_STATUS_OK}
+    mock_daemon_p2p_status.return_value = {"status": DAEMON_STATUS_OK}
+
+    with mock.patch.object(
+        monero_health, "PARALLEL_CHECKS_WORKERS", 0
+    ), mock.patch.object(monero_health, "_EXECUTOR", None):
+        response = daemon_stati_check(parallel=True)
+        executor = monero_health._EXECUTOR
+
+    executor.shutdown()
+    assert response["status"] == DAEMON_STATUS_OK
+    assert executor._max_workers == 1
@@ -0,0 +1,193 @@
+import asyncio
+import json
+
+import mock
+import pytest
+
+from monerorpc.authproxy import JSONRPCException
+
+from monero_health import aio
+from monero_health.monero_health import (
+    daemon_sync_check,
+    daemon_combined_status_check,
+    HealthConfig,
+    SyncStatusResult,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    SYNC_KEY,
+    DAEMON_KEY,
+    DAEMON_RPC_KEY,
+)
+
+from tests.stub_monerod import StubMonerod
+
+GET_INFO = {
+    "status": "OK",
+    "height": 2200000,
+    "target_height": 0,
+    "synchronized": True,
+    "busy_syncing": False,
+    "incoming_connections_count": 3,
+    "outgoing_connections_count": 8,
+}
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_daemon_sync_ok(mock_monero_rpc, caplog):
+    mock_monero_rpc.return_value.get_info.return_value = GET_INFO
+
+    response = daemon_sync_check()
+
+    assert response == {
+        "status": DAEMON_STATUS_OK,
+        "height": 2200000,
+        "target_height": 0,
+        "lag": 0,
+        "synchronized": True,
+        "busy_syncing": False,
+        "connections": {"incoming": 3, "outgoing": 8},
+        "host": "127.0.0.1:18081",
+    }
+    assert [record.message for record in caplog.records] == [
+        "Checking '127.0.0.1:18081'."
+    ]
+
+
+@pytest.mark.parametrize(
+    "info, kwargs, message",
+    [
+        (
+            {"target_height": 2300000, "busy_syncing": True},
+            {},
+            "Daemon is syncing.",
+        ),
+        ({"synchronized": False}, {}, "Daemon is syncing."),
+        (
+            {"target_height": 2200005},
+            {"max_lag": 2},
+            "Daemon is '5' blocks behind.",
+        ),
+        (
+            {"incoming_connections_count": 0, "outgoing_connections_count": 1},
+            {"min_connections": 2},
+            "Daemon has '1' P2P connections.",
+        ),
+        ({"status": "BUSY"}, {}, "Status is 'BUSY'."),
+    ],
+)
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_daemon_sync_error(mock_monero_rpc, info, kwargs, message):
+    mock_monero_rpc.return_value.get_info.return_value = dict(GET_INFO, **info)
+
+    response = daemon_sync_check(**kwargs)
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["error"]["message"] == message
+    assert response["error"]["error"].startswith("Height '2200000'")
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_daemon_sync_within_lag(mock_monero_rpc):
+    # Older daemons do not report 'synchronized'.
+    info = dict(GET_INFO, target_height=2200001)
+    del info["synchronized"]
+    mock_monero_rpc.return_value.get_info.return_value = info
+
+    response = daemon_sync_check(max_lag=2)
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["synchronized"] is True
+    assert response["lag"] == 1
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_daemon_sync_restricted(mock_monero_rpc):
+    mock_monero_rpc.return_value.get_info.side_effect = JSONRPCException(
+        {"code": -32601, "message": "Method not found"}
+    )
+
+    response = daemon_sync_check(url="node", port=18089)
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["height"] == -1
+    assert response["lag"] == -1
+    assert response["error"] == {
+        "message": "Cannot determine status.",
+        "error": "-32601: Method not found",
+    }
+
+
+def test_daemon_sync_config():
+    with StubMonerod(connections=(0, 1)) as monerod:
+        config = HealthConfig(
+            url="127.0.0.1",
+            rpc_port=monerod.rpc_port,
+            user=monerod.user,
+            passwd=monerod.passwd,
+            sync_min_connections=1,
+        )
+        # The settings of 'config' replace the arguments.
+        response = daemon_sync_check(min_connections=5, config=config)
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["connections"] == {"incoming": 0, "outgoing": 1}
+
+
+def test_daemon_sync_result_slotted():
+    result = SyncStatusResult("node", 18081)
+
+    assert not hasattr(result, "__dict__")
+    assert result.to_dict()["lag"] == -1
+
+
+@pytest.mark.parametrize("syncing", [False, True])
+def test_combined_status_check_sync(syncing):
+    target_height = 2300000 if syncing else 0
+    with StubMonerod(target_height=target_height) as monerod:
+        response = daemon_combined_status_check(
+            sync=True, **monerod.check_kwargs()
+        )
+
+    # A single 'get_info' request.
+    assert monerod.requests == ["/json_rpc"]
+    assert LAST_BLOCK_KEY not in response
+    assert response[SYNC_KEY]["height"] == monerod.height
+    assert response[SYNC_KEY]["busy_syncing"] is syncing
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY]["status"] == DAEMON_STATUS_OK
+    if syncing:
+        assert response["status"] == DAEMON_STATUS_ERROR
+        assert response[SYNC_KEY]["error"]["message"] == "Daemon is syncing."
+    else:
+        assert response["status"] == DAEMON_STATUS_OK
+    json.dumps(response)
+
+
+def test_combined_status_check_sync_unreachable():
+    response = daemon_combined_status_check(
+        url="127.0.0.1", port=1, p2p_port=1, sync=True
+    )
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response[SYNC_KEY]["status"] == DAEMON_STATUS_UNKNOWN
+    rpc = response[DAEMON_KEY][DAEMON_RPC_KEY]
+    assert rpc["status"] == DAEMON_STATUS_UNKNOWN
+    assert rpc["error"]["error"] == response[SYNC_KEY]["error"]["error"]
+
+
+def test_async_daemon_sync_check():
+    with StubMonerod(target_height=2200001) as monerod:
+        kwargs = monerod.check_kwargs(p2p=False)
+        response = asyncio.run(aio.daemon_sync_check(**kwargs))
+        combined = asyncio.run(
+            aio.daemon_combined_status_check(
+                sync=True, **monerod.check_kwargs()
+            )
+        )
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["lag"] == 1
+    assert response["connections"] == {"incoming": 2, "outgoing": 8}
+    assert combined[SYNC_KEY] == response
+    assert combined["status"] == DAEMON_STATUS_ERROR
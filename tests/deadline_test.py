@@ -0,0 +1,251 @@
+"""Deadline budget of the checks against a slow stub monerod."""
+
+import mock
+import socket
+import time
+
+import pytest
+from monerorpc.authproxy import AuthServiceProxy
+
+from monero_health import levin
+from monero_health import monero_health
+from monero_health.monero_health import (
+    ConnectionPool,
+    LastBlockTracker,
+    daemon_last_block_check,
+    daemon_rpc_status_check,
+    daemon_p2p_status_check,
+    daemon_sync_check,
+    daemon_combined_status_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+    ERROR_DEADLINE_EXCEEDED,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+from tests.stub_monerod import StubMonerod
+
+DEADLINE_EXCEEDED = {
+    "message": "Cannot determine status.",
+    "error": ERROR_DEADLINE_EXCEEDED,
+}
+
+
+@pytest.fixture
+def slow_monerod():
+    with StubMonerod(delay=1) as monerod:
+        yield monerod
+
+
+@pytest.fixture
+def unresponsive_port():
+    """Port of a listener with a full backlog, connects never complete."""
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+    clients = []
+    for _ in range(8):
+        client = socket.socket()
+        client.setblocking(False)
+        client.connect_ex(("127.0.0.1", port))
+        clients.append(client)
+    try:
+        yield port
+    finally:
+        for client in clients:
+            client.close()
+        listener.close()
+
+
+def test_http_timeout_is_float():
+    assert isinstance(monero_health.HTTP_TIMEOUT, float)
+
+
+@pytest.mark.parametrize("batch", [False, True])
+@pytest.mark.parametrize("parallel", [False, True])
+def test_combined_status_check_deadline(slow_monerod, batch, parallel):
+    start = time.monotonic()
+    response = daemon_combined_status_check(
+        batch=batch,
+        parallel=parallel,
+        deadline=0.3,
+        **slow_monerod.check_kwargs(),
+    )
+    duration = time.monotonic() - start
+
+    assert duration < 0.6
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response[LAST_BLOCK_KEY]["error"] == DEADLINE_EXCEEDED
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY]["error"] == DEADLINE_EXCEEDED
+    p2p = response[DAEMON_KEY][DAEMON_P2P_KEY]
+    if parallel:
+        # The P2P port answers in time.
+        assert p2p["status"] == DAEMON_STATUS_OK
+    else:
+        # The RPC checks used up the time.
+        assert p2p["error"] == DEADLINE_EXCEEDED
+
+
+def test_combined_status_check_within_deadline(slow_monerod):
+    slow_monerod.delay = 0
+
+    response = daemon_combined_status_check(
+        deadline=5, **slow_monerod.check_kwargs()
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health.connect_to_node")
+def test_combined_status_check_deadline_exceeded(
+    mock_connect_to_node, mock_monero_rpc
+):
+    """No daemon is contacted without time left."""
+
+    response = daemon_combined_status_check(
+        url="node", port=18081, p2p_port=18080, deadline=0
+    )
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response[LAST_BLOCK_KEY]["error"] == DEADLINE_EXCEEDED
+    assert response[DAEMON_KEY][DAEMON_RPC_KEY]["error"] == DEADLINE_EXCEEDED
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY]["error"] == DEADLINE_EXCEEDED
+    mock_monero_rpc.assert_not_called()
+    mock_connect_to_node.try_to_connect_keep_errors.assert_not_called()
+
+
+def test_rpc_status_check_deadline_pool(slow_monerod):
+    pool = ConnectionPool()
+    try:
+        response = daemon_rpc_status_check(
+            pool=pool, deadline=0.2, **slow_monerod.check_kwargs(p2p=False)
+        )
+    finally:
+        pool.clear()
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"] == DEADLINE_EXCEEDED
+
+
+def test_last_block_check_incremental_deadline(slow_monerod):
+    pool = ConnectionPool()
+    try:
+        response = daemon_last_block_check(
+            pool=pool,
+            tracker=LastBlockTracker(),
+            deadline=0.2,
+            **slow_monerod.check_kwargs(p2p=False),
+        )
+    finally:
+        pool.clear()
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"] == DEADLINE_EXCEEDED
+
+
+def test_p2p_status_check_deadline():
+    class SilentMonerod(StubMonerod):
+        def handle_p2p(self, connection):
+            time.sleep(1)
+
+    with SilentMonerod() as monerod:
+        start = time.monotonic()
+        response = daemon_p2p_status_check(
+            url="127.0.0.1",
+            port=monerod.p2p_port,
+            depth=levin.PROBE_DEPTH_HANDSHAKE,
+            deadline=0.2,
+        )
+        duration = time.monotonic() - start
+
+    assert duration < 0.5
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"] == DEADLINE_EXCEEDED
+
+
+@pytest.mark.parametrize(
+    "check, kwargs",
+    [
+        (daemon_rpc_status_check, {}),
+        (daemon_last_block_check, {}),
+        (daemon_last_block_check, {"tracker": LastBlockTracker()}),
+        (daemon_sync_check, {}),
+        (daemon_combined_status_check, {"parallel": False}),
+        (daemon_combined_status_check, {"parallel": False, "batch": True}),
+    ],
+)
+@pytest.mark.parametrize("pooled", [False, True])
+def test_deadline_connect_not_retried(
+    unresponsive_port, check, kwargs, pooled
+):
+    """Connects are not retried, every retry would get the time left again."""
+
+    if "parallel" in kwargs:
+        kwargs = dict(kwargs, p2p_port=unresponsive_port)
+    pool = ConnectionPool() if pooled else None
+    start = time.monotonic()
+    try:
+        response = check(
+            url="127.0.0.1",
+            port=unresponsive_port,
+            pool=pool,
+            deadline=0.5,
+            **kwargs,
+        )
+    finally:
+        if pool is not None:
+            pool.clear()
+    duration = time.monotonic() - start
+
+    assert duration < 0.9
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+
+
+@pytest.mark.parametrize(
+    "check, kwargs",
+    [
+        (daemon_rpc_status_check, {"p2p": False}),
+        (daemon_last_block_check, {"p2p": False}),
+        (daemon_sync_check, {"p2p": False}),
+        (daemon_combined_status_check, {}),
+        (daemon_combined_status_check, {"batch": True}),
+    ],
+)
+def test_deadline_includes_digest_challenge(check, kwargs):
+    """The request answering the challenge only gets the time left."""
+
+    kwargs = dict(kwargs)
+    p2p = kwargs.pop("p2p", True)
+    with StubMonerod(delay=0.25, challenge_delay=0.25) as monerod:
+        start = time.monotonic()
+        response = check(deadline=0.3, **kwargs, **monerod.check_kwargs(p2p))
+        duration = time.monotonic() - start
+
+    assert duration < 0.45
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    if check is daemon_combined_status_check:
+        response = response[DAEMON_KEY][DAEMON_RPC_KEY]
+    assert response["error"] == DEADLINE_EXCEEDED
+
+
+def test_rpc_status_check_deadline_conn(slow_monerod):
+    """The deadline also applies to a connection given by the caller."""
+
+    kwargs = slow_monerod.check_kwargs(p2p=False)
+    conn = AuthServiceProxy(
+        f"http://{kwargs['user']}@{kwargs['url']}:{kwargs['port']}/json_rpc",
+        password=kwargs["passwd"],
+    )
+    start = time.monotonic()
+    response = daemon_rpc_status_check(conn=conn, deadline=0.2, **kwargs)
+    duration = time.monotonic() - start
+
+    assert duration < 0.4
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"] == DEADLINE_EXCEEDED
@@ -0,0 +1,247 @@
+import mock
+import time
+
+import pytest
+
+from monerorpc.authproxy import JSONRPCException
+
+from monero_health.fleet import (
+    check_fleet,
+    check_fleet_consensus,
+    iter_fleet,
+    majority_tip,
+    make_target,
+    FLEET_HOSTS_KEY,
+    FLEET_SUMMARY_KEY,
+    FLEET_TIP_KEY,
+)
+from monero_health.monero_health import (
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+)
+
+from tests.stub_monerod import StubMonerod
+
+
+def _combined_result(url, status):
+    return {"status": status, "host": url}
+
+
+def test_make_target():
+    assert make_target(("node",)) == ("node", 18081, 18080, "", "")
+    assert make_target("node") == ("node", 18081, 18080, "", "")
+    assert make_target(("node", 28081, 28080, "user", "passwd")) == (
+        "node",
+        28081,
+        28080,
+        "user",
+        "passwd",
+    )
+    with pytest.raises(ValueError):
+        make_target(("node", 1, 2, "user", "passwd", "more"))
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_check_fleet(mock_combined):
+    stati = {
+        "node1": DAEMON_STATUS_OK,
+        "node2": DAEMON_STATUS_ERROR,
+        "node3": DAEMON_STATUS_OK,
+    }
+    mock_combined.side_effect = lambda url, **kwargs: _combined_result(
+        url, stati[url]
+    )
+
+    response = check_fleet(
+        [("node1",), ("node2", 28081), ("node3", 18081, 18080, "u", "p")]
+    )
+
+    assert set(response[FLEET_HOSTS_KEY]) == {
+        "node1:18081",
+        "node2:28081",
+        "node3:18081",
+    }
+    assert (
+        response[FLEET_HOSTS_KEY]["node2:28081"]["status"]
+        == DAEMON_STATUS_ERROR
+    )
+    assert response[FLEET_SUMMARY_KEY] == {
+        DAEMON_STATUS_OK: 2,
+        DAEMON_STATUS_UNKNOWN: 0,
+        DAEMON_STATUS_ERROR: 1,
+        "status": DAEMON_STATUS_ERROR,
+        "hosts": 3,
+    }
+    mock_combined.assert_any_call(
+        url="node3",
+        port=18081,
+        p2p_port=18080,
+        user="u",
+        passwd="p",
+        consider_p2p=False,
+        pool=None,
+    )
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_check_fleet_concurrent(mock_combined):
+    def slow_check(url, **kwargs):
+        time.sleep(0.2)
+        return _combined_result(url, DAEMON_STATUS_OK)
+
+    mock_combined.side_effect = slow_check
+
+    start = time.monotonic()
+    response = check_fleet([(f"node{i}",) for i in range(8)], max_workers=8)
+    duration = time.monotonic() - start
+
+    assert duration < 1.0
+    assert response[FLEET_SUMMARY_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[FLEET_SUMMARY_KEY][DAEMON_STATUS_OK] == 8
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_check_fleet_unexpected_error(mock_combined):
+    mock_combined.side_effect = KeyError("status")
+
+    response = check_fleet([("node1",)])
+
+    result = response[FLEET_HOSTS_KEY]["node1:18081"]
+    assert result["status"] == DAEMON_STATUS_UNKNOWN
+    assert result["error"]["message"] == "Cannot determine status."
+    assert response[FLEET_SUMMARY_KEY]["status"] == DAEMON_STATUS_UNKNOWN
+
+
+def test_check_fleet_empty():
+    response = check_fleet([])
+
+    assert response[FLEET_HOSTS_KEY] == {}
+    assert response[FLEET_SUMMARY_KEY]["hosts"] == 0
+    assert response[FLEET_SUMMARY_KEY]["status"] == DAEMON_STATUS_UNKNOWN
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_iter_fleet_completion_order(mock_combined):
+    def check(url, **kwargs):
+        if url == "slow":
+            time.sleep(0.3)
+        return _combined_result(url, DAEMON_STATUS_OK)
+
+    mock_combined.side_effect = check
+
+    keys = [key for key, _ in iter_fleet(["slow", "node1", "node2"])]
+
+    assert sorted(keys[:2]) == ["node1:18081", "node2:18081"]
+    assert keys[-1] == "slow:18081"
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_iter_fleet_lazy(mock_combined):
+    """Takes further hosts only as checks complete."""
+
+    mock_combined.side_effect = lambda url, **kwargs: _combined_result(
+        url, DAEMON_STATUS_OK
+    )
+    taken = []
+
+    def hosts():
+        for i in range(100):
+            taken.append(i)
+            yield f"node{i}"
+
+    results = iter_fleet(hosts(), max_workers=4)
+    _, response = next(results)
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert len(taken) <= 5
+    assert len(list(results)) == 99
+    assert len(taken) == 100
+
+
+def test_majority_tip():
+    assert majority_tip([(10, "a"), (10, "b"), (10, "a"), (9, "c")]) == (
+        10,
+        "a",
+    )
+    # Ties go to the highest tip.
+    assert majority_tip([(9, "c"), (10, "a")]) == (10, "a")
+    assert majority_tip([]) == (None, None)
+
+
+@mock.patch("monero_health.monero_health.daemon_get_height")
+def test_check_fleet_consensus(mock_get_height):
+    tips = {
+        "node1": {"height": 100, "hash": "tip"},
+        "node2": {"height": 100, "hash": "tip"},
+        "node3": {"height": 99, "hash": "previous"},
+        "node4": {"height": 100, "hash": "fork"},
+        "node5": {"height": 95, "hash": "old"},
+    }
+
+    def get_height(url, **kwargs):
+        if url == "node6":
+            raise JSONRPCException({"code": -341, "message": "Boom."})
+        return dict(tips[url], status="OK")
+
+    mock_get_height.side_effect = get_height
+
+    response = check_fleet_consensus(
+        [(f"node{i}",) for i in range(1, 7)], max_lag=2
+    )
+
+    assert response[FLEET_TIP_KEY] == {
+        "height": 100,
+        "hash": "tip",
+        "hosts": 2,
+    }
+    hosts = response[FLEET_HOSTS_KEY]
+    assert list(hosts) == [f"node{i}:18081" for i in range(1, 7)]
+    assert hosts["node1:18081"] == {
+        "status": DAEMON_STATUS_OK,
+        "host": "node1:18081",
+        "height": 100,
+        "hash": "tip",
+        "lag": 0,
+        "lagging": False,
+        "forked": False,
+    }
+    # Within 'max_lag'.
+    assert hosts["node3:18081"]["status"] == DAEMON_STATUS_OK
+    assert hosts["node3:18081"]["lag"] == 1
+    assert hosts["node4:18081"]["status"] == DAEMON_STATUS_ERROR
+    assert hosts["node4:18081"]["forked"] is True
+    assert hosts["node5:18081"]["status"] == DAEMON_STATUS_ERROR
+    assert hosts["node5:18081"]["lagging"] is True
+    assert hosts["node5:18081"]["lag"] == 5
+    assert hosts["node6:18081"]["status"] == DAEMON_STATUS_UNKNOWN
+    assert hosts["node6:18081"]["error"]["error"] == "-341: Boom."
+    assert response[FLEET_SUMMARY_KEY]["status"] == DAEMON_STATUS_ERROR
+    assert response[FLEET_SUMMARY_KEY][DAEMON_STATUS_ERROR] == 2
+
+
+def test_check_fleet_consensus_daemons():
+    with StubMonerod() as first, StubMonerod() as second, StubMonerod(
+        height=2199990
+    ) as stalled:
+        response = check_fleet_consensus(
+            [
+                (
+                    "127.0.0.1",
+                    monerod.rpc_port,
+                    monerod.p2p_port,
+                    monerod.user,
+                    monerod.passwd,
+                )
+                for monerod in (first, second, stalled)
+            ]
+        )
+
+    assert response[FLEET_TIP_KEY]["height"] == first.height
+    assert response[FLEET_TIP_KEY]["hash"] == first.top_hash
+    stalled_response = response[FLEET_HOSTS_KEY][
+        f"127.0.0.1:{stalled.rpc_port}"
+    ]
+    assert stalled_response["status"] == DAEMON_STATUS_ERROR
+    assert stalled_response["lag"] == 10
+    assert stalled.requests == ["/get_height"]
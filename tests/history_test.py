@@ -0,0 +1,128 @@
+import pytest
+
+from monero_health.history import CheckHistory
+from monero_health.monero_health import (
+    daemon_last_block_check,
+    daemon_combined_status_check,
+    LastBlockResult,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+)
+
+from tests.stub_monerod import StubMonerod
+
+
+def test_history_stats():
+    history = CheckHistory(size=200)
+    for i in range(100):
+        history.record(
+            "last_block",
+            "node",
+            18081,
+            status=DAEMON_STATUS_OK if i < 90 else DAEMON_STATUS_ERROR,
+            block_age=float(i + 1),
+            latency=0.01,
+            timestamp=1000.0 + i,
+        )
+
+    stats = history.stats("last_block", "node", 18081)
+
+    assert stats == {
+        "samples": 100,
+        "uptime": 0.9,
+        "status": DAEMON_STATUS_ERROR,
+        "block_age": {"p50": 50.0, "p95": 95.0, "max": 100.0},
+        "latency": {"p50": 0.01, "p95": 0.01, "max": 0.01},
+    }
+
+
+def test_history_window():
+    history = CheckHistory()
+    for i in range(10):
+        history.record(
+            "last_block",
+            "node",
+            18081,
+            status=DAEMON_STATUS_ERROR if i < 5 else DAEMON_STATUS_OK,
+            block_age=float(i),
+            timestamp=1000.0 + i,
+        )
+
+    stats = history.stats("last_block", "node", 18081, window=4, now=1009.0)
+
+    assert stats["samples"] == 5
+    assert stats["uptime"] == 1.0
+    assert stats["block_age"]["max"] == 9.0
+    assert stats["latency"] == {"p50": None, "p95": None, "max": None}
+
+
+def test_history_ring_buffer():
+    history = CheckHistory(size=3)
+    for i, status in enumerate(
+        [DAEMON_STATUS_ERROR, DAEMON_STATUS_OK, DAEMON_STATUS_OK, "BUSY"]
+    ):
+        history.record("rpc", "node", 18081, status=status, timestamp=i)
+
+    stats = history.stats("rpc", "node", 18081)
+
+    # The oldest result is overwritten, unknown stati are 'UNKNOWN'.
+    assert stats["samples"] == 3
+    assert stats["uptime"] == pytest.approx(2 / 3)
+    assert stats["status"] == DAEMON_STATUS_UNKNOWN
+
+
+def test_history_unknown_host():
+    stats = CheckHistory().stats("rpc", "node", 18081)
+
+    assert stats["samples"] == 0
+    assert stats["uptime"] is None
+    assert stats["status"] == DAEMON_STATUS_UNKNOWN
+
+
+def test_history_invalid_size():
+    with pytest.raises(ValueError):
+        CheckHistory(size=0)
+
+
+def test_history_wrap():
+    history = CheckHistory()
+    check = history.wrap(daemon_last_block_check)
+
+    with StubMonerod() as monerod:
+        kwargs = monerod.check_kwargs(p2p=False)
+        response = check(**kwargs)
+        result = check(as_dict=False, **kwargs)
+
+    assert check.__name__ == "daemon_last_block_check"
+    assert response["host"] == f"127.0.0.1:{monerod.rpc_port}"
+    assert isinstance(result, LastBlockResult)
+    assert history.keys() == [
+        ("daemon_last_block_check", "127.0.0.1", monerod.rpc_port)
+    ]
+    stats = history.stats(
+        "daemon_last_block_check", "127.0.0.1", monerod.rpc_port
+    )
+    assert stats["samples"] == 2
+    assert stats["block_age"]["max"] == (
+        result.check_timestamp - result.block_timestamp
+    )
+    assert stats["latency"]["max"] > 0
+
+
+def test_history_combined_result():
+    history = CheckHistory()
+
+    with StubMonerod() as monerod:
+        result = history.call(
+            daemon_combined_status_check,
+            as_dict=False,
+            **monerod.check_kwargs(),
+        )
+
+    stats = history.stats("daemon_combined_status_check", "127.0.0.1")
+    assert stats["samples"] == 1
+    # Taken from the last block result.
+    assert stats["block_age"]["max"] == (
+        result.last_block.check_timestamp - result.last_block.block_timestamp
+    )
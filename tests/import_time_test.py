@@ -0,0 +1,87 @@
+"""Cold import of 'monero_health.monero_health' in a fresh interpreter."""
+
+import json
+import subprocess  # nosec
+import sys
+
+import pytest
+
+from monero_health import monero_health
+from monero_health.monero_health import _strtobool
+
+# Seconds, generous to not be flaky on slow machines.
+# The eager imports took ~0.4 seconds.
+IMPORT_TIME_BUDGET = 0.2
+
+HEAVY_MODULES = ("requests", "monerorpc", "monero_scripts", "distutils")
+
+COLD_IMPORT = """
+import json, logging, sys, time
+start = time.perf_counter()
+import monero_health.monero_health
+duration = time.perf_counter() - start
+print(
+    json.dumps(
+        {
+            "duration": duration,
+            "modules": sorted(sys.modules),
+            "handlers": len(logging.getLogger().handlers),
+        }
+    )
+)
+"""
+
+
+def _cold_import():
+    output = subprocess.check_output(  # nosec
+        [sys.executable, "-c", COLD_IMPORT]
+    )
+    return json.loads(output)
+
+
+def test_cold_import_budget():
+    # Best of three, the first run may warm up the file system cache.
+    durations = [_cold_import()["duration"] for _ in range(3)]
+
+    assert min(durations) < IMPORT_TIME_BUDGET
+
+
+def test_cold_import_no_side_effects():
+    imported = _cold_import()
+
+    assert [
+        module
+        for module in imported["modules"]
+        if module.split(".")[0] in HEAVY_MODULES
+    ] == []
+    # 'logging.basicConfig()' is left to the entry points.
+    assert imported["handlers"] == 0
+
+
+def test_lazy_names():
+    assert monero_health.AuthServiceProxy.__name__ == "AuthServiceProxy"
+    assert monero_health.connect_to_node.__name__.endswith("connect_to_node")
+    with pytest.raises(AttributeError):
+        monero_health.does_not_exist
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("True", 1),
+        ("yes", 1),
+        ("1", 1),
+        ("ON", 1),
+        ("False", 0),
+        ("n", 0),
+        ("0", 0),
+        ("off", 0),
+    ],
+)
+def test_strtobool(value, expected):
+    assert _strtobool(value) == expected
+
+
+def test_strtobool_invalid():
+    with pytest.raises(ValueError):
+        _strtobool("maybe")
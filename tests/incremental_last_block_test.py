@@ -0,0 +1,112 @@
+"""Incremental last block check against the stub monerod."""
+
+import pytest
+
+from monero_health.monero_health import (
+    ConnectionPool,
+    LastBlockTracker,
+    daemon_get_height,
+    daemon_last_block_check,
+    daemon_combined_status_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+)
+from monerorpc.authproxy import JSONRPCException
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool()
+    yield pool
+    pool.clear()
+
+
+def test_get_height(monerod):
+    response = daemon_get_height(**monerod.check_kwargs(p2p=False))
+
+    assert response["height"] == monerod.height
+    assert response["hash"] == monerod.top_hash
+
+
+def test_get_height_not_found(monerod):
+    monerod.other_rpc = lambda path: None
+
+    with pytest.raises(JSONRPCException) as e:
+        daemon_get_height(**monerod.check_kwargs(p2p=False))
+
+    assert e.value.code == -344
+
+
+def test_incremental_last_block_check(monerod, pool):
+    tracker = LastBlockTracker()
+    kwargs = monerod.check_kwargs(p2p=False)
+
+    responses = [
+        daemon_last_block_check(tracker=tracker, pool=pool, **kwargs)
+        for _ in range(3)
+    ]
+
+    assert [response["status"] for response in responses] == [
+        DAEMON_STATUS_OK
+    ] * 3
+    assert [response["height"] for response in responses] == [
+        monerod.height - 1
+    ] * 3
+    # The header is only requested once.
+    assert monerod.requests.count("/json_rpc") == 1
+    assert monerod.requests.count("/get_height") == 3
+    assert len(tracker) == 1
+
+    # New block.
+    monerod.height += 1
+    monerod.block_age = 0
+    response = daemon_last_block_check(tracker=tracker, pool=pool, **kwargs)
+
+    assert response["height"] == monerod.height - 1
+    assert response["hash"] == monerod.top_hash
+    assert monerod.requests.count("/json_rpc") == 2
+
+
+def test_incremental_last_block_check_block_age(monerod, pool):
+    """The block age is computed from the tracked header."""
+
+    tracker = LastBlockTracker()
+    kwargs = monerod.check_kwargs(p2p=False)
+    daemon_last_block_check(tracker=tracker, pool=pool, **kwargs)
+
+    # The stub block would be recent, the tracked one is outdated.
+    header = dict(tracker.get(url=kwargs["url"], port=kwargs["port"]))
+    header["timestamp"] -= 3600
+    tracker.update(url=kwargs["url"], port=kwargs["port"], header=header)
+
+    response = daemon_last_block_check(tracker=tracker, pool=pool, **kwargs)
+
+    assert response["block_recent"] is False
+    assert monerod.requests.count("/json_rpc") == 1
+
+
+def test_incremental_last_block_check_error(pool):
+    tracker = LastBlockTracker()
+
+    response = daemon_last_block_check(
+        url="127.0.0.1", port=1, tracker=tracker, pool=pool
+    )
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["height"] == -1
+    assert len(tracker) == 0
+
+
+def test_incremental_combined_status_check(monerod, pool):
+    tracker = LastBlockTracker()
+
+    for _ in range(2):
+        response = daemon_combined_status_check(
+            tracker=tracker, pool=pool, **monerod.check_kwargs()
+        )
+        assert response["status"] == DAEMON_STATUS_OK
+        assert response[LAST_BLOCK_KEY]["height"] == monerod.height - 1
+
+    # 'get_last_block_header' once, 'hard_fork_info' twice.
+    assert monerod.requests.count("/json_rpc") == 3
@@ -0,0 +1,266 @@
+"""Probe the P2P port to the different depths."""
+
+import socket
+
+import pytest
+
+from monero_health import levin
+from monero_health.monero_health import (
+    daemon_p2p_status_check,
+    daemon_stati_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_P2P_KEY,
+)
+
+from tests.stub_monerod import StubMonerod
+
+
+@pytest.mark.parametrize(
+    "value, packed",
+    [
+        (0, b"\x00"),
+        (63, b"\xfc"),
+        (64, b"\x01\x01"),
+        (16383, b"\xfd\xff"),
+        (16384, b"\x02\x00\x01\x00"),
+        (2 ** 30, b"\x03\x00\x00\x00\x01\x00\x00\x00"),
+    ],
+)
+def test_pack_varint(value, packed):
+    assert levin.pack_varint(value) == packed
+
+
+def test_handshake_request():
+    """Header of the handshake request.
+
+    Reference bytes from monero 'docs/LEVIN_PROTOCOL.md'.
+    """
+
+    request = levin.handshake_request(peer_id=1)
+
+    assert request[:8] == bytes.fromhex("0121010101010101")
+    (
+        signature,
+        size,
+        expects_response,
+        command,
+        return_code,
+        flags,
+        version,
+    ) = levin.LEVIN_HEADER.unpack(request[: levin.LEVIN_HEADER.size])
+    assert size == len(request) - levin.LEVIN_HEADER.size
+    assert expects_response is True
+    assert command == levin.COMMAND_HANDSHAKE
+    assert return_code == 0
+    assert flags == levin.LEVIN_PACKET_REQUEST
+    assert version == levin.LEVIN_PROTOCOL_VERSION
+    body = request[levin.LEVIN_HEADER.size :]
+    assert body[:9] == bytes.fromhex("011101010101020101")
+    assert levin.NETWORK_IDS[levin.NETWORK_MAINNET] in body
+    assert levin.GENESIS_IDS[levin.NETWORK_MAINNET] in body
+
+
+def test_pack_storage_array():
+    packed = levin.pack_storage(
+        {
+            "a": [
+                (levin.SERIALIZE_TYPE_UINT8, 1),
+                (levin.SERIALIZE_TYPE_UINT8, 2),
+            ]
+        }
+    )
+
+    assert packed[9:] == b"\x04\x01a\x88\x08\x01\x02"
+
+
+@pytest.mark.parametrize("depth", levin.PROBE_DEPTHS)
+def test_probe(monerod, depth):
+    body = levin.probe(("127.0.0.1", monerod.p2p_port), depth=depth)
+
+    if depth == levin.PROBE_DEPTH_HANDSHAKE:
+        assert body == monerod.handshake_response()
+    else:
+        assert body is None
+
+
+def test_probe_unknown_depth(monerod):
+    with pytest.raises(ValueError):
+        levin.probe(("127.0.0.1", monerod.p2p_port), depth="ping")
+
+
+@pytest.mark.parametrize(
+    "depth", [levin.PROBE_DEPTH_LEVIN_HEADER, levin.PROBE_DEPTH_HANDSHAKE]
+)
+def test_probe_no_levin(depth):
+    """The peer closes the connection instead of answering the handshake."""
+
+    with StubMonerod(levin=False) as monerod:
+        # Closed or reset, depending on whether the request was read.
+        with pytest.raises(ConnectionError):
+            levin.probe(("127.0.0.1", monerod.p2p_port), depth=depth)
+
+
+def test_probe_invalid_signature():
+    class NoLevinMonerod(StubMonerod):
+        def handle_p2p(self, connection):
+            connection.sendall(b"HTTP/1.1 400 Bad Request\r\n\r\n" * 2)
+
+    with NoLevinMonerod() as monerod:
+        with pytest.raises(levin.LevinError) as e:
+            levin.probe(
+                ("127.0.0.1", monerod.p2p_port),
+                depth=levin.PROBE_DEPTH_LEVIN_HEADER,
+            )
+
+    assert str(e.value).startswith("Invalid Levin signature")
+
+
+@pytest.mark.parametrize("depth", levin.PROBE_DEPTHS)
+def test_p2p_status_check_depth(monerod, depth):
+    response = daemon_p2p_status_check(
+        url="127.0.0.1", port=monerod.p2p_port, depth=depth
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["probe"]["depth"] == depth
+    assert response["probe"]["duration"] >= 0
+    assert "error" not in response
+
+
+def test_p2p_status_check_depth_refused():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    response = daemon_p2p_status_check(
+        url="127.0.0.1", port=port, depth=levin.PROBE_DEPTH_TCP
+    )
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["probe"]["depth"] == levin.PROBE_DEPTH_TCP
+    assert "error" in response
+
+
+def test_p2p_status_check_handshake_failed():
+    with StubMonerod(levin=False) as monerod:
+        response = daemon_p2p_status_check(
+            url="127.0.0.1",
+            port=monerod.p2p_port,
+            depth=levin.PROBE_DEPTH_HANDSHAKE,
+        )
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response["probe"]["depth"] == levin.PROBE_DEPTH_HANDSHAKE
+    assert "error" in response
+
+
+def test_p2p_status_check_no_depth(monerod):
+    response = daemon_p2p_status_check(url="127.0.0.1", port=monerod.p2p_port)
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert "probe" not in response
+
+
+def test_stati_check_p2p_depth(monerod):
+    response = daemon_stati_check(
+        consider_p2p=True,
+        p2p_depth=levin.PROBE_DEPTH_HANDSHAKE,
+        **monerod.check_kwargs(),
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert (
+        response[DAEMON_P2P_KEY]["probe"]["depth"]
+        == levin.PROBE_DEPTH_HANDSHAKE
+    )
+
+
+def test_unpack_storage(monerod):
+    body = bytearray(monerod.handshake_response())
+
+    section = levin.unpack_storage(body)
+
+    payload = section["payload_data"]
+    assert payload["current_height"] == monerod.height
+    assert payload["top_version"] == monerod.version
+    # Strings are slices of the received buffer.
+    assert isinstance(payload["top_id"], memoryview)
+    assert payload["top_id"].obj is body
+    assert payload["top_id"].hex() == monerod.top_hash
+    assert section["local_peerlist_new"][0]["adr"]["addr"]["m_port"] == 18080
+
+
+def test_unpack_storage_round_trip():
+    section = {
+        "a": (levin.SERIALIZE_TYPE_INT64, -1),
+        "b": (levin.SERIALIZE_TYPE_DOUBLE, 0.5),
+        "c": True,
+        "d": b"x" * 100,
+        "e": {"f": [b"g", b"h"]},
+    }
+
+    unpacked = levin.unpack_storage(levin.pack_storage(section))
+
+    assert unpacked["a"] == -1
+    assert unpacked["b"] == 0.5
+    assert unpacked["c"] is True
+    assert unpacked["d"] == b"x" * 100
+    assert [bytes(item) for item in unpacked["e"]["f"]] == [b"g", b"h"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        b"\x00" * 9,
+        # Truncated string.
+        levin.pack_storage({"a": b"abc"})[:-1],
+        # Truncated number.
+        levin.pack_storage({"a": (levin.SERIALIZE_TYPE_UINT64, 1)})[:-1],
+    ],
+)
+def test_unpack_storage_invalid(body):
+    with pytest.raises(levin.LevinError):
+        levin.unpack_storage(body)
+
+
+def test_handshake_info(monerod):
+    assert levin.handshake_info(monerod.handshake_response()) == {
+        "version": monerod.version,
+        "height": monerod.height,
+        "hash": monerod.top_hash,
+    }
+
+
+def test_handshake_info_missing_payload():
+    with pytest.raises(levin.LevinError):
+        levin.handshake_info(levin.pack_storage({"node_data": {}}))
+
+
+def test_p2p_status_check_handshake_chain_data(monerod):
+    response = daemon_p2p_status_check(
+        url="127.0.0.1",
+        port=monerod.p2p_port,
+        depth=levin.PROBE_DEPTH_HANDSHAKE,
+    )
+
+    assert response["version"] == monerod.version
+    assert response["height"] == monerod.height
+    assert response["hash"] == monerod.top_hash
+
+
+def test_stati_check_p2p_version(monerod):
+    """The hard fork version is known from P2P, even if RPC fails."""
+
+    kwargs = monerod.check_kwargs()
+    kwargs["passwd"] = "wrong"
+
+    response = daemon_stati_check(
+        p2p_depth=levin.PROBE_DEPTH_HANDSHAKE, **kwargs
+    )
+
+    assert response["version"] == monerod.version
+    assert "version" not in response[DAEMON_P2P_KEY]
+    assert response[DAEMON_P2P_KEY]["height"] == monerod.height
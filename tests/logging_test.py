@@ -0,0 +1,105 @@
+import logging
+import os
+import subprocess  # nosec
+import sys
+
+import mock
+import pytest
+
+from monerorpc.authproxy import JSONRPCException
+
+from monero_health import monero_health
+from monero_health.monero_health import (
+    daemon_rpc_status_check,
+    set_log_hook,
+)
+
+
+@pytest.fixture
+def records():
+    records = []
+    set_log_hook(lambda level, data: records.append((level, data)))
+    yield records
+    set_log_hook()
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_log_hook(mock_monero_rpc, records, caplog):
+    mock_monero_rpc.return_value.hard_fork_info.side_effect = JSONRPCException(
+        {"code": -341, "message": "Boom."}
+    )
+
+    daemon_rpc_status_check(url="node", port=18081)
+
+    assert records == [
+        (
+            logging.ERROR,
+            {"message": "Cannot determine status.", "error": "-341: Boom."},
+        )
+    ]
+    # Only the plain text messages are logged directly.
+    assert [record.message for record in caplog.records] == [
+        "Checking 'node:18081'."
+    ]
+
+
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+@mock.patch("monero_health.monero_health.json.dumps")
+def test_log_level_disabled(mock_dumps, mock_monero_rpc, records, caplog):
+    mock_monero_rpc.return_value.hard_fork_info.side_effect = JSONRPCException(
+        {"code": -341, "message": "Boom."}
+    )
+    caplog.set_level(logging.CRITICAL, logger="DaemonHealth")
+
+    response = daemon_rpc_status_check(url="node", port=18081)
+
+    assert response["error"]["error"] == "-341: Boom."
+    assert records == []
+    mock_dumps.assert_not_called()
+
+
+def test_log_json(caplog):
+    monero_health._log(logging.INFO, {"message": "Something happened."})
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].message == '{"message": "Something happened."}'
+    if sys.version_info >= (3, 8):
+        # The record points to the caller.
+        assert caplog.records[0].funcName == "test_log_json"
+
+
+def test_log_json_without_stacklevel(caplog):
+    """Python 3.7 does not know 'stacklevel'."""
+
+    with mock.patch.object(monero_health, "_LOG_KWARGS", {}):
+        monero_health._log(logging.ERROR, {"message": "Something failed."})
+
+    assert caplog.records[0].message == '{"message": "Something failed."}'
+
+
+@pytest.mark.parametrize(
+    "level, expected",
+    [
+        ("error", logging.ERROR),
+        ("INFO", logging.INFO),
+        ("verbose", logging.DEBUG),
+        (None, logging.DEBUG),
+    ],
+)
+def test_log_level_environment(level, expected):
+    env = dict(os.environ)
+    env.pop("LOG_LEVEL", None)
+    if level:
+        env["LOG_LEVEL"] = level
+
+    output = subprocess.check_output(  # nosec
+        [
+            sys.executable,
+            "-c",
+            "from monero_health.monero_health import logger;"
+            "print(logger.level)",
+        ],
+        env=env,
+    )
+
+    assert int(output) == expected
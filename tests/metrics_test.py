@@ -0,0 +1,131 @@
+import mock
+
+from monero_health import metrics
+from monero_health.monero_health import (
+    daemon_rpc_status_check,
+    daemon_p2p_status_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    LAST_BLOCK_KEY,
+    SYNC_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+COMBINED_RESULT = {
+    LAST_BLOCK_KEY: {
+        "block_timestamp": "2020-01-07T12:22:31",
+        "check_timestamp": "2020-01-07T12:29:27",
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1:18081",
+    },
+    DAEMON_KEY: {
+        DAEMON_RPC_KEY: {
+            "status": DAEMON_STATUS_OK,
+            "host": "127.0.0.1:18081",
+        },
+        DAEMON_P2P_KEY: {
+            "status": DAEMON_STATUS_ERROR,
+            "host": "127.0.0.1:18080",
+        },
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1",
+        "version": 12,
+    },
+    "status": DAEMON_STATUS_OK,
+    "host": "127.0.0.1",
+}
+
+
+def test_render_gauges():
+    registry = metrics.MetricsRegistry()
+
+    text = registry.render({"127.0.0.1": COMBINED_RESULT})
+
+    assert 'monero_health_status{host="127.0.0.1",check="health"} 0' in text
+    assert 'monero_health_status{host="127.0.0.1",check="p2p"} 2' in text
+    assert (
+        'monero_health_last_block_age_seconds{host="127.0.0.1"} 416.0' in text
+    )
+    assert 'monero_health_hard_fork_version{host="127.0.0.1"} 12' in text
+    assert text.endswith("\n")
+
+
+def test_render_gauges_sync():
+    registry = metrics.MetricsRegistry()
+    response = dict(COMBINED_RESULT)
+    del response[LAST_BLOCK_KEY]
+    response[SYNC_KEY] = {
+        "status": DAEMON_STATUS_ERROR,
+        "height": 2199990,
+        "target_height": 2200000,
+        "lag": 10,
+        "host": "127.0.0.1:18081",
+    }
+
+    text = registry.render({"127.0.0.1": response})
+
+    assert 'monero_health_status{host="127.0.0.1",check="sync"} 2' in text
+    assert 'monero_health_sync_lag_blocks{host="127.0.0.1"} 10' in text
+    assert "monero_health_last_block_age_seconds{" not in text
+    assert 'monero_health_hard_fork_version{host="127.0.0.1"} 12' in text
+
+
+def test_histogram():
+    registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+
+    registry.observe("hard_fork_info", "node", 0.05)
+    registry.observe("hard_fork_info", "node", 0.5)
+    registry.observe("hard_fork_info", "node", 5)
+    text = registry.render()
+
+    labels = 'host="node",call="hard_fork_info"'
+    assert (
+        f'monero_health_request_duration_seconds_bucket{{{labels},le="0.1"}} 1'
+        in text
+    )
+    assert (
+        f'monero_health_request_duration_seconds_bucket{{{labels},le="1.0"}} 2'
+        in text
+    )
+    assert (
+        f'monero_health_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3'
+        in text
+    )
+    assert (
+        f"monero_health_request_duration_seconds_count{{{labels}}} 3" in text
+    )
+    assert (
+        f"monero_health_request_duration_seconds_sum{{{labels}}} 5.55" in text
+    )
+
+
+@mock.patch(
+    "monero_health.monero_health.connect_to_node.try_to_connect_keep_errors"
+)
+@mock.patch("monero_health.monero_health.AuthServiceProxy")
+def test_checks_report_request_durations(mock_monero_rpc, mock_socket):
+    mock_monero_rpc.return_value.hard_fork_info.return_value = {
+        "status": DAEMON_STATUS_OK,
+        "version": 12,
+    }
+    registry = metrics.MetricsRegistry()
+    metrics.enable(registry)
+    try:
+        daemon_rpc_status_check()
+        daemon_p2p_status_check()
+    finally:
+        metrics.disable(registry)
+    daemon_rpc_status_check()
+
+    text = registry.render()
+
+    assert (
+        'monero_health_request_duration_seconds_count{host="127.0.0.1:18081",call="hard_fork_info"} 1'
+        in text
+    )
+    assert (
+        'monero_health_request_duration_seconds_count{host="127.0.0.1:18080",call="p2p_connect"} 1'
+        in text
+    )
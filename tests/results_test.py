@@ -0,0 +1,156 @@
+import datetime
+import json
+
+import mock
+import pytest
+
+from monero_health import levin
+from monero_health.monero_health import (
+    daemon_stati_check,
+    daemon_combined_status_check,
+    _last_block_response,
+    _rpc_status_response,
+    LastBlockResult,
+    RpcStatusResult,
+    P2PStatusResult,
+    StatiResult,
+    CombinedResult,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+from tests.stub_monerod import StubMonerod
+
+CHECK_TIMESTAMP = datetime.datetime(2019, 12, 20, 8, 0, 0)
+LAST_BLOCK_HEADER = {
+    "timestamp": 1576828533,
+    "hash": "3f82c93e6f7726a54724d0b8b1026bec878af449bc2f97e9a916c6af72a6367a",
+    "height": 2000000,
+}
+
+
+def test_last_block_result_to_dict():
+    result = _last_block_response(
+        "node",
+        18081,
+        last_block_header=LAST_BLOCK_HEADER,
+        check_timestamp=CHECK_TIMESTAMP,
+    )
+
+    assert isinstance(result, LastBlockResult)
+    assert result.block_timestamp == 1576828533.0
+    assert result.check_timestamp == 1576828800.0
+    assert result.to_dict() == {
+        "hash": LAST_BLOCK_HEADER["hash"],
+        "height": 2000000,
+        "block_age": "0:04:27",
+        "block_timestamp": "2019-12-20T07:55:33",
+        "check_timestamp": "2019-12-20T08:00:00",
+        "status": DAEMON_STATUS_OK,
+        "block_recent": True,
+        "block_recent_offset": 12,
+        "block_recent_offset_unit": "minutes",
+        "host": "node:18081",
+    }
+    assert json.loads(result.to_json()) == result.to_dict()
+
+
+def test_last_block_result_error_to_dict():
+    result = _last_block_response(
+        "node",
+        18081,
+        error={"error": "Boom."},
+        check_timestamp=CHECK_TIMESTAMP,
+    )
+
+    assert result.to_dict() == {
+        "hash": "---",
+        "height": -1,
+        "block_age": -1,
+        "block_timestamp": "---",
+        "check_timestamp": "2019-12-20T08:00:00",
+        "status": DAEMON_STATUS_UNKNOWN,
+        "block_recent": False,
+        "block_recent_offset": 12,
+        "block_recent_offset_unit": "minutes",
+        "host": "node:18081",
+        "error": {"message": "Cannot determine status.", "error": "Boom."},
+    }
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        LastBlockResult("node", 18081, 0.0),
+        RpcStatusResult("node", 18081),
+        P2PStatusResult("node", 18080),
+        StatiResult("node"),
+        CombinedResult("node"),
+    ],
+)
+def test_results_are_slotted(result):
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.block = None
+
+
+@mock.patch("monero_health.monero_health.daemon_rpc_status_check")
+@mock.patch("monero_health.monero_health.daemon_p2p_status_check")
+def test_stati_check_keeps_rpc_result(mock_daemon_p2p, mock_daemon_rpc):
+    """The RPC version moves to the combined result without mutating."""
+
+    rpc_result = _rpc_status_response(
+        "node",
+        18081,
+        hard_fork_info={"status": DAEMON_STATUS_OK, "version": 12},
+    )
+    mock_daemon_rpc.return_value = rpc_result
+    mock_daemon_p2p.return_value = P2PStatusResult(
+        "node", 18080, status=DAEMON_STATUS_OK
+    )
+
+    result = daemon_stati_check(url="node", as_dict=False)
+
+    assert isinstance(result, StatiResult)
+    assert result.rpc is rpc_result
+    assert rpc_result.version == 12
+    assert result.to_dict() == {
+        DAEMON_RPC_KEY: {"status": DAEMON_STATUS_OK, "host": "node:18081"},
+        DAEMON_P2P_KEY: {"status": DAEMON_STATUS_OK, "host": "node:18080"},
+        "status": DAEMON_STATUS_OK,
+        "host": "node",
+        "version": 12,
+    }
+    assert rpc_result.to_dict()["version"] == 12
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_combined_status_check_result(batch):
+    with StubMonerod() as monerod:
+        result = daemon_combined_status_check(
+            batch=batch,
+            p2p_depth=levin.PROBE_DEPTH_HANDSHAKE,
+            as_dict=False,
+            **monerod.check_kwargs(),
+        )
+
+    assert isinstance(result, CombinedResult)
+    assert isinstance(result.last_block, LastBlockResult)
+    assert isinstance(result.daemon, StatiResult)
+    assert isinstance(result.daemon.rpc, RpcStatusResult)
+    assert isinstance(result.daemon.p2p, P2PStatusResult)
+    assert result.daemon.p2p.height == monerod.height
+
+    response = result.to_dict()
+    assert response["status"] in (DAEMON_STATUS_OK, DAEMON_STATUS_ERROR)
+    assert response[LAST_BLOCK_KEY]["hash"] == result.last_block.hash
+    assert response[DAEMON_KEY]["version"] == monerod.version
+    assert "version" not in response[DAEMON_KEY][DAEMON_RPC_KEY]
+    assert "version" not in response[DAEMON_KEY][DAEMON_P2P_KEY]
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY]["hash"] == monerod.top_hash
+    assert json.loads(result.to_json()) == response
@@ -0,0 +1,173 @@
+import mock
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from monero_health import levin
+from monero_health.server import HealthPoller, HealthServer
+from monero_health.monero_health import (
+    daemon_p2p_status_check,
+    daemon_rpc_status_check,
+    daemon_sync_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+COMBINED_RESULT = {
+    LAST_BLOCK_KEY: {
+        "hash": "3321dcedc99ff78c56e06d5adcb79c25e587df76a35f13771f20d6c9551cf160",
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1:18081",
+    },
+    DAEMON_KEY: {
+        DAEMON_RPC_KEY: {
+            "status": DAEMON_STATUS_OK,
+            "host": "127.0.0.1:18081",
+        },
+        DAEMON_P2P_KEY: {
+            "status": DAEMON_STATUS_ERROR,
+            "host": "127.0.0.1:18080",
+            "error": {"message": "Status is 'ERROR'.", "error": "Refused."},
+        },
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1",
+        "version": 12,
+    },
+    "status": DAEMON_STATUS_OK,
+    "host": "127.0.0.1",
+}
+
+
+@pytest.fixture
+def server():
+    poller = HealthPoller(interval=60)
+    server = HealthServer(("127.0.0.1", 0), poller)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url) as response:  # nosec
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_server_before_first_poll(server):
+    code, body = _get(server, "/health")
+
+    assert code == 503
+    assert body["status"] == DAEMON_STATUS_UNKNOWN
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_server_paths(mock_combined, server):
+    mock_combined.return_value = COMBINED_RESULT
+    server.poller.poll()
+
+    assert _get(server, "/health") == (200, COMBINED_RESULT)
+    assert _get(server, "/last_block") == (
+        200,
+        COMBINED_RESULT[LAST_BLOCK_KEY],
+    )
+    assert _get(server, "/rpc") == (
+        200,
+        {"status": DAEMON_STATUS_OK, "version": 12, "host": "127.0.0.1:18081"},
+    )
+    assert _get(server, "/p2p") == (
+        503,
+        COMBINED_RESULT[DAEMON_KEY][DAEMON_P2P_KEY],
+    )
+    assert _get(server, "/unknown")[0] == 404
+    # Answered from memory.
+    assert mock_combined.call_count == 1
+
+
+def test_server_paths_match_checks(monerod, server):
+    kwargs = monerod.check_kwargs()
+    server.poller.check_kwargs = dict(
+        kwargs, consider_p2p=True, p2p_depth=levin.PROBE_DEPTH_HANDSHAKE
+    )
+    server.poller.poll()
+
+    rpc = daemon_rpc_status_check(
+        url="127.0.0.1",
+        port=monerod.rpc_port,
+        user=monerod.user,
+        passwd=monerod.passwd,
+    )
+    p2p = daemon_p2p_status_check(
+        url="127.0.0.1",
+        port=monerod.p2p_port,
+        depth=levin.PROBE_DEPTH_HANDSHAKE,
+    )
+    code, body = _get(server, "/p2p")
+    # The probe durations differ.
+    del body["probe"]["duration"], p2p["probe"]["duration"]
+
+    assert _get(server, "/rpc") == (200, rpc)
+    assert (code, body) == (200, p2p)
+    assert "version" in p2p
+
+
+def test_server_paths_sync(monerod, server):
+    server.poller.check_kwargs = dict(monerod.check_kwargs(), sync=True)
+    server.poller.poll()
+
+    sync = daemon_sync_check(
+        url="127.0.0.1",
+        port=monerod.rpc_port,
+        user=monerod.user,
+        passwd=monerod.passwd,
+    )
+    assert _get(server, "/sync") == (200, sync)
+    # Not checked with 'sync==True'.
+    assert _get(server, "/last_block")[0] == 503
+    assert b"monero_health_sync_lag_blocks{" in server.poller.metrics()
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_poller_background_refresh(mock_combined):
+    polled = threading.Event()
+
+    def check(**kwargs):
+        polled.set()
+        return COMBINED_RESULT
+
+    mock_combined.side_effect = check
+    poller = HealthPoller(interval=60, check_kwargs={"consider_p2p": True})
+
+    poller.start()
+    assert polled.wait(5)
+    poller.stop()
+
+    mock_combined.assert_called_with(consider_p2p=True)
+    assert poller.response("/health")[0] == 200
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_server_metrics(mock_combined, server):
+    mock_combined.return_value = COMBINED_RESULT
+    server.poller.poll()
+
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    with urllib.request.urlopen(url) as response:  # nosec
+        text = response.read().decode()
+        content_type = response.headers["Content-Type"]
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'monero_health_status{host="127.0.0.1",check="health"} 0' in text
+    assert 'monero_health_hard_fork_version{host="127.0.0.1"} 12' in text
@@ -0,0 +1,148 @@
+import math
+import os
+
+import pytest
+
+from monero_health.history import CheckHistory
+from monero_health.monero_health import (
+    daemon_last_block_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    DAEMON_STATUS_WEIGHTS_,
+)
+from monero_health.store import HistoryStore, RecordFile, Record, RECORD
+
+from tests.stub_monerod import StubMonerod
+
+
+def _append(store, stati, start=1000.0):
+    for i, status in enumerate(stati):
+        store.append(
+            "last_block",
+            "node",
+            18081,
+            status=status,
+            height=2000000 + i,
+            block_age=60.0 * i,
+            latency=0.01,
+            timestamp=start + 10 * i,
+        )
+
+
+def test_store_records(tmp_path):
+    store = HistoryStore(tmp_path)
+    _append(store, [DAEMON_STATUS_OK, DAEMON_STATUS_ERROR])
+    store.append("last_block", "node", 18081, timestamp=1020.0)
+
+    with store.open("last_block", "node", 18081) as records:
+        assert len(records) == 3
+        assert records[0] == Record(
+            timestamp=1000.0,
+            height=2000000,
+            block_age=0.0,
+            latency=0.01,
+            status=DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_OK],
+        )
+        assert records[1].status == DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_ERROR]
+        # Unknown values.
+        assert records[-1].height == -1
+        assert math.isnan(records[-1].block_age)
+        assert math.isnan(records[-1].latency)
+        assert (
+            records[-1].status == DAEMON_STATUS_WEIGHTS_[DAEMON_STATUS_UNKNOWN]
+        )
+        with pytest.raises(IndexError):
+            records[3]
+
+
+def test_store_records_range(tmp_path):
+    store = HistoryStore(tmp_path)
+    _append(store, [DAEMON_STATUS_OK] * 100)
+
+    with store.open("last_block", "node", 18081) as records:
+        assert records.bisect(1500.0) == 50
+        assert records.bisect(1505.0) == 51
+        assert records.bisect(0) == 0
+        assert records.bisect(5000.0) == 100
+        timestamps = [
+            record.timestamp
+            for record in records.records(since=1495.0, until=1520.0)
+        ]
+
+    assert timestamps == [1500.0, 1510.0, 1520.0]
+
+
+def test_store_partial_record(tmp_path):
+    store = HistoryStore(tmp_path)
+    _append(store, [DAEMON_STATUS_OK] * 2)
+    path = store.path("last_block", "node", 18081)
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD.size // 2))
+
+    with RecordFile(path) as records:
+        assert len(records) == 2
+
+
+def test_store_invalid_file(tmp_path):
+    path = tmp_path / "invalid.mhs"
+    path.write_bytes(b"{}" * 20)
+
+    with pytest.raises(ValueError):
+        RecordFile(str(path))
+
+
+def test_store_path(tmp_path):
+    store = HistoryStore(tmp_path)
+
+    assert store.path("combined", "../node/x") == os.path.join(
+        str(tmp_path), "combined", ".._node_x.mhs"
+    )
+    assert store.path("rpc", "node", "18081").endswith("node_18081.mhs")
+
+
+def test_store_downtime(tmp_path):
+    store = HistoryStore(tmp_path)
+    _append(
+        store,
+        [
+            DAEMON_STATUS_OK,
+            DAEMON_STATUS_ERROR,
+            DAEMON_STATUS_UNKNOWN,
+            DAEMON_STATUS_OK,
+            DAEMON_STATUS_OK,
+            DAEMON_STATUS_ERROR,
+        ],
+    )
+
+    assert store.downtime("last_block", "node", 18081) == [
+        (1010.0, 1030.0),
+        (1050.0, 1050.0),
+    ]
+    assert store.downtime("last_block", "node", 18081, until=1100.0) == [
+        (1010.0, 1030.0),
+        (1050.0, 1100.0),
+    ]
+    assert store.downtime("last_block", "node", 18081, since=1025.0) == [
+        (1050.0, 1050.0)
+    ]
+    assert store.downtime("last_block", "other", 18081) == []
+
+
+def test_history_store(tmp_path):
+    store = HistoryStore(tmp_path)
+    history = CheckHistory(store=store)
+    check = history.wrap(daemon_last_block_check)
+
+    with StubMonerod() as monerod:
+        result = check(as_dict=False, **monerod.check_kwargs(p2p=False))
+
+    with store.open(
+        "daemon_last_block_check", "127.0.0.1", monerod.rpc_port
+    ) as records:
+        assert len(records) == 1
+        assert records[0].height == result.height
+        assert records[0].block_age == (
+            result.check_timestamp - result.block_timestamp
+        )
+        assert records[0].latency > 0
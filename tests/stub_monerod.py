@@ -0,0 +1,399 @@
+"""In-process stand-in for monerod.
+
+Speaks JSON-RPC over HTTP/1.1 (keep-alive) with digest authentication on the
+RPC port and accepts TCP connections on the P2P port, answering Levin
+handshakes if 'levin==True'.
+
+Used by the tests and the benchmarks to exercise the real I/O path of the
+checks without a running daemon.
+"""
+
+import hashlib
+import http.server
+import json
+import os
+import re
+import socket
+import threading
+import time
+
+from monero_health import levin
+
+REALM = "monero-rpc"
+
+GENESIS_HASH = (
+    "418015bb9ae982a1975da7d79277c2705727a56894ba0fb246adaabb1f4632e3"
+)
+
+
+def _md5(data):
+    return hashlib.md5(data.encode("utf-8")).hexdigest()  # nosec
+
+
+class _RPCHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body at once, otherwise Nagle's algorithm and delayed
+    # ACKs add ~40 ms to every response.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(code)
+        for key, value in (headers if headers else {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        stub = self.server.stub
+        if stub.user is None:
+            return True
+        params = dict(
+            (key, quoted or plain)
+            for key, quoted, plain in re.findall(
+                r'(\w+)=(?:"([^"]*)"|([^,\s]*))',
+                self.headers.get("Authorization", ""),
+            )
+        )
+        if params.get("nonce") != stub.nonce:
+            return False
+        ha1 = _md5(f"{stub.user}:{REALM}:{stub.passwd}")
+        ha2 = _md5(f"{self.command}:{params.get('uri')}")
+        if params.get("qop"):
+            expected = _md5(
+                f"{ha1}:{stub.nonce}:{params.get('nc')}:"
+                f"{params.get('cnonce')}:{params.get('qop')}:{ha2}"
+            )
+        else:
+            expected = _md5(f"{ha1}:{stub.nonce}:{ha2}")
+        return params.get("response") == expected
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self._authorized():
+            with stub.lock:
+                stub.unauthorized += 1
+            if stub.challenge_delay:
+                time.sleep(stub.challenge_delay)
+            self._send(
+                401,
+                headers={
+                    "WWW-Authenticate": (
+                        f'Digest qop="auth",algorithm=MD5,realm="{REALM}",'
+                        f'nonce="{stub.nonce}",stale=false'
+                    )
+                },
+            )
+            return
+        with stub.lock:
+            stub.requests.append(self.path)
+        if stub.delay:
+            time.sleep(stub.delay)
+
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            self._send(
+                200,
+                {
+                    "jsonrpc": "2.0",
+                    "error": {"code": -32700, "message": "Parse error"},
+                },
+            )
+            return
+
+        if self.path == "/json_rpc":
+            if isinstance(request, list):
+                if not stub.batch:
+                    self._send(
+                        200,
+                        {
+                            "jsonrpc": "2.0",
+                            "id": 0,
+                            "error": {
+                                "code": -32600,
+                                "message": "Invalid request",
+                            },
+                        },
+                    )
+                    return
+                self._send(200, [stub.json_rpc(item) for item in request])
+            else:
+                self._send(200, stub.json_rpc(request))
+        else:
+            result = stub.other_rpc(self.path)
+            if result is None:
+                self._send(404)
+            else:
+                self._send(200, result)
+
+
+class _RPCServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+class StubMonerod:
+    """Fake monerod serving JSON-RPC and accepting P2P connections.
+
+    'block_age' is the age of the last block in seconds, 'delay' an additional
+    latency in seconds for every RPC request, 'challenge_delay' for every
+    digest authentication challenge ('401').
+    'target_height' is reported by 'get_info' while syncing, 'connections'
+    are the incoming and outgoing P2P connections.
+    """
+
+    def __init__(
+        self,
+        user="user",
+        passwd="passwd",
+        height=2200000,
+        version=16,
+        status="OK",
+        block_age=60,
+        delay=0,
+        challenge_delay=0,
+        batch=True,
+        levin=True,
+        target_height=0,
+        connections=(2, 8),
+    ):
+        self.user = user
+        self.passwd = passwd
+        self.height = height
+        self.version = version
+        self.status = status
+        self.block_age = block_age
+        self.delay = delay
+        self.challenge_delay = challenge_delay
+        self.batch = batch
+        self.levin = levin
+        self.target_height = target_height
+        self.connections = connections
+        self.nonce = os.urandom(16).hex()
+        self.lock = threading.Lock()
+        self.requests = []
+        # Number of '401' responses, i.e. digest authentication challenges.
+        self.unauthorized = 0
+        self.p2p_connections = 0
+        self._rpc = None
+        self._p2p = None
+        self._threads = []
+        self._stop = threading.Event()
+
+    @property
+    def top_hash(self):
+        return _md5(str(self.height)) * 2
+
+    @property
+    def rpc_port(self):
+        return self._rpc.server_address[1]
+
+    @property
+    def p2p_port(self):
+        return self._p2p.getsockname()[1]
+
+    def methods(self):
+        return {
+            "get_last_block_header": lambda params: {
+                "block_header": {
+                    "hash": self.top_hash,
+                    "height": self.height - 1,
+                    "major_version": self.version,
+                    "timestamp": int(time.time() - self.block_age),
+                },
+                "status": "OK",
+            },
+            "hard_fork_info": lambda params: {
+                "status": self.status,
+                "version": self.version,
+                "enabled": True,
+            },
+            "get_info": lambda params: {
+                "status": self.status,
+                "height": self.height,
+                "target_height": self.target_height,
+                "top_block_hash": self.top_hash,
+                "synchronized": self.target_height <= self.height,
+                "busy_syncing": self.target_height > self.height,
+                "incoming_connections_count": self.connections[0],
+                "outgoing_connections_count": self.connections[1],
+                "restricted": False,
+            },
+        }
+
+    def other_rpc(self, path):
+        """Answer non JSON-RPC paths, 'None' for unknown paths."""
+
+        if path == "/get_height":
+            return {
+                "hash": self.top_hash,
+                "height": self.height,
+                "status": "OK",
+                "untrusted": False,
+            }
+        return None
+
+    def json_rpc(self, request):
+        method = self.methods().get(request.get("method"))
+        if method is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {"code": -32601, "message": "Method not found"},
+            }
+        return {
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "result": method(request.get("params")),
+        }
+
+    def handshake_response(self):
+        """Body of the Levin handshake response."""
+
+        return levin.pack_storage(
+            {
+                "local_peerlist_new": [
+                    {
+                        "adr": {
+                            "type": (levin.SERIALIZE_TYPE_UINT8, 1),
+                            "addr": {
+                                "m_ip": (levin.SERIALIZE_TYPE_UINT32, 1),
+                                "m_port": (
+                                    levin.SERIALIZE_TYPE_UINT16,
+                                    18080,
+                                ),
+                            },
+                        },
+                        "id": (levin.SERIALIZE_TYPE_UINT64, 1),
+                        "last_seen": (levin.SERIALIZE_TYPE_INT64, 0),
+                    }
+                ],
+                "node_data": {
+                    "network_id": levin.NETWORK_IDS[levin.NETWORK_MAINNET],
+                    "my_port": (levin.SERIALIZE_TYPE_UINT32, 18080),
+                    "rpc_port": (levin.SERIALIZE_TYPE_UINT16, 0),
+                    "rpc_credits_per_hash": (levin.SERIALIZE_TYPE_UINT32, 0),
+                    "peer_id": (levin.SERIALIZE_TYPE_UINT64, 2 ** 63),
+                    "support_flags": (levin.SERIALIZE_TYPE_UINT32, 1),
+                },
+                "payload_data": {
+                    "current_height": (
+                        levin.SERIALIZE_TYPE_UINT64,
+                        self.height,
+                    ),
+                    "cumulative_difficulty": (
+                        levin.SERIALIZE_TYPE_UINT64,
+                        2 ** 40,
+                    ),
+                    "cumulative_difficulty_top64": (
+                        levin.SERIALIZE_TYPE_UINT64,
+                        0,
+                    ),
+                    "top_id": bytes.fromhex(self.top_hash),
+                    "top_version": (levin.SERIALIZE_TYPE_UINT8, self.version),
+                    "pruning_seed": (levin.SERIALIZE_TYPE_UINT32, 0),
+                },
+            }
+        )
+
+    def handle_p2p(self, connection):
+        """Handle an accepted P2P connection.
+
+        Answers a Levin handshake like monerod, i.e. requests the support
+        flags first, if 'levin==True'. Closes the connection otherwise.
+        """
+
+        if not self.levin:
+            return
+        size, _, command, _, _, _ = levin.read_header(connection)
+        levin.recv_exactly(connection, size)
+        if command != levin.COMMAND_HANDSHAKE:
+            return
+        connection.sendall(
+            levin.pack_packet(
+                levin.COMMAND_REQUEST_SUPPORT_FLAGS, levin.pack_storage({})
+            )
+            + levin.pack_packet(
+                levin.COMMAND_HANDSHAKE,
+                self.handshake_response(),
+                expects_response=False,
+                flags=levin.LEVIN_PACKET_RESPONSE,
+                return_code=1,
+            )
+        )
+
+    def _serve_p2p(self):
+        while not self._stop.is_set():
+            try:
+                connection, _ = self._p2p.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with self.lock:
+                self.p2p_connections += 1
+            thread = threading.Thread(
+                target=self._p2p_connection, args=(connection,), daemon=True
+            )
+            thread.start()
+
+    def _p2p_connection(self, connection):
+        try:
+            self.handle_p2p(connection)
+        except OSError:
+            pass
+        finally:
+            connection.close()
+
+    def start(self):
+        self._rpc = _RPCServer(("127.0.0.1", 0), _RPCHandler)
+        self._rpc.stub = self
+        self._p2p = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._p2p.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._p2p.bind(("127.0.0.1", 0))
+        self._p2p.listen(512)
+        self._p2p.settimeout(0.05)
+        self._threads = [
+            threading.Thread(
+                target=self._rpc.serve_forever,
+                kwargs={"poll_interval": 0.05},
+                daemon=True,
+            ),
+            threading.Thread(target=self._serve_p2p, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._rpc.shutdown()
+        self._rpc.server_close()
+        self._p2p.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def check_kwargs(self, p2p=True):
+        """Arguments to point a check at this daemon."""
+
+        kwargs = {
+            "url": "127.0.0.1",
+            "port": self.rpc_port,
+            "user": self.user,
+            "passwd": self.passwd,
+        }
+        if p2p:
+            kwargs["p2p_port"] = self.p2p_port
+        return kwargs
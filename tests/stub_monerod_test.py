@@ -0,0 +1,146 @@
+"""Run the checks against the stub monerod, i.e. through the real I/O path."""
+
+import asyncio
+
+import pytest
+
+from monero_health import aio
+from monero_health.monero_health import (
+    ConnectionPool,
+    daemon_last_block_check,
+    daemon_rpc_status_check,
+    daemon_p2p_status_check,
+    daemon_combined_status_check,
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+
+def test_last_block_check(monerod):
+    response = daemon_last_block_check(**monerod.check_kwargs(p2p=False))
+
+    assert response["status"] == DAEMON_STATUS_OK
+    assert response["hash"] == monerod.top_hash
+    assert "error" not in response
+
+
+def test_rpc_status_check_wrong_password(monerod):
+    kwargs = monerod.check_kwargs(p2p=False)
+    kwargs["passwd"] = "wrong"
+
+    response = daemon_rpc_status_check(**kwargs)
+
+    assert response["status"] == DAEMON_STATUS_UNKNOWN
+    assert response["error"]["error"] == (
+        "-344: Received HTTP status code '401'."
+    )
+
+
+def test_p2p_status_check(monerod):
+    response = daemon_p2p_status_check(url="127.0.0.1", port=monerod.p2p_port)
+
+    assert response["status"] == DAEMON_STATUS_OK
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_combined_status_check(monerod, batch):
+    monerod.status = DAEMON_STATUS_ERROR
+
+    response = daemon_combined_status_check(
+        consider_p2p=True, batch=batch, **monerod.check_kwargs()
+    )
+
+    assert response["status"] == DAEMON_STATUS_ERROR
+    assert response[LAST_BLOCK_KEY]["status"] == DAEMON_STATUS_OK
+    assert response[DAEMON_KEY]["version"] == monerod.version
+    assert (
+        response[DAEMON_KEY][DAEMON_RPC_KEY]["status"] == DAEMON_STATUS_ERROR
+    )
+    assert response[DAEMON_KEY][DAEMON_P2P_KEY]["status"] == DAEMON_STATUS_OK
+    if batch:
+        assert monerod.requests == ["/json_rpc"]
+
+
+def test_combined_status_check_batch_not_supported(monerod):
+    monerod.batch = False
+
+    response = daemon_combined_status_check(
+        batch=True, **monerod.check_kwargs()
+    )
+
+    assert response["status"] == DAEMON_STATUS_OK
+    # Batch request plus one request per method.
+    assert monerod.requests == ["/json_rpc"] * 3
+
+
+def test_combined_status_check_batch_not_supported_no_pool(monerod):
+    monerod.batch = False
+
+    for _ in range(3):
+        response = daemon_combined_status_check(
+            batch=True, **monerod.check_kwargs()
+        )
+        assert response["status"] == DAEMON_STATUS_OK
+
+    # The batch request is sent only once.
+    assert monerod.requests == ["/json_rpc"] * (3 + 2 + 2)
+
+
+def test_combined_status_check_batch_not_supported_pool(monerod):
+    monerod.batch = False
+    pool = ConnectionPool()
+
+    for _ in range(3):
+        response = daemon_combined_status_check(
+            batch=True, pool=pool, **monerod.check_kwargs()
+        )
+        assert response["status"] == DAEMON_STATUS_OK
+    pool.clear()
+
+    # The batch request is sent only once.
+    assert monerod.requests == ["/json_rpc"] * (3 + 2 + 2)
+
+
+def test_pooled_connections_reuse_digest_nonce(monerod):
+    pool = ConnectionPool()
+    kwargs = monerod.check_kwargs(p2p=False)
+
+    for _ in range(3):
+        assert daemon_rpc_status_check(pool=pool, **kwargs)["status"] == (
+            DAEMON_STATUS_OK
+        )
+    pool.clear()
+
+    assert monerod.requests == ["/json_rpc"] * 3
+    assert monerod.unauthorized == 1
+
+
+def test_parallel_checks_reuse_digest_nonce(monerod):
+    pool = ConnectionPool()
+
+    for _ in range(5):
+        response = daemon_combined_status_check(
+            pool=pool, parallel=True, **monerod.check_kwargs()
+        )
+        assert response["status"] == DAEMON_STATUS_OK
+    pool.clear()
+
+    # One challenge per worker thread, not per call.
+    assert monerod.unauthorized < 5
+
+
+def test_async_combined_status_check_matches(monerod):
+    response = asyncio.run(
+        aio.daemon_combined_status_check(**monerod.check_kwargs())
+    )
+    expected = daemon_combined_status_check(**monerod.check_kwargs())
+
+    for response_ in (response, expected):
+        for key in ("check_timestamp", "block_timestamp", "block_age"):
+            del response_[LAST_BLOCK_KEY][key]
+    assert response == expected
@@ -0,0 +1,113 @@
+import mock
+import threading
+
+import pytest
+
+from monero_health.watch import AdaptiveInterval, stati, watch
+from monero_health.monero_health import (
+    DAEMON_STATUS_OK,
+    DAEMON_STATUS_ERROR,
+    DAEMON_STATUS_UNKNOWN,
+    LAST_BLOCK_KEY,
+    DAEMON_KEY,
+    DAEMON_P2P_KEY,
+    DAEMON_RPC_KEY,
+)
+
+
+def _combined_result(p2p_status=DAEMON_STATUS_OK):
+    return {
+        LAST_BLOCK_KEY: {
+            "status": DAEMON_STATUS_OK,
+            "host": "127.0.0.1:18081",
+        },
+        DAEMON_KEY: {
+            DAEMON_RPC_KEY: {
+                "status": DAEMON_STATUS_OK,
+                "host": "127.0.0.1:18081",
+            },
+            DAEMON_P2P_KEY: {"status": p2p_status, "host": "127.0.0.1:18080"},
+            "status": DAEMON_STATUS_OK,
+            "host": "127.0.0.1",
+            "version": 12,
+        },
+        "status": DAEMON_STATUS_OK,
+        "host": "127.0.0.1",
+    }
+
+
+def test_stati():
+    assert (
+        sorted(stati(_combined_result(DAEMON_STATUS_ERROR)))
+        == [DAEMON_STATUS_ERROR] + [DAEMON_STATUS_OK] * 4
+    )
+    assert stati(None) == []
+
+
+def test_adaptive_interval_backs_off():
+    interval = AdaptiveInterval(min_interval=1, max_interval=10, backoff=2)
+
+    intervals = [interval.update(_combined_result()) for _ in range(5)]
+
+    assert intervals == [2, 4, 8, 10, 10]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        _combined_result(DAEMON_STATUS_ERROR),
+        # The P2P status counts, even if not considered in the combined status.
+        _combined_result(DAEMON_STATUS_UNKNOWN),
+        None,
+    ],
+)
+def test_adaptive_interval_drops(response):
+    interval = AdaptiveInterval(min_interval=1, max_interval=10, backoff=2)
+    for _ in range(3):
+        interval.update(_combined_result())
+
+    assert interval.update(response) == 1
+    assert interval.update(_combined_result()) == 2
+
+
+def test_adaptive_interval_limits():
+    interval = AdaptiveInterval(min_interval=5, max_interval=1, backoff=0.5)
+
+    assert interval.update(_combined_result()) == 5
+
+
+@mock.patch("monero_health.monero_health.daemon_combined_status_check")
+def test_watch(mock_check):
+    results = [
+        _combined_result(),
+        _combined_result(DAEMON_STATUS_ERROR),
+        Exception("Boom."),
+        _combined_result(),
+    ]
+    mock_check.side_effect = results
+    stop = threading.Event()
+    waits = []
+
+    def wait(timeout):
+        waits.append(timeout)
+        return False
+
+    stop.wait = wait
+
+    responses = []
+    for response in watch(
+        check_kwargs={"url": "127.0.0.1"},
+        min_interval=1,
+        max_interval=10,
+        backoff=2,
+        stop=stop,
+    ):
+        responses.append(response)
+        if len(responses) == len(results):
+            stop.set()
+
+    assert responses == [results[0], results[1], None, results[3]]
+    mock_check.assert_called_with(url="127.0.0.1")
+    # Waits the interval minus the duration of the check.
+    assert [round(wait) for wait in waits] == [2, 1, 1, 2]
+    assert all(wait <= interval for wait, interval in zip(waits, [2, 1, 1, 2]))